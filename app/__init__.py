@@ -1,7 +1,4 @@
-from .tools import say_hello, say_goodbye, get_weather, get_weather_stateful, execute_maven_command
-from .session import get_session, get_session_stateful
-from .runner import get_runner
-from .agentUtils import createAgent
+import importlib
 
 from .models import (
     MODEL_GEMINI_2_0_FLASH,
@@ -9,3 +6,53 @@ from .models import (
     MODEL_CLAUDE_SONNET,
     get_model
 )
+
+# Public names and the module defining each. They are imported on first
+# access (module-level __getattr__), so `import app` does not pull in
+# google.adk, litellm or mcp until something actually needs them.
+_LAZY = {
+    **dict.fromkeys(["say_hello", "say_goodbye", "get_weather", "get_weather_stateful", "get_weather_batch",
+                     "execute_maven_command"], ".tools"),
+    **dict.fromkeys(["WeatherProvider", "MockWeatherProvider", "CachedWeatherProvider", "get_weather_provider",
+                     "set_weather_provider"], ".weather"),
+    **dict.fromkeys(["get_session", "get_session_stateful", "get_session_service"], ".session"),
+    "SqliteSessionService": ".sqlite_session",
+    "get_runner": ".runner",
+    **dict.fromkeys(["createAgent", "chainCallbacks"], ".agentUtils"),
+    **dict.fromkeys(["build_agent_team", "build_prerouter", "build_fanout"], ".team"),
+    **dict.fromkeys(["FanoutOrchestrator", "FanoutPlanner", "FanoutPlan"], ".fanout"),
+    **dict.fromkeys(["BatchJournal", "run_batch"], ".batch"),
+    **dict.fromkeys(["IntentRule", "PreRouter"], ".prerouter"),
+    **dict.fromkeys(["HistoryCompactor", "get_history_compactor"], ".compaction"),
+    "AgentRegistry": ".registry",
+    **dict.fromkeys(["MCPSessionPool", "PooledMCPTool"], ".mcp_pool"),
+    **dict.fromkeys(["ManifestCache", "ToolManifest"], ".mcp_manifest"),
+    **dict.fromkeys(["cacheable", "CachePolicy", "MemoizedTool"], ".memo"),
+    **dict.fromkeys(["ScriptedLlm", "register_scripted_model", "MODEL_SCRIPTED"], ".fake_model"),
+}
+
+__all__ = sorted([*_LAZY, "MODEL_GEMINI_2_0_FLASH", "MODEL_GPT_4O", "MODEL_CLAUDE_SONNET", "get_model"])
+
+
+def __getattr__(name):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return __all__
+
+
+def preload() -> None:
+    """Imports every lazily loaded module now.
+
+    Call it before forking workers (e.g. `APP_PRELOAD=1` with a pre-forking
+    server), so the children share the imported code instead of each paying
+    for the imports on its first request.
+    """
+    for module in set(_LAZY.values()):
+        importlib.import_module(module, __name__)
@@ -1,24 +1,57 @@
-from google.adk.models.lite_llm import LiteLlm 
+from google.adk.models.lite_llm import LiteLlm
 from google.adk.agents import Agent
 from google.adk.agents.llm_agent import LlmAgent
 import os
+
+from . import tracing
+from .memo import memoize_tools
+from .model_clients import get_llm
+from .resilience import resilient
+
 os.environ["GOOGLE_GENAI_USE_VERTEXAI"] = "False"
 
-def createAgent(*,model, name, instruction, description, tools=None, subAgentList=None, outputKey=None):
+
+def chainCallbacks(*callbacks):
+    """Combines ADK agent callbacks; they run in order and the first non-None result wins."""
+    callbacks = [callback for callback in callbacks if callback]
+    if not callbacks:
+        return None
+    if len(callbacks) == 1:
+        return callbacks[0]
+
+    def chained(**kwargs):
+        for callback in callbacks:
+            result = callback(**kwargs)
+            if result is not None:
+                return result
+        return None
+    return chained
+
+
+def createAgent(*,model, name, instruction, description, tools=None, subAgentList=None, outputKey=None,
+                beforeModelCallback=None, afterModelCallback=None, beforeToolCallback=None, afterToolCallback=None,
+                cacheTools=None):
     subAgent = None
     try:
         subAgent = LlmAgent(
-            model = model,
+            # A shared client per model keeps provider connections alive across agents and
+            # turns; calls are bounded by the turn deadline, hedged and retried (app.resilience).
+            model = resilient(get_llm(model)),
             name=name,
             instruction=instruction,
             description=description,
-            tools=tools or [],
+            # Tools marked @cacheable, or named in cacheTools ({name: cacheable(...)}),
+            # are served from a cache shared across sessions.
+            tools=memoize_tools(tools or [], cacheTools),
             sub_agents=subAgentList or [],
-            output_key=outputKey
+            output_key=outputKey,
+            # Every model and tool call is traced; extra callbacks run after the tracing ones.
+            before_model_callback=chainCallbacks(tracing.before_model_callback, beforeModelCallback),
+            after_model_callback=chainCallbacks(tracing.after_model_callback, afterModelCallback),
+            before_tool_callback=chainCallbacks(tracing.before_tool_callback, beforeToolCallback),
+            after_tool_callback=chainCallbacks(tracing.after_tool_callback, afterToolCallback),
         )
-        print(f"✅ sub agent '{subAgent.name}' created using model '{subAgent.model}'.")
+        print(f"✅ sub agent '{subAgent.name}' created using model '{subAgent.model.model}'.")
     except Exception as e:
-        print(f"❌ Could not create sub agent. Check API Key ({subAgent.model}). Error: {e}")
+        print(f"❌ Could not create sub agent. Check API Key ({model}). Error: {e}")
     return subAgent
-
-
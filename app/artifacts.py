@@ -0,0 +1,257 @@
+import asyncio
+import contextlib
+import hashlib
+import mmap
+import os
+import sqlite3
+import tempfile
+import threading
+from typing import Optional
+
+from google.adk.artifacts.base_artifact_service import BaseArtifactService
+from google.genai import types
+
+from . import metrics
+
+
+# Tool payloads longer than this are stored as artifacts and replaced by a handle.
+INLINE_LIMIT = int(os.environ.get("ARTIFACT_INLINE_LIMIT", "2000"))
+PREVIEW_CHARS = int(os.environ.get("ARTIFACT_PREVIEW_CHARS", "400"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS artifact_versions (
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    digest TEXT NOT NULL,
+    mime_type TEXT,
+    size INTEGER NOT NULL,
+    PRIMARY KEY (app_name, user_id, session_id, filename, version)
+);
+"""
+
+# ADK convention: "user:" artifacts are shared by all sessions of a user.
+_USER_SCOPE = "user:"
+
+
+class MmapArtifactService(BaseArtifactService):
+    """A content-addressed artifact service backed by local files.
+
+    Artifact bytes are stored once per distinct content under
+    `<root>/blobs/<sha256>`, however many sessions, files or versions refer
+    to them. A small SQLite index maps (app, user, session, filename,
+    version) to a digest. `open_blob` maps a blob with `mmap`, so a reader
+    that only needs part of it (a preview, a hash, a streamed response)
+    touches just those pages, without copying, and the OS page cache is
+    shared by every worker process.
+
+    Saving the same content as the latest version of a filename again does
+    not create a new version.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self._blob_dir = os.path.join(root, "blobs")
+        os.makedirs(self._blob_dir, exist_ok=True)
+        self._index_path = os.path.join(root, "index.db")
+        self._local = threading.local()
+        self._conn.executescript(_SCHEMA)
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self._index_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    # --- Blobs ---
+
+    def blob_path(self, digest: str) -> str:
+        return os.path.join(self._blob_dir, digest[:2], digest)
+
+    def put_blob(self, data: bytes) -> str:
+        """Stores `data` once and returns its sha256 digest."""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.blob_path(digest)
+        if os.path.exists(path):
+            metrics.inc_counter("artifact_dedup_hits_total", help="Artifact saves whose content was already stored.")
+            return digest
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+        metrics.inc_counter("artifact_bytes_stored_total", value=len(data), help="Bytes of new artifact content written.")
+        return digest
+
+    @contextlib.contextmanager
+    def open_blob(self, digest: str):
+        """Maps a blob read-only and yields a memoryview of it; nothing is copied until sliced into bytes."""
+        with open(self.blob_path(digest), "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                yield memoryview(b"")
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                view = memoryview(mm)
+                try:
+                    yield view
+                finally:
+                    view.release()
+
+    def read_blob(self, digest: str, limit: int = None) -> bytes:
+        """Reads a blob, or only its first `limit` bytes, into a bytes object.
+
+        A caller that needs the bytes themselves gets them with a single read;
+        mapping the file first would only add a second copy.
+        """
+        with open(self.blob_path(digest), "rb") as f:
+            return f.read(-1 if limit is None else limit)
+
+    # --- BaseArtifactService ---
+
+    # ADK awaits every method; the SQLite and file I/O runs in a worker thread
+    # (each with its own connection) so it never blocks the event loop.
+
+    async def save_artifact(self, *, app_name: str, user_id: str, session_id: str, filename: str,
+                            artifact: types.Part) -> int:
+        return await asyncio.to_thread(self._save_artifact, app_name=app_name, user_id=user_id,
+                                       session_id=session_id, filename=filename, artifact=artifact)
+
+    async def load_artifact(self, *, app_name: str, user_id: str, session_id: str, filename: str,
+                            version: Optional[int] = None) -> Optional[types.Part]:
+        return await asyncio.to_thread(self._load_artifact, app_name=app_name, user_id=user_id,
+                                       session_id=session_id, filename=filename, version=version)
+
+    async def list_artifact_keys(self, *, app_name: str, user_id: str, session_id: str) -> list[str]:
+        return await asyncio.to_thread(self._list_artifact_keys, app_name=app_name, user_id=user_id,
+                                       session_id=session_id)
+
+    async def delete_artifact(self, *, app_name: str, user_id: str, session_id: str, filename: str) -> None:
+        await asyncio.to_thread(self._delete_artifact, app_name=app_name, user_id=user_id,
+                                session_id=session_id, filename=filename)
+
+    async def list_versions(self, *, app_name: str, user_id: str, session_id: str, filename: str) -> list[int]:
+        return await asyncio.to_thread(self._list_versions, app_name=app_name, user_id=user_id,
+                                       session_id=session_id, filename=filename)
+
+    @staticmethod
+    def _scope(session_id: str, filename: str) -> str:
+        return "" if filename.startswith(_USER_SCOPE) else session_id
+
+    def _latest(self, app_name, user_id, session_id, filename):
+        return self._conn.execute(
+            "SELECT version, digest, mime_type FROM artifact_versions"
+            " WHERE app_name = ? AND user_id = ? AND session_id = ? AND filename = ?"
+            " ORDER BY version DESC LIMIT 1",
+            (app_name, user_id, self._scope(session_id, filename), filename),
+        ).fetchone()
+
+    def _save_artifact(self, *, app_name: str, user_id: str, session_id: str, filename: str,
+                       artifact: types.Part) -> int:
+        if artifact.inline_data is not None:
+            data, mime_type = artifact.inline_data.data or b"", artifact.inline_data.mime_type
+        else:
+            data, mime_type = (artifact.text or "").encode("utf-8"), "text/plain"
+        digest = self.put_blob(data)
+        scope = self._scope(session_id, filename)
+        conn = self._conn
+        # The write lock is taken before reading the latest version, so two
+        # processes saving the same filename cannot both pick the same number.
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            latest = self._latest(app_name, user_id, session_id, filename)
+            if latest is not None and latest[1] == digest and latest[2] == mime_type:
+                version = latest[0]
+            else:
+                version = 0 if latest is None else latest[0] + 1
+                conn.execute("INSERT INTO artifact_versions VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                             (app_name, user_id, scope, filename, version, digest, mime_type, len(data)))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return version
+
+    def _load_artifact(self, *, app_name: str, user_id: str, session_id: str, filename: str,
+                       version: Optional[int] = None) -> Optional[types.Part]:
+        if version is None:
+            row = self._latest(app_name, user_id, session_id, filename)
+        else:
+            row = self._conn.execute(
+                "SELECT version, digest, mime_type FROM artifact_versions WHERE app_name = ? AND user_id = ?"
+                " AND session_id = ? AND filename = ? AND version = ?",
+                (app_name, user_id, self._scope(session_id, filename), filename, version),
+            ).fetchone()
+        if row is None:
+            return None
+        try:
+            data = self.read_blob(row[1])
+        except FileNotFoundError:
+            return None
+        return types.Part.from_bytes(data=data, mime_type=row[2] or "application/octet-stream")
+
+    def _list_artifact_keys(self, *, app_name: str, user_id: str, session_id: str) -> list[str]:
+        rows = self._conn.execute(
+            "SELECT DISTINCT filename FROM artifact_versions WHERE app_name = ? AND user_id = ?"
+            " AND session_id IN (?, '') ORDER BY filename",
+            (app_name, user_id, session_id),
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def _delete_artifact(self, *, app_name: str, user_id: str, session_id: str, filename: str) -> None:
+        # Blobs stay: other artifacts may share them.
+        self._conn.execute("DELETE FROM artifact_versions WHERE app_name = ? AND user_id = ? AND session_id = ?"
+                           " AND filename = ?", (app_name, user_id, self._scope(session_id, filename), filename))
+
+    def _list_versions(self, *, app_name: str, user_id: str, session_id: str, filename: str) -> list[int]:
+        rows = self._conn.execute(
+            "SELECT version FROM artifact_versions WHERE app_name = ? AND user_id = ? AND session_id = ?"
+            " AND filename = ? ORDER BY version",
+            (app_name, user_id, self._scope(session_id, filename), filename),
+        ).fetchall()
+        return [row[0] for row in rows]
+
+
+_default_service = None
+_default_lock = threading.Lock()
+
+
+def get_artifact_service() -> MmapArtifactService:
+    """Returns the process-wide artifact service, stored under ARTIFACT_DIR (default: .artifacts)."""
+    global _default_service
+    with _default_lock:
+        if _default_service is None:
+            _default_service = MmapArtifactService(os.environ.get("ARTIFACT_DIR", ".artifacts"))
+        return _default_service
+
+
+async def offload(tool_context, name: str, text: str, *, mime_type: str = "text/plain"):
+    """Stores a large tool payload as an artifact and returns a handle with a preview.
+
+    Returns None (keep the payload inline) when the text is short or there is
+    no tool context to save through. The artifact name is derived from the
+    content, so the same payload is stored and named once.
+
+    Args:
+        tool_context: The ToolContext of the running tool call.
+        name (str): A short prefix for the artifact name, e.g. 'maven-output'.
+        text (str): The payload.
+        mime_type (str): Its MIME type.
+    """
+    if text is None or len(text) <= INLINE_LIMIT or tool_context is None:
+        return None
+    data = text.encode("utf-8")
+    filename = f"{name}-{hashlib.sha256(data).hexdigest()[:12]}.txt"
+    version = await tool_context.save_artifact(filename, types.Part.from_bytes(data=data, mime_type=mime_type))
+    return {
+        "artifact": filename,
+        "version": version,
+        "chars": len(text),
+        "preview": text[:PREVIEW_CHARS] + ("…" if len(text) > PREVIEW_CHARS else ""),
+        "note": "Only a preview is shown; call load_artifacts with this artifact name to read it in full.",
+    }
@@ -0,0 +1,145 @@
+import asyncio
+import hashlib
+import json
+import os
+import time
+import uuid
+
+from . import metrics
+
+
+DEFAULT_JOURNAL_DIR = os.environ.get("BATCH_JOURNAL_DIR", ".batch_runs")
+DEFAULT_CONCURRENCY = int(os.environ.get("BATCH_CONCURRENCY", "4"))
+# Upper bound on what a caller may ask for: every item in flight holds a model call.
+MAX_CONCURRENCY = int(os.environ.get("BATCH_MAX_CONCURRENCY", "16"))
+
+
+def item_digest(item: dict) -> str:
+    """Identifies an item's content, so a resumed run only skips items that did not change."""
+    return hashlib.sha256(json.dumps(item, sort_keys=True).encode()).hexdigest()[:16]
+
+
+class BatchJournal:
+    """Append-only record of the completed items of each batch run.
+
+    One JSON line per finished item is written to `<journal_dir>/<run_id>.jsonl`
+    as soon as it completes. Posting the same run_id again skips every item
+    already in the journal.
+    """
+
+    def __init__(self, journal_dir: str = DEFAULT_JOURNAL_DIR):
+        self.journal_dir = journal_dir
+        os.makedirs(journal_dir, exist_ok=True)
+
+    def _path(self, run_id: str) -> str:
+        safe = "".join(c for c in run_id if c.isalnum() or c in "-_")
+        if not safe:
+            raise ValueError(f"Invalid batch run id: '{run_id}'.")
+        return os.path.join(self.journal_dir, safe + ".jsonl")
+
+    def completed(self, run_id: str) -> dict:
+        """Returns {index: record} for every item this run already finished."""
+        records = {}
+        try:
+            with open(self._path(run_id), "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # a line cut short by a crash
+                    records[record["index"]] = record
+        except FileNotFoundError:
+            pass
+        return records
+
+    def record(self, run_id: str, record: dict) -> None:
+        with open(self._path(run_id), "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, default=str) + "\n")
+
+
+def _line(payload: dict) -> str:
+    return json.dumps(payload, default=str, ensure_ascii=False) + "\n"
+
+
+async def run_batch(items: list[dict], *, run_turn, concurrency: int = DEFAULT_CONCURRENCY,
+                    journal: BatchJournal = None, run_id: str = None):
+    """Runs batch items through `run_turn` and yields NDJSON lines as each item completes.
+
+    Args:
+        items (list[dict]): Items with 'user_id', 'session_id' and 'query'.
+        run_turn (callable): `await run_turn(item)` returning the agent's response text.
+        concurrency (int): Maximum number of items in flight, capped at
+            MAX_CONCURRENCY. Items sharing a session always run one after
+            another so its history stays ordered.
+        journal (BatchJournal, optional): Where completed items are recorded.
+        run_id (str, optional): Run to resume; a new one is generated if missing.
+
+    Yields:
+        str: A 'run' header line, one 'item' line per item (skipped items
+        from a previous attempt are replayed with 'resumed': true), then a
+        'summary' line.
+    """
+    journal = journal or BatchJournal()
+    run_id = run_id or uuid.uuid4().hex
+    done = {index: record for index, record in journal.completed(run_id).items()
+            if index < len(items) and record.get("digest") == item_digest(items[index])}
+    pending = [i for i in range(len(items)) if i not in done]
+
+    yield _line({"type": "run", "run_id": run_id, "total": len(items), "resumed": len(done), "pending": len(pending)})
+    for index in sorted(done):
+        yield _line({**done[index], "resumed": True})
+
+    started = time.perf_counter()
+    semaphore = asyncio.Semaphore(min(max(1, concurrency), MAX_CONCURRENCY))
+    session_locks = {}
+    results = asyncio.Queue()
+    latencies = []
+
+    async def process(index: int):
+        item = items[index]
+        lock = session_locks.setdefault((item["user_id"], item["session_id"]), asyncio.Lock())
+        # The session lock comes first: items queued behind another item of the
+        # same session must not hold a concurrency slot while they wait.
+        async with lock, semaphore:
+            item_started = time.perf_counter()
+            record = {"type": "item", "index": index, "user_id": item["user_id"],
+                      "session_id": item["session_id"], "digest": item_digest(item)}
+            try:
+                record["response"] = await run_turn(item)
+                record["status"] = "ok"
+            except Exception as e:
+                record["status"] = "error"
+                record["error"] = f"{type(e).__name__}: {e}"
+            latency = time.perf_counter() - item_started
+            record["latency_ms"] = round(latency * 1000, 1)
+            latencies.append(latency)
+            metrics.observe("batch_item_seconds", latency, help="Latency of batch items.")
+            # Only successful items are journaled; failed ones run again on resume.
+            if record["status"] == "ok":
+                journal.record(run_id, record)
+            await results.put(record)
+
+    tasks = [asyncio.create_task(process(index)) for index in pending]
+    errors = 0
+    try:
+        for _ in tasks:
+            record = await results.get()
+            errors += record["status"] == "error"
+            yield _line(record)
+    finally:
+        # The client went away (or the stream failed): stop the remaining items.
+        # Their absence from the journal lets the same run_id resume them.
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    latencies.sort()
+    yield _line({
+        "type": "summary",
+        "run_id": run_id,
+        "completed": len(done) + len(tasks) - errors,
+        "errors": errors,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+        "p50_latency_ms": round(latencies[len(latencies) // 2] * 1000, 1) if latencies else None,
+        "max_latency_ms": round(latencies[-1] * 1000, 1) if latencies else None,
+    })
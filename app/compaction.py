@@ -0,0 +1,178 @@
+import json
+import os
+
+from google.genai import types
+
+from . import metrics, tracing
+
+
+DEFAULT_KEEP_TURNS = int(os.environ.get("HISTORY_KEEP_TURNS", "6"))
+DEFAULT_TOKEN_BUDGET = int(os.environ.get("HISTORY_TOKEN_BUDGET", "16000"))
+DEFAULT_BULKY_CHARS = int(os.environ.get("HISTORY_BULKY_TOOL_CHARS", "2000"))
+
+SUMMARY_KEY = "history_summary"
+SUMMARY_TURNS_KEY = "history_summary_turns"
+
+# ADK rewrites other agents' events as user messages starting with this text;
+# they belong to the current turn rather than starting a new one.
+_FOREIGN_EVENT_PREFIX = "For context:"
+
+_SUMMARY_LINE_CHARS = 200
+_MAX_SUMMARY_CHARS = 4000
+
+
+def estimate_tokens(contents) -> int:
+    """A cheap token estimate (about four characters per token)."""
+    chars = 0
+    for content in contents:
+        for part in content.parts or []:
+            if part.text:
+                chars += len(part.text)
+            elif part.function_call:
+                chars += len(part.function_call.name or "") + len(json.dumps(part.function_call.args or {}, default=str))
+            elif part.function_response:
+                chars += len(json.dumps(part.function_response.response or {}, default=str))
+    return chars // 4
+
+
+def _is_turn_start(content) -> bool:
+    if content.role != "user":
+        return False
+    texts = [p.text for p in content.parts or [] if p.text]
+    return bool(texts) and not texts[0].startswith(_FOREIGN_EVENT_PREFIX)
+
+
+def split_turns(contents) -> list[list]:
+    """Groups contents into turns, each starting with a user message."""
+    turns = []
+    for content in contents:
+        if _is_turn_start(content) or not turns:
+            turns.append([])
+        turns[-1].append(content)
+    return turns
+
+
+def _shorten(text: str) -> str:
+    text = " ".join(text.split())
+    return text if len(text) <= _SUMMARY_LINE_CHARS else text[:_SUMMARY_LINE_CHARS - 1] + "…"
+
+
+def summarize_turn(turn) -> str:
+    """One line per turn: what the user asked and the last thing the agents answered."""
+    user_text = next((p.text for p in turn[0].parts or [] if p.text), "")
+    answer = ""
+    for content in turn[1:]:
+        if content.role == "model":
+            texts = [p.text for p in content.parts or [] if p.text]
+            if texts:
+                answer = " ".join(texts)
+    line = f"- User: {_shorten(user_text)}"
+    if answer:
+        line += f" / Agent: {_shorten(answer)}"
+    return line
+
+
+def _strip_bulky(content, max_chars: int):
+    """Returns a copy of `content` with large tool results replaced by a short note."""
+    parts = []
+    changed = False
+    for part in content.parts or []:
+        if part.function_response:
+            payload = json.dumps(part.function_response.response or {}, default=str)
+            if len(payload) > max_chars:
+                response = part.function_response.response or {}
+                stub = {"note": f"Tool output omitted from history ({len(payload)} characters)."}
+                if isinstance(response, dict) and "status" in response:
+                    stub["status"] = response["status"]
+                part = types.Part(function_response=types.FunctionResponse(
+                    id=part.function_response.id, name=part.function_response.name, response=stub))
+                changed = True
+        parts.append(part)
+    return types.Content(role=content.role, parts=parts) if changed else content
+
+
+class HistoryCompactor:
+    """Keeps the history sent to the model under a token budget.
+
+    The last `keep_turns` turns are sent verbatim, except that large tool
+    results from earlier turns (e.g. full Maven logs) are replaced with a
+    short note. Older turns are folded into a rolling summary kept in session
+    state, and only that summary is sent in their place. If the history is
+    still over `token_budget`, more turns are folded until it fits or only
+    the current turn is left.
+    """
+
+    def __init__(self, *, keep_turns: int = DEFAULT_KEEP_TURNS, token_budget: int = DEFAULT_TOKEN_BUDGET,
+                 bulky_chars: int = DEFAULT_BULKY_CHARS):
+        self.keep_turns = max(1, keep_turns)
+        self.token_budget = token_budget
+        self.bulky_chars = bulky_chars
+
+    def compact(self, contents: list, state) -> tuple[list, int]:
+        """Returns the compacted contents and the number of tokens saved."""
+        before = estimate_tokens(contents)
+        turns = split_turns(contents)
+
+        # Tool output only matters to the turn that produced it.
+        for i in range(len(turns) - 1):
+            turns[i] = [_strip_bulky(content, self.bulky_chars) for content in turns[i]]
+
+        keep = min(self.keep_turns, len(turns))
+        compacted = self._assemble(turns, len(turns) - keep, state)
+        while keep > 1 and estimate_tokens(compacted) > self.token_budget:
+            keep -= 1
+            compacted = self._assemble(turns, len(turns) - keep, state)
+
+        saved = max(0, before - estimate_tokens(compacted))
+        return compacted, saved
+
+    def _assemble(self, turns: list, folded: int, state) -> list:
+        recent = [content for turn in turns[folded:] for content in turn]
+        if folded <= 0:
+            return recent
+        summary = self._rolling_summary(turns[:folded], state)
+        header = types.Content(role="user", parts=[types.Part(
+            text=f"Summary of the earlier conversation ({folded} turns):\n{summary}")])
+        return [header] + recent
+
+    @staticmethod
+    def _rolling_summary(old_turns: list, state) -> str:
+        """Extends the summary stored in state with the turns it does not cover yet."""
+        summarized = state.get(SUMMARY_TURNS_KEY, 0) or 0
+        summary = state.get(SUMMARY_KEY, "") or ""
+        if summarized > len(old_turns):
+            # The stored summary covers more than is being folded now; rebuild it.
+            summarized, summary = 0, ""
+        new_lines = [summarize_turn(turn) for turn in old_turns[summarized:]]
+        if new_lines:
+            summary = "\n".join(filter(None, [summary] + new_lines))
+            if len(summary) > _MAX_SUMMARY_CHARS:
+                summary = "…" + summary[-(_MAX_SUMMARY_CHARS - 1):]
+            state[SUMMARY_KEY] = summary
+            state[SUMMARY_TURNS_KEY] = len(old_turns)
+        return summary
+
+    def before_model_callback(self, callback_context, llm_request):
+        """ADK before_model_callback that compacts the request's history in place."""
+        if not llm_request.contents:
+            return None
+        compacted, saved = self.compact(llm_request.contents, callback_context.state)
+        llm_request.contents = compacted
+        if saved:
+            metrics.inc_counter("history_tokens_saved_total", saved, labels={"agent": callback_context.agent_name},
+                                help="Estimated prompt tokens removed by history compaction.")
+            span = tracing.current_span()
+            if span is not None:
+                span.add("history.tokens_saved", saved)
+            print(f"--- Compaction: saved ~{saved} prompt tokens for '{callback_context.agent_name}' ---")
+        return None
+
+
+_compactor = None
+
+
+def get_history_compactor() -> HistoryCompactor:
+    global _compactor
+    if _compactor is None:
+        _compactor = HistoryCompactor()
+    return _compactor
@@ -0,0 +1,109 @@
+import asyncio
+import re
+from typing import AsyncGenerator, ClassVar
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.models.registry import LLMRegistry
+from google.genai import types
+
+
+MODEL_SCRIPTED = "scripted"
+
+# ADK tells every agent its own name in the system instruction.
+_AGENT_NAME = re.compile(r'Your internal name is "([^"]+)"')
+
+
+# One list of steps per agent. A step is {"text": ...}, {"call": tool, "args": {...}}
+# or {"transfer": agent}. Once an agent's steps run out it answers "Done.".
+DEFAULT_SCRIPT = {
+    "weather_agent_v4_stateful": [
+        {"transfer": "greeting_agent"},
+    ],
+    "greeting_agent": [
+        {"call": "say_hello", "args": {"name": "Ramon"}},
+        {"text": "Hello, Ramon!"},
+    ],
+    "farewell_agent": [
+        {"call": "say_goodbye", "args": {}},
+        {"text": "Goodbye! Have a great day."},
+    ],
+}
+
+
+def _step_response(step: dict) -> LlmResponse:
+    if "transfer" in step:
+        part = types.Part(function_call=types.FunctionCall(name="transfer_to_agent",
+                                                           args={"agent_name": step["transfer"]}))
+    elif "call" in step:
+        part = types.Part(function_call=types.FunctionCall(name=step["call"], args=step.get("args", {})))
+    else:
+        part = types.Part(text=step.get("text", ""))
+    return LlmResponse(content=types.Content(role="model", parts=[part]))
+
+
+def _agent_name(llm_request: LlmRequest) -> str:
+    instruction = llm_request.config.system_instruction if llm_request.config else None
+    match = _AGENT_NAME.search(str(instruction or ""))
+    return match.group(1) if match else ""
+
+
+def _step_index(llm_request: LlmRequest) -> int:
+    """Counts this agent's tool round trips since the last plain user message."""
+    step = 0
+    for content in reversed(llm_request.contents or []):
+        parts = content.parts or []
+        if content.role == "user" and any(p.function_response for p in parts):
+            step += 1
+        elif content.role == "user":
+            break
+    return step
+
+
+class ScriptedLlm(BaseLlm):
+    """A local, deterministic stand-in for Gemini/LiteLlm used by benchmarks.
+
+    It replays a fixed sequence of tool calls, agent transfers and text per
+    agent, so the whole orchestration path (Runner, transfers, tools,
+    sessions) runs without network access or API keys. The agent is
+    identified from the system instruction and the step from the number of
+    tool results already in the request.
+
+    Use it by passing `model="scripted"` to `createAgent` after calling
+    `register_scripted_model()`, or by passing an instance directly.
+    """
+
+    model: str = MODEL_SCRIPTED
+    script: dict = DEFAULT_SCRIPT
+    latency: float = 0.0
+
+    # Used when the model is resolved by name through the LLMRegistry.
+    default_script: ClassVar[dict] = DEFAULT_SCRIPT
+    default_latency: ClassVar[float] = 0.0
+
+    def __init__(self, **data):
+        data.setdefault("script", type(self).default_script)
+        data.setdefault("latency", type(self).default_latency)
+        super().__init__(**data)
+
+    @classmethod
+    def supported_models(cls) -> list[str]:
+        return [r"scripted(-.*)?"]
+
+    async def generate_content_async(self, llm_request: LlmRequest, stream: bool = False) -> AsyncGenerator[LlmResponse, None]:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        steps = self.script.get(_agent_name(llm_request), [])
+        index = _step_index(llm_request)
+        step = steps[index] if index < len(steps) else {"text": "Done."}
+        yield _step_response(step)
+
+
+def register_scripted_model(*, script: dict = None, latency: float = None) -> None:
+    """Makes `model="scripted"` resolve to ScriptedLlm, optionally with a custom script/latency."""
+    if script is not None:
+        ScriptedLlm.default_script = script
+    if latency is not None:
+        ScriptedLlm.default_latency = latency
+    LLMRegistry.register(ScriptedLlm)
@@ -0,0 +1,183 @@
+import inspect
+import re
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Optional
+
+from google.adk.agents import ParallelAgent
+from google.adk.events.event import Event
+from google.adk.events.event_actions import EventActions
+from google.genai import types
+
+from .runner import get_runner
+from . import metrics, tracing
+
+
+# Clauses are split at sentence ends and semicolons.
+_CLAUSE_BOUNDARY = re.compile(r"(?<=[.!?;])\s+")
+
+# In a later clause, these mean it depends on an earlier one ("Then fix what it
+# reports"), so the clauses must run in order, not side by side.
+_DEPENDENT_CLAUSE = re.compile(r"\b(?:then|after(?:wards)?|once|based on|its?|the (?:results?|output))\b",
+                               re.IGNORECASE)
+
+
+def task_key(agent_name: str) -> str:
+    """State key holding the sub-task a fan-out branch must handle."""
+    return f"fanout_{agent_name}_task"
+
+
+def result_key(agent_name: str) -> str:
+    """State key the branch writes its final answer to (its output_key)."""
+    return f"fanout_{agent_name}_result"
+
+
+@dataclass
+class FanoutPlan:
+    """Independent sub-tasks of one message, in the order they were asked."""
+    tasks: list[tuple[str, str]]  # (agent name, clause)
+    # A greeting opening the message ("hi my name is Ramon, ..."): (IntentRule, tool arguments).
+    greeting: Optional[tuple] = None
+
+    @property
+    def agents(self) -> tuple:
+        return tuple(agent for agent, _ in self.tasks)
+
+
+class FanoutPlanner:
+    """Detects messages that ask several independent sub-agents for work.
+
+    The message is split into clauses and each clause is assigned to the
+    sub-agent whose keyword rules it matches most. A plan is only returned
+    when at least two different parallel-safe sub-agents each get their own
+    clause; ambiguous clauses (several agents tie) disable the fan-out, and so
+    does a later clause that is sequenced after or refers back to an earlier
+    one ("Run mvn test. Then fix the vulnerabilities it reports.").
+
+    A greeting at the start of the message is split off and answered by the
+    greeting rule's tool instead of being merged into the first branch.
+    """
+
+    def __init__(self, rules: dict, *, greeting=None):
+        """
+        Args:
+            rules (dict): Sub-agent name -> list of regexes identifying its requests.
+            greeting (IntentRule, optional): Recognises a greeting opening the message.
+        """
+        self.rules = {agent: [re.compile(p, re.IGNORECASE) for p in patterns] for agent, patterns in rules.items()}
+        self.greeting = greeting
+
+    def _assign(self, clause: str):
+        scores = {agent: sum(bool(p.search(clause)) for p in patterns) for agent, patterns in self.rules.items()}
+        best = max(scores.values(), default=0)
+        winners = [agent for agent, score in scores.items() if score == best]
+        if best == 0:
+            return None
+        if len(winners) > 1:
+            raise ValueError("ambiguous clause")
+        return winners[0]
+
+    def plan(self, query: str):
+        query, greeting = query.strip(), None
+        m = self.greeting.prefix(query) if self.greeting is not None else None
+        if m is not None:
+            greeting = (self.greeting, self.greeting.arguments(m))
+            query = query[m.end():].lstrip(" ,;:.!-")
+        tasks = {}
+        try:
+            for clause in _CLAUSE_BOUNDARY.split(query):
+                if tasks and _DEPENDENT_CLAUSE.search(clause):
+                    return None
+                agent = self._assign(clause)
+                if agent is not None:
+                    tasks[agent] = f"{tasks[agent]} {clause}" if agent in tasks else clause
+        except ValueError:
+            return None
+        if len(tasks) < 2:
+            return None
+        return FanoutPlan(tasks=list(tasks.items()), greeting=greeting)
+
+
+class FanoutOrchestrator:
+    """Runs the sub-agents of a FanoutPlan concurrently with an ADK ParallelAgent.
+
+    Each branch is a dedicated copy of the sub-agent whose instruction reads
+    its own task from state (`fanout_<agent>_task`) and whose answer is
+    written to its own key (`fanout_<agent>_result`), so branches never see or
+    overwrite each other's state. One ParallelAgent and Runner are built per
+    combination of sub-agents the first time it is needed, then reused.
+    """
+
+    def __init__(self, *, planner: FanoutPlanner, branch_builder, session_service, app_name: str):
+        """
+        Args:
+            planner (FanoutPlanner): Splits messages into independent sub-tasks.
+            branch_builder (callable): `branch_builder(agent_name)` returning a fresh branch LlmAgent.
+            session_service: The session service shared with the main runner.
+            app_name (str): The ADK application name.
+        """
+        self.planner = planner
+        self.session_service = session_service
+        self.app_name = app_name
+        self._branch_builder = branch_builder
+        self._runners = {}
+
+    def plan(self, query: str):
+        return self.planner.plan(query)
+
+    def runner_for(self, agents: tuple):
+        key = tuple(sorted(agents))
+        runner = self._runners.get(key)
+        if runner is None:
+            parallel = ParallelAgent(name="fanout_" + "_".join(key),
+                                     sub_agents=[self._branch_builder(name) for name in key])
+            runner = self._runners[key] = get_runner(parallel, self.session_service, self.app_name)
+        return runner
+
+    async def run(self, query: str, plan: FanoutPlan, *, user_id: str, session_id: str) -> str:
+        """Runs every branch of the plan concurrently and merges their answers in plan order."""
+        with tracing.span("agent.fanout", agents=",".join(plan.agents)):
+            started = time.perf_counter()
+            session = self.session_service.get_session(app_name=self.app_name, user_id=user_id, session_id=session_id)
+            # Seed each branch's task (and clear stale results) before the run starts.
+            state_delta = {}
+            for agent, clause in plan.tasks:
+                state_delta[task_key(agent)] = clause
+                state_delta[result_key(agent)] = None
+            self.session_service.append_event(session, Event(
+                invocation_id="e-" + str(uuid.uuid4()),
+                author="fanout_planner",
+                actions=EventActions(state_delta=state_delta),
+            ))
+
+            answers = {}
+            content = types.Content(role='user', parts=[types.Part(text=query)])
+            runner = self.runner_for(plan.agents)
+            async for event in runner.run_async(user_id=user_id, session_id=session_id, new_message=content):
+                if event.is_final_response() and event.author in dict(plan.tasks):
+                    if event.content and event.content.parts:
+                        answers[event.author] = "".join(p.text for p in event.content.parts if p.text)
+                    elif event.actions and event.actions.escalate:
+                        answers[event.author] = f"Agent escalated: {event.error_message or 'No specific message.'}"
+
+            if plan.greeting is not None:
+                rule, args = plan.greeting
+                reply = rule.tool(**args)
+                answers[rule.agent] = await reply if inspect.isawaitable(reply) else str(reply)
+
+            metrics.observe("fanout_turn_seconds", time.perf_counter() - started,
+                            labels={"agents": ",".join(sorted(plan.agents))},
+                            help="Duration of fanned-out turns.")
+            return merge_answers(plan, answers)
+
+
+def merge_answers(plan: FanoutPlan, answers: dict) -> str:
+    """Joins branch answers into one response, always in the order the tasks were asked."""
+    sections = []
+    if plan.greeting is not None and answers.get(plan.greeting[0].agent):
+        sections.append(f"[{plan.greeting[0].agent}] {answers[plan.greeting[0].agent].strip()}")
+    for agent, _ in plan.tasks:
+        answer = answers.get(agent) or "No response."
+        sections.append(f"[{agent}] {answer.strip()}")
+    return "\n\n".join(sections)
@@ -0,0 +1,141 @@
+import asyncio
+import contextlib
+import os
+import shlex
+
+
+DEFAULT_TIMEOUT = float(os.environ.get("MAVEN_TIMEOUT_SECONDS", "900"))
+DEFAULT_MAX_CONCURRENCY = int(os.environ.get("MAVEN_MAX_CONCURRENCY", str(os.cpu_count() or 1)))
+
+# How long a build gets to exit after SIGTERM before it is killed.
+_TERMINATE_GRACE_SECONDS = 5
+
+# Output is read in chunks of this size; a line longer than _MAX_LINE is passed on in pieces.
+_READ_CHUNK = 64 * 1024
+_MAX_LINE = 1024 * 1024
+
+
+class MavenExecutor:
+    """Runs Maven builds as asyncio subprocesses without blocking the event loop.
+
+    At most `max_concurrency` builds run at once across the whole process
+    (by default one per CPU); further calls wait for a free slot. Each build
+    has a timeout, and cancelling the awaiting task terminates the build.
+    stdout and stderr are read in chunks while the build runs and split into
+    lines, so partial output is kept even when a build times out, and callers
+    can follow it line by line through `on_output`.
+    """
+
+    def __init__(self, *, max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                 default_timeout: float = DEFAULT_TIMEOUT, executable: str = "mvn"):
+        self.max_concurrency = max(1, max_concurrency)
+        self.default_timeout = default_timeout
+        self.executable = executable
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    async def run(self, command: str, working_dir: str = None, *, timeout: float = None, on_output=None) -> dict:
+        """Runs `mvn <command>` in `working_dir`.
+
+        Args:
+            command (str): The Maven arguments (e.g. "clean compile").
+            working_dir (str, optional): Directory to run in. Defaults to the current directory.
+            timeout (float, optional): Seconds before the build is stopped. Defaults to `default_timeout`.
+            on_output (callable, optional): Called as `on_output(stream_name, line)` for every
+                line of output as it arrives.
+
+        Returns:
+            dict: 'status' ('success' or 'error'), 'output', 'error' and 'exit_code'.
+        """
+        timeout = self.default_timeout if timeout is None else timeout
+        cwd = working_dir if working_dir else os.getcwd()
+        mvn_cmd = [self.executable] + shlex.split(command)
+
+        async with self._semaphore:
+            process = await asyncio.create_subprocess_exec(
+                *mvn_cmd,
+                cwd=cwd,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+            stdout, stderr = [], []
+            pumps = asyncio.gather(
+                self._pump(process.stdout, stdout, "stdout", on_output),
+                self._pump(process.stderr, stderr, "stderr", on_output),
+            )
+            try:
+                await asyncio.wait_for(asyncio.shield(pumps), timeout)
+                exit_code = await process.wait()
+            except asyncio.TimeoutError:
+                await self._stop(process)
+                await asyncio.gather(pumps, return_exceptions=True)
+                return {
+                    "status": "error",
+                    "output": "".join(stdout),
+                    "error": f"Maven command timed out after {timeout:.0f}s: {''.join(stderr)}",
+                    "exit_code": process.returncode,
+                }
+            except BaseException:
+                # Cancellation, or a pump failing: never leave the build running.
+                pumps.cancel()
+                await self._stop(process)
+                await asyncio.gather(pumps, return_exceptions=True)
+                raise
+
+        if exit_code == 0:
+            return {"status": "success", "output": "".join(stdout), "error": None, "exit_code": 0}
+        # Maven reports most build failures on stdout, so keep it alongside stderr.
+        return {
+            "status": "error",
+            "output": "".join(stdout),
+            "error": f"Maven command failed: {''.join(stderr)}",
+            "exit_code": exit_code,
+        }
+
+    @staticmethod
+    async def _pump(stream, sink: list, name: str, on_output) -> None:
+        # Reads chunks rather than readline(), whose 64 KiB limit a single long
+        # Maven line (e.g. a classpath dump) can exceed.
+        def emit(data: bytes) -> None:
+            text = data.decode("utf-8", errors="replace")
+            sink.append(text)
+            if on_output is not None:
+                on_output(name, text)
+
+        pending = b""
+        while True:
+            chunk = await stream.read(_READ_CHUNK)
+            if not chunk:
+                if pending:
+                    emit(pending)
+                return
+            lines = (pending + chunk).splitlines(keepends=True)
+            pending = lines.pop() if not lines[-1].endswith(b"\n") else b""
+            for line in lines:
+                emit(line)
+            if len(pending) > _MAX_LINE:
+                emit(pending)
+                pending = b""
+
+    @staticmethod
+    async def _stop(process) -> None:
+        if process.returncode is not None:
+            return
+        with contextlib.suppress(ProcessLookupError):
+            process.terminate()
+        try:
+            await asyncio.wait_for(process.wait(), _TERMINATE_GRACE_SECONDS)
+        except asyncio.TimeoutError:
+            with contextlib.suppress(ProcessLookupError):
+                process.kill()
+            await process.wait()
+
+
+_executor = None
+
+
+def get_maven_executor() -> MavenExecutor:
+    """Returns the process-wide executor whose semaphore bounds all Maven builds."""
+    global _executor
+    if _executor is None:
+        _executor = MavenExecutor()
+    return _executor
@@ -0,0 +1,157 @@
+import hashlib
+import json
+import os
+import shlex
+import threading
+import time
+
+from .cache import TTLCache
+
+
+# Maven goals whose result depends only on the project sources. Goals that
+# install, deploy or clean have side effects and always run for real.
+CACHEABLE_GOALS = {"validate", "compile", "test-compile", "test", "verify", "dependency:tree"}
+
+# Directories never part of the source fingerprint.
+_IGNORED_DIRS = {"target", ".git", ".idea", ".mvn", "node_modules", "__pycache__"}
+
+_CHUNK_SIZE = 1 << 20
+
+# File digests remembered by FileHashMemo; the least recently used are forgotten first.
+FILE_HASH_MEMO_SIZE = int(os.environ.get("MAVEN_FILE_HASH_MEMO_SIZE", "65536"))
+
+
+def is_cacheable(command: str) -> bool:
+    """True if every goal in the command is side-effect free (flags are ignored)."""
+    goals = [arg for arg in shlex.split(command) if not arg.startswith("-")]
+    return bool(goals) and all(goal in CACHEABLE_GOALS for goal in goals)
+
+
+class FileHashMemo:
+    """Remembers file digests by (path, mtime, size) so unchanged files are not re-read.
+
+    At most `maxsize` paths are remembered, least recently used out first, so
+    a long-running server building many projects does not grow without bound.
+    """
+
+    def __init__(self, maxsize: int = FILE_HASH_MEMO_SIZE):
+        self._digests = TTLCache(maxsize=maxsize, ttl=None)
+
+    def digest(self, path: str) -> str:
+        stat = os.stat(path)
+        key = (path, stat.st_mtime_ns, stat.st_size)
+        cached = self._digests.get(path)
+        if cached and cached[0] == key:
+            return cached[1]
+        h = hashlib.blake2b(digest_size=16)
+        with open(path, "rb") as f:
+            while chunk := f.read(_CHUNK_SIZE):
+                h.update(chunk)
+        digest = h.hexdigest()
+        self._digests.set(path, (key, digest))
+        return digest
+
+
+def _source_files(project_dir: str):
+    """Every pom.xml and every file under a src/ directory, including those of nested modules."""
+    for root, dirs, files in os.walk(project_dir):
+        dirs[:] = sorted(d for d in dirs if d not in _IGNORED_DIRS)
+        in_src = "src" in os.path.relpath(root, project_dir).split(os.sep)
+        for name in sorted(files):
+            if in_src or name == "pom.xml":
+                yield os.path.join(root, name)
+
+
+def project_fingerprint(project_dir: str, memo: FileHashMemo) -> str:
+    """Hashes the pom.xml files and src/ trees of the project and its modules; only files whose mtime or size changed are re-read."""
+    h = hashlib.blake2b(digest_size=16)
+    for path in _source_files(project_dir):
+        h.update(os.path.relpath(path, project_dir).encode())
+        h.update(memo.digest(path).encode())
+    return h.hexdigest()
+
+
+class MavenResultCache:
+    """A size-bounded, content-addressed on-disk cache of Maven results.
+
+    Entries are keyed by the command, the absolute working directory and the
+    project fingerprint, so any change to pom.xml or the sources misses. Each
+    entry is one JSON file; the least recently used entries are evicted once
+    the directory grows past `max_bytes`.
+    """
+
+    def __init__(self, cache_dir: str, *, max_bytes: int = 256 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.memo = FileHashMemo()
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def key(self, command: str, working_dir: str) -> str:
+        working_dir = os.path.abspath(working_dir or os.getcwd())
+        fingerprint = project_fingerprint(working_dir, self.memo)
+        normalized = " ".join(shlex.split(command))
+        return hashlib.sha256(f"{normalized}\0{working_dir}\0{fingerprint}".encode()).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], key + ".json")
+
+    def get(self, key: str):
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                result = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        # Touch the entry so eviction treats it as recently used.
+        now = time.time()
+        os.utime(path, (now, now))
+        return result
+
+    def put(self, key: str, result: dict) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(result, f)
+        os.replace(tmp, path)
+        self._evict()
+
+    def _evict(self) -> None:
+        with self._lock:
+            entries = []
+            total = 0
+            for root, _, files in os.walk(self.cache_dir):
+                for name in files:
+                    if not name.endswith(".json"):
+                        continue
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, path))
+                    total += stat.st_size
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+
+
+_cache = None
+
+
+def get_maven_cache():
+    """Returns the process-wide cache, or None unless MAVEN_CACHE_DIR is set (the cache is opt-in)."""
+    global _cache
+    cache_dir = os.environ.get("MAVEN_CACHE_DIR")
+    if not cache_dir:
+        return None
+    if _cache is None or _cache.cache_dir != cache_dir:
+        max_mb = int(os.environ.get("MAVEN_CACHE_MAX_MB", "256"))
+        _cache = MavenResultCache(cache_dir, max_bytes=max_mb * 1024 * 1024)
+    return _cache
@@ -0,0 +1,147 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from dataclasses import dataclass, field
+
+from google.adk.tools.openapi_tool.openapi_spec_parser.rest_api_tool import to_gemini_schema
+from google.genai import types
+from mcp import StdioServerParameters
+from mcp import types as mcp_types
+
+from . import metrics
+
+
+# Directory of the on-disk manifest cache; empty keeps manifests in memory only.
+MANIFEST_DIR = os.environ.get("MCP_MANIFEST_DIR", ".mcp_manifests")
+
+
+def _file_version(path: str):
+    """mtime and size of a local file, so a rebuilt server script gets a new cache key."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return f"{stat.st_mtime_ns}-{stat.st_size}"
+
+
+def server_key(params: StdioServerParameters) -> str:
+    """Identifies a stdio MCP server by its command, its args and the version of the files they name.
+
+    Any argument that is a file on disk (e.g. `build/index.js`) contributes
+    its mtime and size, so rebuilding the server changes the key without a
+    handshake. The version the server reports is checked after connecting.
+    """
+    args = list(params.args or [])
+    cwd = str(params.cwd) if params.cwd else None
+    files = {arg: _file_version(os.path.join(cwd or "", arg)) for arg in args}
+    identity = {"command": params.command, "args": args, "cwd": cwd,
+                "files": {arg: version for arg, version in files.items() if version}}
+    return hashlib.sha256(json.dumps(identity, sort_keys=True).encode("utf-8")).hexdigest()[:32]
+
+
+@dataclass
+class ToolManifest:
+    """The tools of one MCP server version, with their ADK function declarations already converted."""
+    server_name: str
+    server_version: str
+    tools: list
+    declarations: dict = field(default_factory=dict)
+
+    @classmethod
+    def build(cls, server_info, tools: list) -> "ToolManifest":
+        return cls(
+            server_name=getattr(server_info, "name", "") or "",
+            server_version=getattr(server_info, "version", "") or "",
+            tools=list(tools),
+            declarations={tool.name: types.FunctionDeclaration(name=tool.name,
+                                                               description=tool.description or "",
+                                                               parameters=to_gemini_schema(tool.inputSchema))
+                          for tool in tools},
+        )
+
+    @property
+    def digest(self) -> str:
+        """Changes whenever the server version or any tool schema does."""
+        payload = json.dumps([self.server_version] + [tool.model_dump(mode="json", exclude_none=True)
+                                                      for tool in self.tools], sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+    def to_json(self) -> dict:
+        return {
+            "server_name": self.server_name,
+            "server_version": self.server_version,
+            "tools": [tool.model_dump(mode="json", exclude_none=True) for tool in self.tools],
+            "declarations": {name: declaration.model_dump(mode="json", exclude_none=True)
+                             for name, declaration in self.declarations.items()},
+        }
+
+    @classmethod
+    def from_json(cls, data: dict) -> "ToolManifest":
+        return cls(
+            server_name=data["server_name"],
+            server_version=data["server_version"],
+            tools=[mcp_types.Tool.model_validate(tool) for tool in data["tools"]],
+            declarations={name: types.FunctionDeclaration.model_validate(declaration)
+                          for name, declaration in data["declarations"].items()},
+        )
+
+
+class ManifestCache:
+    """Tool manifests of MCP servers, in memory and as JSON files under `directory`.
+
+    With a cached manifest, ADK tools and their declarations are available
+    before any server process has started; the pool still compares the
+    manifest with what the server reports once it connects.
+    """
+
+    def __init__(self, directory: str = MANIFEST_DIR):
+        self.directory = directory
+        self._entries = {}
+        self._lock = threading.Lock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key: str):
+        with self._lock:
+            manifest = self._entries.get(key)
+        if manifest is None and self.directory:
+            try:
+                with open(self._path(key), "r", encoding="utf-8") as f:
+                    manifest = ToolManifest.from_json(json.load(f))
+            except FileNotFoundError:
+                pass
+            except (ValueError, KeyError) as e:
+                print(f"Ignoring unreadable MCP manifest {self._path(key)}: {e}")
+            if manifest is not None:
+                with self._lock:
+                    self._entries[key] = manifest
+        metrics.inc_counter("mcp_manifest_lookups_total", labels={"result": "hit" if manifest else "miss"},
+                            help="Cached MCP tool manifest lookups, by result.")
+        return manifest
+
+    def put(self, key: str, manifest: ToolManifest) -> None:
+        with self._lock:
+            self._entries[key] = manifest
+        if self.directory:
+            fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(manifest.to_json(), f)
+            os.replace(tmp, self._path(key))
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def get_manifest_cache() -> ManifestCache:
+    """Returns the process-wide manifest cache, stored under MCP_MANIFEST_DIR (default: .mcp_manifests)."""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = ManifestCache(MANIFEST_DIR)
+        return _default_cache
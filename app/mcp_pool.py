@@ -0,0 +1,333 @@
+import asyncio
+import contextlib
+import os
+
+import anyio
+from google.adk.tools.base_tool import BaseTool
+from google.adk.tools.openapi_tool.openapi_spec_parser.rest_api_tool import to_gemini_schema
+from google.genai import types
+from mcp import ClientSession, StdioServerParameters
+from mcp import types as mcp_types
+from mcp.client.stdio import stdio_client
+
+from . import metrics, tracing
+from .memo import memoize_tools
+from .artifacts import offload
+from .mcp_manifest import ManifestCache, ToolManifest, get_manifest_cache, server_key
+
+
+DEFAULT_POOL_SIZE = int(os.environ.get("MCP_POOL_SIZE", "2"))
+DEFAULT_HEALTH_CHECK_INTERVAL = float(os.environ.get("MCP_POOL_HEALTH_INTERVAL", "30"))
+DEFAULT_ACQUIRE_TIMEOUT = float(os.environ.get("MCP_POOL_ACQUIRE_TIMEOUT", "30"))
+
+# Errors raised by a ClientSession whose stdio server went away.
+_CONNECTION_ERRORS = (anyio.ClosedResourceError, anyio.BrokenResourceError, anyio.EndOfStream, ConnectionError)
+
+
+class _PooledConnection:
+    """One warm stdio server process and the ClientSession talking to it.
+
+    The process is owned by a background task so that the stdio transport is
+    entered and exited from the same task, which anyio requires.
+    """
+
+    def __init__(self, params: StdioServerParameters, index: int, on_manifest=None):
+        self.params = params
+        self.index = index
+        self.session = None
+        self.tools = []
+        # Called with the ToolManifest the server reports on connect and on tools/list_changed.
+        self.on_manifest = on_manifest
+        self._server_info = None
+        self._ready = asyncio.Event()
+        self._stop = asyncio.Event()
+        self._task = None
+        self._refresh_task = None
+
+    @property
+    def alive(self) -> bool:
+        return self.session is not None and self._task is not None and not self._task.done()
+
+    @property
+    def starting(self) -> bool:
+        return self._task is not None and not self._task.done() and not self._ready.is_set()
+
+    def spawn(self) -> None:
+        """Starts the server process without waiting for the handshake."""
+        self._ready.clear()
+        self._stop.clear()
+        self._task = asyncio.create_task(self._serve(), name=f"mcp-pool-{self.index}")
+
+    async def wait_ready(self, timeout: float) -> bool:
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            print(f"MCP pool connection {self.index} did not start within {timeout}s.")
+        return self.alive
+
+    async def start(self, timeout: float) -> bool:
+        self.spawn()
+        return await self.wait_ready(timeout)
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._stop.set()
+        with contextlib.suppress(Exception):
+            await asyncio.wait_for(self._task, 5)
+        if not self._task.done():
+            self._task.cancel()
+            with contextlib.suppress(BaseException):
+                await self._task
+        self._task = None
+        self.session = None
+
+    async def ping(self, timeout: float) -> bool:
+        if not self.alive:
+            return False
+        try:
+            await asyncio.wait_for(self.session.send_ping(), timeout)
+            return True
+        except Exception as e:
+            print(f"MCP pool connection {self.index} failed health check: {e}")
+            return False
+
+    async def _serve(self) -> None:
+        try:
+            async with contextlib.AsyncExitStack() as stack:
+                read, write = await stack.enter_async_context(stdio_client(self.params))
+                session = await stack.enter_async_context(ClientSession(read, write,
+                                                                        message_handler=self._on_message))
+                self._server_info = (await session.initialize()).serverInfo
+                self.tools = (await session.list_tools()).tools
+                self._report_manifest()
+                self.session = session
+                self._ready.set()
+                await self._stop.wait()
+        except Exception as e:
+            print(f"MCP pool connection {self.index} stopped: {e}")
+        finally:
+            self.session = None
+            self._ready.set()
+
+    def _report_manifest(self) -> None:
+        if self.on_manifest is not None:
+            self.on_manifest(ToolManifest.build(self._server_info, self.tools))
+
+    async def _on_message(self, message) -> None:
+        # Runs inside the session's receive loop, which must keep reading to
+        # get the list_tools response, so the refresh runs as its own task.
+        if isinstance(getattr(message, "root", message), mcp_types.ToolListChangedNotification):
+            self._refresh_task = asyncio.create_task(self._refresh_tools(), name=f"mcp-pool-{self.index}-tools")
+
+    async def _refresh_tools(self) -> None:
+        try:
+            self.tools = (await self.session.list_tools()).tools
+        except Exception as e:
+            print(f"MCP pool connection {self.index} could not refresh its tools: {e}")
+            return
+        self._report_manifest()
+
+
+class MCPSessionPool:
+    """A bounded pool of warm MCP stdio server sessions.
+
+    `start` spawns `size` server processes up front. Each request leases one
+    session through `session()` (or `call_tool`) and returns it when done, so
+    the number of child processes never exceeds `size`. A background task pings
+    idle sessions and restarts servers that crashed or stopped answering, and
+    `close` shuts every process down.
+
+    The server's tool manifest is cached (see app.mcp_manifest). When it is
+    already known, `start` does not wait for the handshake: tools are served
+    from the manifest while the processes start in the background, and a
+    manifest the server reports differently (new version, or a
+    `tools/list_changed` notification) replaces the cached one.
+    """
+
+    def __init__(self, params: StdioServerParameters, *, size: int = DEFAULT_POOL_SIZE,
+                 health_check_interval: float = DEFAULT_HEALTH_CHECK_INTERVAL,
+                 acquire_timeout: float = DEFAULT_ACQUIRE_TIMEOUT,
+                 manifests: ManifestCache = None):
+        if size < 1:
+            raise ValueError("MCP pool size must be at least 1.")
+        self.params = params
+        self.size = size
+        self.health_check_interval = health_check_interval
+        self.acquire_timeout = acquire_timeout
+        self.manifests = manifests if manifests is not None else get_manifest_cache()
+        self._manifest_key = server_key(params)
+        self.manifest = self.manifests.get(self._manifest_key)
+        self._manifest_digest = self.manifest.digest if self.manifest else None
+        self._tools = None
+        self._connections = [_PooledConnection(params, i, on_manifest=self._on_manifest) for i in range(size)]
+        self._idle = asyncio.Queue()
+        self._health_task = None
+        self._startup_task = None
+        self._closed = False
+
+    async def start(self) -> "MCPSessionPool":
+        for connection in self._connections:
+            connection.spawn()
+            self._idle.put_nowait(connection)
+        if self.manifest is not None:
+            print(f"MCP session pool starting in the background ({len(self.manifest.tools)} tools from the "
+                  f"cached manifest of {self.manifest.server_name} {self.manifest.server_version}).")
+            self._startup_task = asyncio.create_task(self._wait_started(), name="mcp-pool-startup")
+        else:
+            await self._wait_started()
+        if self.health_check_interval > 0:
+            self._health_task = asyncio.create_task(self._health_loop(), name="mcp-pool-health")
+        return self
+
+    async def _wait_started(self) -> None:
+        started = await asyncio.gather(*(c.wait_ready(self.acquire_timeout) for c in self._connections))
+        metrics.set_gauge("mcp_pool_live_sessions", sum(started),
+                          help="MCP stdio sessions currently connected.")
+        print(f"MCP session pool started: {sum(started)}/{self.size} sessions ready.")
+
+    def _on_manifest(self, manifest: ToolManifest) -> None:
+        digest = manifest.digest
+        if digest == self._manifest_digest:
+            return
+        if self.manifest is not None:
+            print(f"MCP tool manifest changed ({self.manifest.server_version} -> {manifest.server_version}); "
+                  f"replacing the cached one.")
+            metrics.inc_counter("mcp_manifest_invalidations_total",
+                                help="Cached MCP tool manifests replaced after the server reported a change.")
+        self.manifest, self._manifest_digest, self._tools = manifest, digest, None
+        self.manifests.put(self._manifest_key, manifest)
+
+    def declaration(self, name: str):
+        """The pre-converted function declaration of a tool in the current manifest."""
+        return self.manifest.declarations.get(name) if self.manifest is not None else None
+
+    def tools(self, cache_tools: dict = None) -> list:
+        """Returns ADK tools for every tool in the server's manifest, backed by this pool.
+
+        The same tool objects are returned until the manifest changes.
+
+        Args:
+            cache_tools (dict, optional): Tool name -> `cacheable(...)` policy for
+                idempotent server tools whose results may be shared across sessions.
+        """
+        if self.manifest is None:
+            return []
+        if self._tools is None:
+            self._tools = [PooledMCPTool(tool, self) for tool in self.manifest.tools]
+        return memoize_tools(self._tools, cache_tools)
+
+    @contextlib.asynccontextmanager
+    async def session(self):
+        """Leases a live ClientSession for the duration of the `async with` block."""
+        if self._closed:
+            raise RuntimeError("MCP session pool is closed.")
+        connection = await asyncio.wait_for(self._idle.get(), self.acquire_timeout)
+        try:
+            if connection.starting:
+                await connection.wait_ready(self.acquire_timeout)
+            if not connection.alive:
+                await self._restart(connection)
+            if not connection.alive:
+                raise ConnectionError(f"MCP server connection {connection.index} is unavailable.")
+            try:
+                yield connection.session
+            except _CONNECTION_ERRORS:
+                await self._restart(connection)
+                raise
+        finally:
+            self._idle.put_nowait(connection)
+
+    async def call_tool(self, name: str, arguments: dict, retries: int = 1):
+        """Calls an MCP tool on a pooled session, retrying once on a dead server."""
+        with tracing.span("mcp.call_tool", tool=name) as s:
+            for attempt in range(retries + 1):
+                try:
+                    async with self.session() as session:
+                        result = await session.call_tool(name, arguments=arguments)
+                    s.set(attempts=attempt + 1, is_error=bool(result.isError))
+                    return result
+                except _CONNECTION_ERRORS:
+                    if attempt == retries:
+                        raise
+
+    async def close(self) -> None:
+        self._closed = True
+        for task in (self._health_task, self._startup_task):
+            if task is not None:
+                task.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await task
+        await asyncio.gather(*(c.stop() for c in self._connections))
+        metrics.set_gauge("mcp_pool_live_sessions", 0)
+        print("MCP session pool closed.")
+
+    async def _restart(self, connection: _PooledConnection) -> None:
+        print(f"Restarting MCP server connection {connection.index}.")
+        metrics.inc_counter("mcp_pool_restarts_total", help="MCP stdio server restarts.")
+        await connection.stop()
+        await connection.start(self.acquire_timeout)
+        self._update_live_gauge()
+
+    def _update_live_gauge(self) -> None:
+        metrics.set_gauge("mcp_pool_live_sessions", sum(c.alive for c in self._connections))
+
+    async def _health_loop(self) -> None:
+        while not self._closed:
+            await asyncio.sleep(self.health_check_interval)
+            # Only idle sessions are checked; leased ones are proving themselves.
+            for _ in range(self._idle.qsize()):
+                try:
+                    connection = self._idle.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+                try:
+                    if connection.starting:
+                        continue
+                    if not await connection.ping(timeout=5):
+                        await self._restart(connection)
+                finally:
+                    self._idle.put_nowait(connection)
+            self._update_live_gauge()
+
+
+class PooledMCPTool(BaseTool):
+    """An ADK tool that runs an MCP tool on whichever pooled session is free.
+
+    Agents hold on to these for the lifetime of the process, while the actual
+    server sessions behind them are leased per call and may be restarted.
+    """
+
+    def __init__(self, mcp_tool, pool: MCPSessionPool):
+        super().__init__(name=mcp_tool.name, description=mcp_tool.description or "")
+        self.mcp_tool = mcp_tool
+        self._pool = pool
+
+    def _get_declaration(self) -> types.FunctionDeclaration:
+        declaration = self._pool.declaration(self.name)
+        if declaration is not None:
+            return declaration
+        return types.FunctionDeclaration(
+            name=self.name,
+            description=self.description,
+            parameters=to_gemini_schema(self.mcp_tool.inputSchema),
+        )
+
+    async def run_async(self, *, args, tool_context):
+        return await self.finish_async(await self.fetch_async(args=args), tool_context=tool_context)
+
+    async def fetch_async(self, *, args) -> dict:
+        """Calls the tool; the payload depends on `args` only, so it may be cached."""
+        result = await self._pool.call_tool(self.name, args)
+        return result.model_dump(exclude_none=True)
+
+    async def finish_async(self, payload: dict, *, tool_context) -> dict:
+        # Long text results go to the artifact service of the calling session;
+        # the agent gets a handle and a preview.
+        for part in payload.get("content", []):
+            if part.get("type") == "text":
+                handle = await offload(tool_context, self.name, part.get("text"))
+                if handle:
+                    part.pop("text")
+                    part.update(type="artifact", **handle)
+        return payload
@@ -0,0 +1,185 @@
+import asyncio
+import copy
+import inspect
+import json
+import os
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+from google.adk.tools.base_tool import BaseTool
+from google.adk.tools.function_tool import FunctionTool
+
+from .cache import TTLCache
+from . import metrics
+
+
+DEFAULT_TTL = float(os.environ.get("TOOL_CACHE_TTL", "300"))
+DEFAULT_MAXSIZE = int(os.environ.get("TOOL_CACHE_MAXSIZE", "1024"))
+
+_MISSING = object()
+
+
+def default_key(args: dict):
+    """Identifies a call by its arguments, independent of their order."""
+    return json.dumps(args, sort_keys=True, default=str)
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    """How the results of one idempotent tool are memoized.
+
+    Use it as a decorator to mark a tool function (`@cacheable(ttl=60)`) or
+    pass it by tool name in `createAgent(cacheTools=...)` /
+    `MCPSessionPool.tools(cache_tools=...)`.
+    """
+    ttl: Optional[float] = DEFAULT_TTL
+    key: Callable[[dict], Any] = default_key
+    maxsize: int = DEFAULT_MAXSIZE
+
+    def __call__(self, func):
+        func.__tool_cache__ = self
+        return func
+
+
+def cacheable(*, ttl: float = DEFAULT_TTL, key: Callable[[dict], Any] = None, maxsize: int = DEFAULT_MAXSIZE) -> CachePolicy:
+    """Declares a tool cacheable.
+
+    Args:
+        ttl (float): Seconds a result is reused; None keeps it until evicted by size.
+        key (callable, optional): `key(args)` returning a hashable cache key. Arguments
+            that do not change the result (e.g. letter case) can be normalized here.
+        maxsize (int): Results kept for this tool, least recently used out first.
+    """
+    return CachePolicy(ttl=ttl, key=key or default_key, maxsize=maxsize)
+
+
+# One cache per tool name, shared by every agent (and every rebuild of the
+# graph) in the process, so identical calls from different sessions hit it.
+_caches: dict = {}
+_inflight: dict = {}
+
+
+def get_tool_cache(name: str, policy: CachePolicy) -> TTLCache:
+    cache = _caches.get(name)
+    if cache is None:
+        cache = _caches[name] = TTLCache(maxsize=policy.maxsize, ttl=policy.ttl)
+    return cache
+
+
+def clear_tool_caches() -> None:
+    for cache in _caches.values():
+        cache.clear()
+
+
+def _is_error(result) -> bool:
+    if isinstance(result, dict):
+        return result.get("status") == "error" or bool(result.get("isError"))
+    return False
+
+
+class MemoizedTool(BaseTool):
+    """Serves repeated calls of an idempotent tool from a shared TTL/LRU cache.
+
+    Concurrent calls with the same key share one execution: the first caller
+    runs the tool, the others await its result. If that first caller is
+    cancelled, one of the waiters runs the tool instead. Error results are
+    not cached.
+
+    A tool that finishes its result for the calling session (e.g. offloads it
+    to that session's artifacts) defines `fetch_async(*, args)` and
+    `finish_async(result, *, tool_context)`: only what `fetch_async` returns is
+    cached, and `finish_async` runs on every call, hit or miss.
+    """
+
+    def __init__(self, tool: BaseTool, policy: CachePolicy):
+        super().__init__(name=tool.name, description=tool.description, is_long_running=tool.is_long_running)
+        self.tool = tool
+        self.policy = policy
+        self.cache = get_tool_cache(tool.name, policy)
+        self._finish = getattr(tool, "finish_async", None)
+
+    async def _fetch(self, args, tool_context):
+        if self._finish is None:
+            return await self.tool.run_async(args=args, tool_context=tool_context)
+        return await self.tool.fetch_async(args=args)
+
+    async def _deliver(self, result, tool_context):
+        result = copy.deepcopy(result)
+        if self._finish is None:
+            return result
+        return await self._finish(result, tool_context=tool_context)
+
+    def _get_declaration(self):
+        return self.tool._get_declaration()
+
+    async def run_async(self, *, args, tool_context):
+        labels = {"tool": self.name}
+        key = (self.name, self.policy.key(args))
+        while True:
+            result = self.cache.get(key, _MISSING)
+            if result is not _MISSING:
+                metrics.inc_counter("tool_cache_hits_total", labels=labels,
+                                    help="Tool calls served from the tool cache.")
+                return await self._deliver(result, tool_context)
+
+            pending = _inflight.get(key)
+            if pending is None:
+                break
+            metrics.inc_counter("tool_cache_coalesced_total", labels=labels,
+                                help="Tool calls that waited for an identical call already running.")
+            # asyncio.wait neither raises nor cancels when `pending` is cancelled,
+            # but still raises if this caller itself is.
+            await asyncio.wait((pending,))
+            if not pending.cancelled():
+                return await self._deliver(pending.result(), tool_context)
+            # The leader was cancelled: look again, and run the tool ourselves
+            # unless another waiter got there first.
+
+        metrics.inc_counter("tool_cache_misses_total", labels=labels, help="Tool calls that ran the tool.")
+        future = _inflight[key] = asyncio.get_running_loop().create_future()
+        try:
+            result = await self._fetch(args, tool_context)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # waiters re-raise it; nobody else needs to retrieve it
+            raise
+        else:
+            if not _is_error(result):
+                self.cache.set(key, result)
+            future.set_result(result)
+        finally:
+            _inflight.pop(key, None)
+        return await self._deliver(result, tool_context)
+
+
+def _takes_tool_context(tool) -> bool:
+    func = getattr(tool, "func", tool)
+    try:
+        return "tool_context" in inspect.signature(func).parameters
+    except (TypeError, ValueError):
+        return False
+
+
+def memoize_tools(tools: list, policies: dict = None) -> list:
+    """Wraps every tool that has a cache policy in a MemoizedTool.
+
+    A tool's policy comes from `policies` (tool name -> CachePolicy) or from
+    the `@cacheable` decorator on its function. Tools reading or writing session
+    state through `tool_context` are not idempotent and cannot be cached; see
+    MemoizedTool for tools that only finish their result with it.
+    """
+    policies = policies or {}
+    wrapped = []
+    for tool in tools:
+        name = getattr(tool, "name", None) or getattr(tool, "__name__", None)
+        policy = policies.get(name) or getattr(tool, "__tool_cache__", None)
+        if policy is None or isinstance(tool, MemoizedTool):
+            wrapped.append(tool)
+            continue
+        if _takes_tool_context(tool):
+            raise ValueError(f"Tool '{name}' uses tool_context and cannot be cached.")
+        wrapped.append(MemoizedTool(tool if isinstance(tool, BaseTool) else FunctionTool(tool), policy))
+    return wrapped
@@ -0,0 +1,93 @@
+import threading
+
+
+# Process-wide metric values, keyed by (name, sorted label items).
+_lock = threading.Lock()
+_gauges = {}
+_counters = {}
+_histograms = {}
+_help = {}
+
+# Default histogram buckets, in seconds.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+def _key(name, labels):
+    return name, tuple(sorted((labels or {}).items()))
+
+
+def set_gauge(name: str, value: float, labels: dict = None, help: str = "") -> None:
+    """Sets a gauge to an absolute value (e.g. the last agent graph build time)."""
+    with _lock:
+        _gauges[_key(name, labels)] = float(value)
+        if help:
+            _help[name] = help
+
+
+def inc_counter(name: str, value: float = 1, labels: dict = None, help: str = "") -> None:
+    """Increments a monotonically increasing counter."""
+    with _lock:
+        key = _key(name, labels)
+        _counters[key] = _counters.get(key, 0.0) + value
+        if help:
+            _help[name] = help
+
+
+def observe(name: str, value: float, labels: dict = None, buckets=DEFAULT_BUCKETS, help: str = "") -> None:
+    """Records one observation (e.g. a span duration) in a cumulative histogram."""
+    with _lock:
+        key = _key(name, labels)
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = {"buckets": tuple(buckets), "counts": [0] * len(buckets), "sum": 0.0, "count": 0}
+        for i, bound in enumerate(histogram["buckets"]):
+            if value <= bound:
+                histogram["counts"][i] += 1
+        histogram["sum"] += value
+        histogram["count"] += 1
+        if help:
+            _help[name] = help
+
+
+def get_value(name: str, labels: dict = None):
+    """Returns the current value of a gauge or counter, or None if unset."""
+    key = _key(name, labels)
+    with _lock:
+        if key in _gauges:
+            return _gauges[key]
+        return _counters.get(key)
+
+
+def _format_labels(labels) -> str:
+    if not labels:
+        return ""
+    inner = ",".join(f'{k}="{v}"' for k, v in labels)
+    return "{" + inner + "}"
+
+
+def render() -> str:
+    """Renders every metric in the Prometheus text exposition format."""
+    lines = []
+    with _lock:
+        for kind, values in (("gauge", _gauges), ("counter", _counters)):
+            seen = set()
+            for (name, labels), value in sorted(values.items()):
+                if name not in seen:
+                    seen.add(name)
+                    if name in _help:
+                        lines.append(f"# HELP {name} {_help[name]}")
+                    lines.append(f"# TYPE {name} {kind}")
+                lines.append(f"{name}{_format_labels(labels)} {value}")
+        seen = set()
+        for (name, labels), histogram in sorted(_histograms.items()):
+            if name not in seen:
+                seen.add(name)
+                if name in _help:
+                    lines.append(f"# HELP {name} {_help[name]}")
+                lines.append(f"# TYPE {name} histogram")
+            for bound, count in zip(histogram["buckets"], histogram["counts"]):
+                lines.append(f"{name}_bucket{_format_labels(labels + (('le', bound),))} {count}")
+            lines.append(f"{name}_bucket{_format_labels(labels + (('le', '+Inf'),))} {histogram['count']}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {histogram['sum']}")
+            lines.append(f"{name}_count{_format_labels(labels)} {histogram['count']}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,140 @@
+import asyncio
+import importlib.util
+import os
+import threading
+import time
+from functools import cached_property
+
+import httpx
+import litellm
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.google_llm import Gemini
+from google.adk.models.lite_llm import LiteLlm
+from google.adk.models.registry import LLMRegistry
+from google.genai import Client, types
+
+from . import metrics
+
+
+MAX_CONNECTIONS = int(os.environ.get("MODEL_HTTP_MAX_CONNECTIONS", "100"))
+MAX_KEEPALIVE = int(os.environ.get("MODEL_HTTP_MAX_KEEPALIVE", "20"))
+KEEPALIVE_EXPIRY = float(os.environ.get("MODEL_HTTP_KEEPALIVE_EXPIRY", "120"))
+TIMEOUT = float(os.environ.get("MODEL_HTTP_TIMEOUT", "120"))
+# HTTP/2 multiplexes concurrent calls over one connection per provider, but
+# httpx only speaks it with the optional h2 package installed.
+HTTP2 = importlib.util.find_spec("h2") is not None
+
+# LiteLLM provider hosts contacted at startup so the first turn does not pay
+# for DNS, TCP and TLS.
+PROVIDER_HOSTS = {
+    "openai": "https://api.openai.com",
+    "anthropic": "https://api.anthropic.com",
+}
+
+_lock = threading.Lock()
+_llms: dict = {}
+_http_client = None
+
+
+def http_client_args() -> dict:
+    return {
+        "http2": HTTP2,
+        "timeout": TIMEOUT,
+        "limits": httpx.Limits(max_connections=MAX_CONNECTIONS,
+                               max_keepalive_connections=MAX_KEEPALIVE,
+                               keepalive_expiry=KEEPALIVE_EXPIRY),
+    }
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """The process-wide keep-alive client used for LiteLLM providers and warm-up."""
+    global _http_client
+    with _lock:
+        if _http_client is None or _http_client.is_closed:
+            _http_client = httpx.AsyncClient(**http_client_args())
+            litellm.aclient_session = _http_client
+        return _http_client
+
+
+class PooledGemini(Gemini):
+    """A Gemini model whose google-genai client uses the shared pool limits.
+
+    Older google-genai releases cannot take httpx client arguments; there the
+    client is still shared (one per model), just with its default limits.
+    """
+
+    @cached_property
+    def api_client(self) -> Client:
+        options = {"headers": getattr(self, "_tracking_headers", None)}
+        if "async_client_args" in types.HttpOptions.model_fields:
+            options["async_client_args"] = http_client_args()
+        return Client(http_options=types.HttpOptions(**options))
+
+
+def get_llm(model):
+    """Returns the shared model client for `model`.
+
+    ADK builds a brand-new client (and with it a new connection pool) every
+    time an agent configured with a model *name* is called. Agents built with
+    the instance returned here share one client per model instead, so
+    connections stay open across calls, agents and turns.
+    """
+    if isinstance(model, BaseLlm) or not model:
+        return model
+    with _lock:
+        llm = _llms.get(model)
+        if llm is None:
+            if "/" in model:
+                # Provider-prefixed names go through LiteLLM (OpenAI, Anthropic, ...).
+                llm = LiteLlm(model=model)
+            else:
+                try:
+                    llm_class = LLMRegistry.resolve(model)
+                except ValueError:
+                    # Not registered (yet): leave it to ADK to resolve at call time.
+                    return model
+                llm = PooledGemini(model=model) if llm_class is Gemini else llm_class(model=model)
+            _llms[model] = llm
+    if isinstance(llm, LiteLlm):
+        get_http_client()
+    return llm
+
+
+async def _warm(provider: str, request) -> None:
+    started = time.perf_counter()
+    try:
+        await request
+    except Exception as e:
+        print(f"Model client warm-up for '{provider}' failed: {e}")
+        return
+    metrics.set_gauge("model_client_warmup_seconds", time.perf_counter() - started,
+                      labels={"provider": provider},
+                      help="Time taken to open the first connection to a model provider.")
+
+
+async def warm_up(models, timeout: float = 5) -> None:
+    """Opens keep-alive connections to the providers of `models` ahead of the first request.
+
+    Any response, even 401 or 404, leaves a connection in the pool; failures
+    are only reported, since the provider may simply be unreachable from here.
+    """
+    requests = {}
+    for model in models:
+        llm = get_llm(model)
+        if isinstance(llm, LiteLlm):
+            provider = llm.model.split("/", 1)[0]
+            if provider in PROVIDER_HOSTS and provider not in requests:
+                requests[provider] = get_http_client().head(PROVIDER_HOSTS[provider], timeout=timeout)
+        elif isinstance(llm, Gemini) and llm.model not in requests:
+            # Model metadata is free to read and goes through the same client as generation.
+            requests[llm.model] = asyncio.wait_for(llm.api_client.aio.models.get(model=llm.model), timeout)
+    await asyncio.gather(*(_warm(provider, request) for provider, request in requests.items()))
+
+
+async def close() -> None:
+    global _http_client
+    with _lock:
+        client, _http_client = _http_client, None
+        _llms.clear()
+    if client is not None:
+        await client.aclose()
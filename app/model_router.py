@@ -0,0 +1,309 @@
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import os
+import random
+import threading
+import time
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from typing import AsyncGenerator
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+from pydantic import ConfigDict
+
+from .fake_model import ScriptedLlm
+from .model_clients import get_llm
+from .models import MODEL_CLAUDE_SONNET, MODEL_GEMINI_2_0_FLASH, MODEL_GEMINI_2_0_FLASH_LITE, MODEL_GPT_4O
+from . import metrics
+
+
+# TEAM_MODEL value that routes every agent through the ModelRouter.
+MODEL_ROUTED = "routed"
+
+ROLE_ROUTER = "router"
+ROLE_GREETER = "greeter"
+ROLE_FAREWELL = "farewell"
+ROLE_MAVEN = "maven"
+ROLE_FIX_VULNERABILITY = "fix_vulnerability"
+
+# Models each role may use, cheapest first.
+DEFAULT_CANDIDATES = {
+    ROLE_ROUTER: [MODEL_GEMINI_2_0_FLASH, MODEL_GPT_4O, MODEL_CLAUDE_SONNET],
+    ROLE_GREETER: [MODEL_GEMINI_2_0_FLASH_LITE, MODEL_GEMINI_2_0_FLASH],
+    ROLE_FAREWELL: [MODEL_GEMINI_2_0_FLASH_LITE, MODEL_GEMINI_2_0_FLASH],
+    ROLE_MAVEN: [MODEL_GEMINI_2_0_FLASH, MODEL_GPT_4O],
+    ROLE_FIX_VULNERABILITY: [MODEL_CLAUDE_SONNET, MODEL_GPT_4O, MODEL_GEMINI_2_0_FLASH],
+}
+
+# Trivial roles always get the cheap, fast model.
+DEFAULT_PINS = {
+    ROLE_GREETER: MODEL_GEMINI_2_0_FLASH_LITE,
+    ROLE_FAREWELL: MODEL_GEMINI_2_0_FLASH_LITE,
+}
+
+# Approximate USD per million input tokens.
+DEFAULT_COSTS = {
+    MODEL_GEMINI_2_0_FLASH_LITE: 0.075,
+    MODEL_GEMINI_2_0_FLASH: 0.10,
+    MODEL_GPT_4O: 2.50,
+    MODEL_CLAUDE_SONNET: 3.00,
+}
+
+
+@dataclass
+class LatencyProfile:
+    """Synthetic behaviour of a model in simulator mode: log-normal latency plus random errors."""
+    median: float
+    p95: float
+    error_rate: float = 0.0
+
+    def sample(self, rng: random.Random) -> float:
+        sigma = math.log(self.p95 / self.median) / 1.645 if self.p95 > self.median else 0.0
+        return rng.lognormvariate(math.log(self.median), sigma)
+
+
+DEFAULT_PROFILES = {
+    MODEL_GEMINI_2_0_FLASH_LITE: LatencyProfile(median=0.35, p95=0.8, error_rate=0.01),
+    MODEL_GEMINI_2_0_FLASH: LatencyProfile(median=0.5, p95=1.2, error_rate=0.01),
+    MODEL_GPT_4O: LatencyProfile(median=0.9, p95=2.5, error_rate=0.02),
+    MODEL_CLAUDE_SONNET: LatencyProfile(median=1.2, p95=3.0, error_rate=0.02),
+}
+
+
+class ModelStats:
+    """Latency and errors of the last `window` calls of one model."""
+
+    def __init__(self, window: int = 100):
+        self._calls = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, latency: float, error: bool) -> None:
+        with self._lock:
+            self._calls.append((latency, error))
+
+    @property
+    def count(self) -> int:
+        return len(self._calls)
+
+    def latency_quantile(self, q: float):
+        with self._lock:
+            latencies = sorted(latency for latency, error in self._calls if not error)
+        if not latencies:
+            return None
+        return latencies[min(len(latencies) - 1, int(len(latencies) * q))]
+
+    @property
+    def error_rate(self) -> float:
+        with self._lock:
+            calls = list(self._calls)
+        return sum(error for _, error in calls) / len(calls) if calls else 0.0
+
+
+@dataclass
+class RoutingPolicy:
+    """Scores a candidate model; the lowest score wins.
+
+    score = latency_weight * p95 latency (s) + error_weight * error rate
+            + cost_weight * cost (USD per million tokens)
+
+    Until a model has `min_samples` calls it is tried in turn, and with
+    probability `explore` any candidate is picked at random, so the stats of
+    models that are not currently winning stay fresh.
+    """
+    latency_weight: float = 1.0
+    error_weight: float = 10.0
+    cost_weight: float = 0.2
+    min_samples: int = 5
+    explore: float = 0.05
+
+    def score(self, stats: ModelStats, cost: float) -> float:
+        p95 = stats.latency_quantile(0.95)
+        if p95 is None:
+            p95 = float("inf") if stats.count else 0.0
+        return self.latency_weight * p95 + self.error_weight * stats.error_rate + self.cost_weight * cost
+
+
+@dataclass
+class ModelRouter:
+    """Picks a model for each agent role from rolling measurements of every model."""
+    candidates: dict = field(default_factory=lambda: dict(DEFAULT_CANDIDATES))
+    pins: dict = field(default_factory=lambda: dict(DEFAULT_PINS))
+    costs: dict = field(default_factory=lambda: dict(DEFAULT_COSTS))
+    policy: RoutingPolicy = field(default_factory=RoutingPolicy)
+    window: int = 100
+    # Simulator mode: models are replaced by ScriptedLlm with synthetic latency and errors.
+    simulate: bool = False
+    profiles: dict = field(default_factory=lambda: dict(DEFAULT_PROFILES))
+    seed: int = None
+
+    def __post_init__(self):
+        self._stats = {}
+        self._lock = threading.Lock()
+        self._rng = random.Random(self.seed)
+        self._round_robin = {}
+
+    def stats(self, model: str) -> ModelStats:
+        with self._lock:
+            if model not in self._stats:
+                self._stats[model] = ModelStats(self.window)
+            return self._stats[model]
+
+    def choose(self, role: str) -> str:
+        if role in self.pins:
+            return self.pins[role]
+        candidates = self.candidates.get(role) or [MODEL_GEMINI_2_0_FLASH]
+        if len(candidates) == 1:
+            return candidates[0]
+        cold = [m for m in candidates if self.stats(m).count < self.policy.min_samples]
+        if cold:
+            counter = self._round_robin.setdefault(role, itertools.count())
+            return cold[next(counter) % len(cold)]
+        if self._rng.random() < self.policy.explore:
+            return self._rng.choice(candidates)
+        return min(candidates, key=lambda m: self.policy.score(self.stats(m), self.costs.get(m, 0.0)))
+
+    def record(self, role: str, model: str, latency: float, error: bool) -> None:
+        self.stats(model).record(latency, error)
+        labels = {"role": role, "model": model}
+        metrics.observe("model_call_seconds", latency, labels=labels, help="Duration of routed model calls.")
+        if error:
+            metrics.inc_counter("model_call_errors_total", labels=labels, help="Routed model calls that failed.")
+
+    def client_for(self, model: str) -> BaseLlm:
+        if self.simulate:
+            return SimulatedLlm(model=model, profile=self.profiles.get(model, LatencyProfile(0.5, 1.0)), rng=self._rng)
+        llm = get_llm(model)
+        if not isinstance(llm, BaseLlm):
+            raise ValueError(f"Model '{model}' is not registered with ADK.")
+        return llm
+
+    def models(self) -> list:
+        """Every model the router may pick (none in simulator mode, where nothing is called)."""
+        if self.simulate:
+            return []
+        names = {m for models in self.candidates.values() for m in models} | set(self.pins.values())
+        return sorted(names)
+
+    def llm_for(self, role: str) -> "RoutedLlm":
+        return RoutedLlm(model=f"{MODEL_ROUTED}:{role}", role=role, router=self)
+
+    def summary(self) -> dict:
+        return {model: {"calls": s.count,
+                        "p50": s.latency_quantile(0.5),
+                        "p95": s.latency_quantile(0.95),
+                        "error_rate": round(s.error_rate, 3)}
+                for model, s in sorted(self._stats.items())}
+
+
+class SimulationError(RuntimeError):
+    """A synthetic provider failure raised in simulator mode."""
+
+
+class SimulatedLlm(ScriptedLlm):
+    """Scripted responses with latency and errors drawn from a LatencyProfile."""
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    profile: LatencyProfile
+    rng: random.Random
+
+    async def generate_content_async(self, llm_request: LlmRequest, stream: bool = False) -> AsyncGenerator[LlmResponse, None]:
+        await asyncio.sleep(self.profile.sample(self.rng))
+        if self.rng.random() < self.profile.error_rate:
+            raise SimulationError(f"Simulated failure of {self.model}.")
+        async for response in super().generate_content_async(llm_request, stream):
+            yield response
+
+
+class RoutedLlm(BaseLlm):
+    """Model of one agent role: each call goes to the model the router picks at that moment."""
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    role: str
+    router: ModelRouter
+
+    async def generate_content_async(self, llm_request: LlmRequest, stream: bool = False) -> AsyncGenerator[LlmResponse, None]:
+        model = self.router.choose(self.role)
+        llm = self.router.client_for(model)
+        llm_request.model = model
+        started = time.perf_counter()
+        try:
+            async for response in llm.generate_content_async(llm_request, stream):
+                yield response
+        except Exception:
+            self.router.record(self.role, model, time.perf_counter() - started, error=True)
+            raise
+        self.router.record(self.role, model, time.perf_counter() - started, error=False)
+
+
+def _router_from_env() -> ModelRouter:
+    """Reads MODEL_ROUTER_CONFIG (a JSON file with candidates/pins/costs) and MODEL_ROUTER_SIMULATE."""
+    config = {}
+    path = os.environ.get("MODEL_ROUTER_CONFIG")
+    if path:
+        with open(path, "r", encoding="utf-8") as f:
+            config = json.load(f)
+    return ModelRouter(
+        candidates=config.get("candidates", dict(DEFAULT_CANDIDATES)),
+        pins=config.get("pins", dict(DEFAULT_PINS)),
+        costs=config.get("costs", dict(DEFAULT_COSTS)),
+        simulate=os.environ.get("MODEL_ROUTER_SIMULATE", "0") == "1",
+    )
+
+
+_router = None
+
+
+def get_router() -> ModelRouter:
+    global _router
+    if _router is None:
+        _router = _router_from_env()
+    return _router
+
+
+def routed_model(model, role: str):
+    """Returns the role's RoutedLlm when `model` is MODEL_ROUTED, otherwise `model` unchanged."""
+    return get_router().llm_for(role) if model == MODEL_ROUTED else model
+
+
+async def simulate(router: ModelRouter, roles: list, calls: int) -> dict:
+    """Runs `calls` calls per role, one after another, and returns how many each model got."""
+    async def one(role) -> str:
+        request = LlmRequest(contents=[types.Content(role="user", parts=[types.Part(text="hi")])])
+        try:
+            async for _ in router.llm_for(role).generate_content_async(request):
+                pass
+        except SimulationError:
+            pass
+        return request.model  # set by RoutedLlm to the model it chose
+
+    # Counted here rather than from router.stats(), whose window only holds
+    # the most recent samples of each model.
+    mix = {}
+    for role in roles:
+        routed = Counter()
+        for _ in range(calls):
+            routed[await one(role)] += 1
+        mix[role] = {m: routed[m] for m in router.candidates.get(role, [])}
+    return mix
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the model router against synthetic latency distributions.")
+    parser.add_argument("--calls", type=int, default=200, help="Calls per role.")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    # Time runs 100x faster than in the profiles; the latency weight compensates.
+    router = ModelRouter(simulate=True, seed=args.seed, policy=RoutingPolicy(latency_weight=100.0),
+                         profiles={m: LatencyProfile(p.median / 100, p.p95 / 100, p.error_rate)
+                                   for m, p in DEFAULT_PROFILES.items()})
+    mix = asyncio.run(simulate(router, list(DEFAULT_CANDIDATES), args.calls))
+    print(json.dumps({"mix": mix, "stats": router.summary()}, indent=2))
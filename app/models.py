@@ -1,8 +1,13 @@
 
 MODEL_GEMINI_2_0_FLASH = "gemini-2.0-flash"
+MODEL_GEMINI_2_0_FLASH_LITE = "gemini-2.0-flash-lite"
 MODEL_GPT_4O = "openai/gpt-4o"
 MODEL_CLAUDE_SONNET = "anthropic/claude-3-7-sonnet-latest"
 
 
-def get_model():
-    return "gemini-2.0-flash"
+def get_model(role=None):
+    """Returns the default model, or the routed model of an agent role (see app.model_router)."""
+    if role is None:
+        return MODEL_GEMINI_2_0_FLASH
+    from .model_router import get_router
+    return get_router().llm_for(role)
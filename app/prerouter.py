@@ -0,0 +1,129 @@
+import inspect
+import os
+import re
+import uuid
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+from google.adk.events.event import Event
+from google.genai import types
+
+from . import metrics
+
+
+DEFAULT_THRESHOLD = float(os.environ.get("PREROUTER_THRESHOLD", "0.9"))
+
+_WORD_CHARS = re.compile(r"\w")
+
+
+@dataclass
+class IntentRule:
+    """A deterministic rule that recognises a trivial intent for one sub-agent.
+
+    Attributes:
+        agent: Name of the sub-agent the intent belongs to.
+        tool: The tool that sub-agent would call; invoked directly on a match.
+        patterns: Regexes matched at the start of the message (case-insensitive).
+            Named groups become tool arguments.
+        confidence: Confidence of a match that covers the whole message. A
+            partial match is scaled by the share of the message's word
+            characters it covers, so "hi, I'm lost" scores far below "hi".
+        max_words: Messages longer than this are never treated as trivial.
+    """
+    agent: str
+    tool: Callable
+    patterns: list[str]
+    confidence: float = 0.95
+    max_words: int = 8
+    _compiled: list = field(default=None, init=False, repr=False)
+
+    def prefix(self, text: str) -> Optional[re.Match]:
+        """The longest non-empty match of any pattern at the start of `text`."""
+        if self._compiled is None:
+            self._compiled = [re.compile(p, re.IGNORECASE) for p in self.patterns]
+        best = None
+        for pattern in self._compiled:
+            m = pattern.match(text)
+            if m and m.end() > 0 and (best is None or m.end() > best.end()):
+                best = m
+        return best
+
+    @staticmethod
+    def arguments(m: re.Match) -> dict:
+        return {k: v for k, v in m.groupdict().items() if v}
+
+    def match(self, text: str) -> Optional[tuple[dict, float]]:
+        """Returns the tool arguments and the confidence of the best pattern, or None."""
+        text = text.strip()
+        if len(text.split()) > self.max_words:
+            return None
+        total = len(_WORD_CHARS.findall(text))
+        m = self.prefix(text)
+        if m is None or not total:
+            return None
+        return self.arguments(m), self.confidence * len(_WORD_CHARS.findall(m.group(0))) / total
+
+
+@dataclass
+class IntentMatch:
+    rule: IntentRule
+    args: dict
+    confidence: float
+
+
+class PreRouter:
+    """Answers trivial turns locally before they reach the root LLM.
+
+    A message that an IntentRule matches with a confidence at or above
+    `threshold` is answered by calling the rule's tool directly, skipping both
+    the root agent's routing call and the sub-agent's tool-calling call.
+    Anything else falls through to the normal LLM router.
+    """
+
+    def __init__(self, rules: list[IntentRule], *, threshold: float = DEFAULT_THRESHOLD):
+        self.rules = list(rules)
+        self.threshold = threshold
+
+    def classify(self, text: str) -> Optional[IntentMatch]:
+        best = None
+        for rule in self.rules:
+            matched = rule.match(text)
+            if matched is not None and (best is None or matched[1] > best.confidence):
+                best = IntentMatch(rule=rule, args=matched[0], confidence=matched[1])
+        if best is None or best.confidence < self.threshold:
+            return None
+        return best
+
+    async def try_dispatch(self, query: str, *, session_service, app_name: str, user_id: str, session_id: str) -> Optional[str]:
+        """Answers the query locally if it is a trivial intent; returns None to fall through.
+
+        On a match, the user message and the reply are appended to the session
+        so the conversation history looks the same as an LLM-routed turn.
+        """
+        match = self.classify(query)
+        if match is None:
+            metrics.inc_counter("prerouter_turns_total", labels={"outcome": "fallthrough"},
+                                help="Turns seen by the local pre-router.")
+            return None
+
+        result = match.rule.tool(**match.args)
+        if inspect.isawaitable(result):
+            result = await result
+        reply = result if isinstance(result, str) else str(result)
+        print(f"--- PreRouter: '{query}' handled by {match.rule.agent} (confidence {match.confidence:.2f}) ---")
+        metrics.inc_counter("prerouter_turns_total", labels={"outcome": match.rule.agent})
+
+        session = session_service.get_session(app_name=app_name, user_id=user_id, session_id=session_id)
+        if session is not None:
+            invocation_id = "e-" + str(uuid.uuid4())
+            session_service.append_event(session, Event(
+                invocation_id=invocation_id,
+                author="user",
+                content=types.Content(role="user", parts=[types.Part(text=query)]),
+            ))
+            session_service.append_event(session, Event(
+                invocation_id=invocation_id,
+                author=match.rule.agent,
+                content=types.Content(role="model", parts=[types.Part(text=reply)]),
+            ))
+        return reply
@@ -0,0 +1,88 @@
+import asyncio
+import time
+
+from .runner import get_runner
+from . import metrics
+
+
+def _tool_name(tool):
+    return getattr(tool, "name", None) or getattr(tool, "__name__", None) or repr(tool)
+
+
+def fingerprint(*, model, tools) -> tuple:
+    """Identifies an agent graph configuration.
+
+    Two configurations with the same model and the same set of tool names build
+    identical graphs, so the registry only rebuilds when this value changes.
+    """
+    model_id = getattr(model, "model", model)
+    return str(model_id), tuple(sorted(_tool_name(t) for t in tools or []))
+
+
+class AgentRegistry:
+    """Holds the agent graph and its Runner so they are built once and reused.
+
+    The graph is built during application startup and shared by every request.
+    Calling `ensure` with a new model or tool set builds a fresh graph off to the
+    side and swaps it in atomically; requests already running keep the runner
+    they started with.
+    """
+
+    def __init__(self, *, app_name, builder, session_service, fanout_builder=None):
+        """
+        Args:
+            app_name (str): The ADK application name used by the Runner.
+            builder (callable): `builder(model=..., mcp_tools=...)` returning the root agent.
+            session_service: The session service shared by every runner built.
+            fanout_builder (callable, optional): `fanout_builder(model=..., mcp_tools=...,
+                session_service=..., app_name=...)` returning a FanoutOrchestrator that
+                is rebuilt together with the graph.
+        """
+        self.app_name = app_name
+        self.session_service = session_service
+        self._builder = builder
+        self._fanout_builder = fanout_builder
+        self.fanout = None
+        self._lock = asyncio.Lock()
+        self._fingerprint = None
+        self._runner = None
+        self.build_seconds = None
+        self.build_count = 0
+
+    @property
+    def runner(self):
+        if self._runner is None:
+            raise RuntimeError("Agent graph has not been built yet.")
+        return self._runner
+
+    @property
+    def root_agent(self):
+        return self.runner.agent
+
+    async def ensure(self, *, model, tools=None):
+        """Returns a runner for the given configuration, building it only if it changed."""
+        key = fingerprint(model=model, tools=tools)
+        if key == self._fingerprint and self._runner is not None:
+            return self._runner
+        async with self._lock:
+            if key != self._fingerprint or self._runner is None:
+                self._runner = self._build(model=model, tools=tools)
+                self._fingerprint = key
+            return self._runner
+
+    def _build(self, *, model, tools):
+        started = time.perf_counter()
+        root_agent = self._builder(model=model, mcp_tools=tools)
+        runner = get_runner(root_agent, self.session_service, self.app_name)
+        if self._fanout_builder is not None:
+            self.fanout = self._fanout_builder(model=model, mcp_tools=tools,
+                                               session_service=self.session_service,
+                                               app_name=self.app_name)
+        self.build_seconds = time.perf_counter() - started
+        self.build_count += 1
+        metrics.set_gauge("agent_graph_build_seconds", self.build_seconds,
+                          help="Time taken by the last agent graph build.")
+        metrics.inc_counter("agent_graph_builds_total",
+                            help="Number of agent graph builds since startup.")
+        print(f"Agent graph built in {self.build_seconds * 1000:.1f} ms (build #{self.build_count}).")
+        return runner
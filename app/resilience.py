@@ -0,0 +1,320 @@
+import argparse
+import asyncio
+import contextlib
+import contextvars
+import os
+import random
+import threading
+import time
+from collections import deque
+from typing import AsyncGenerator
+
+import httpx
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+from pydantic import ConfigDict
+
+from .model_router import LatencyProfile, SimulatedLlm, SimulationError
+from . import metrics
+
+
+ENABLED = os.environ.get("MODEL_RESILIENCE", "1") != "0"
+TURN_DEADLINE_SECONDS = float(os.environ.get("TURN_DEADLINE_SECONDS", "120"))
+MAX_RETRIES = int(os.environ.get("MODEL_MAX_RETRIES", "2"))
+RETRY_BASE_DELAY = float(os.environ.get("MODEL_RETRY_BASE_DELAY", "0.2"))
+RETRY_MAX_DELAY = float(os.environ.get("MODEL_RETRY_MAX_DELAY", "5"))
+HEDGING = os.environ.get("MODEL_HEDGING", "1") != "0"
+# Until enough calls were measured, a duplicate is sent after this many seconds.
+HEDGE_DEFAULT_DELAY = float(os.environ.get("MODEL_HEDGE_DEFAULT_DELAY", "5"))
+HEDGE_QUANTILE = float(os.environ.get("MODEL_HEDGE_QUANTILE", "0.95"))
+
+
+class DeadlineExceeded(TimeoutError):
+    """The turn ran out of time before the model answered."""
+
+
+# --- Deadlines ---
+
+# Absolute time.monotonic() by which the current turn must finish. Context
+# variables follow awaits and are copied into tasks, so sub-agents (including
+# ParallelAgent branches) see the deadline of the turn that started them.
+_deadline = contextvars.ContextVar("turn_deadline", default=None)
+
+
+@contextlib.contextmanager
+def deadline(seconds: float):
+    """Bounds everything inside to `seconds`; a nested deadline can only shorten an outer one."""
+    at = time.monotonic() + seconds
+    outer = _deadline.get()
+    token = _deadline.set(at if outer is None else min(at, outer))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining():
+    """Seconds left before the current deadline, or None without one."""
+    at = _deadline.get()
+    return None if at is None else at - time.monotonic()
+
+
+# --- Retry budget ---
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Whether a failed model call may succeed if it is sent again.
+
+    Timeouts, dropped connections, rate limiting (429) and server errors (5xx)
+    are retried; bad requests, auth failures and bugs in our code are not.
+    """
+    if isinstance(error, DeadlineExceeded):
+        return False
+    if isinstance(error, (TimeoutError, asyncio.TimeoutError, ConnectionError, httpx.TransportError, SimulationError)):
+        return True
+    # google.genai's APIError has `code`; litellm, openai and anthropic errors have `status_code`.
+    status = getattr(error, "code", None)
+    if not isinstance(status, int):
+        status = getattr(error, "status_code", None)
+    if not isinstance(status, int):
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return isinstance(status, int) and (status in (408, 429) or status >= 500)
+
+
+class RetryBudget:
+    """Caps retries and hedges to a fraction of recent calls, process-wide.
+
+    Over the last `window` seconds, at most `ratio` extra attempts per call
+    (plus `min_retries` for low traffic) are allowed. When a provider is
+    down, this stops retries from multiplying its load.
+    """
+
+    def __init__(self, *, ratio: float = 0.2, min_retries: int = 10, window: float = 10.0, clock=time.monotonic):
+        self.ratio = ratio
+        self.min_retries = min_retries
+        self.window = window
+        self._clock = clock
+        self._calls = deque()
+        self._retries = deque()
+        self._lock = threading.Lock()
+
+    def _trim(self, now: float) -> None:
+        for events in (self._calls, self._retries):
+            while events and events[0] < now - self.window:
+                events.popleft()
+
+    def record_call(self) -> None:
+        with self._lock:
+            now = self._clock()
+            self._trim(now)
+            self._calls.append(now)
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            now = self._clock()
+            self._trim(now)
+            if len(self._retries) >= self.min_retries + self.ratio * len(self._calls):
+                return False
+            self._retries.append(now)
+            return True
+
+
+_retry_budget = RetryBudget(ratio=float(os.environ.get("MODEL_RETRY_BUDGET_RATIO", "0.2")))
+
+
+def get_retry_budget() -> RetryBudget:
+    return _retry_budget
+
+
+# --- Resilient model wrapper ---
+
+
+class _LatencyWindow:
+    def __init__(self, size: int = 200):
+        self._samples = deque(maxlen=size)
+
+    def add(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def quantile(self, q: float, min_samples: int = 20):
+        if len(self._samples) < min_samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+class ResilientLlm(BaseLlm):
+    """Wraps a model with a turn deadline, hedged requests and budgeted retries.
+
+    - Every call is bounded by the remaining turn deadline (see `deadline`).
+    - If a call takes longer than this model's p95 latency, a duplicate is
+      sent; the first answer wins and the other call is cancelled.
+    - Calls failing with a transient error (see `is_retryable`) are retried up
+      to `max_retries` times with full-jitter exponential backoff, as long as
+      the global RetryBudget allows it.
+
+    Streaming calls are passed through under the deadline only, since partial
+    responses cannot be hedged or retried.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    llm: BaseLlm
+    max_retries: int = MAX_RETRIES
+    hedging: bool = HEDGING
+    budget: RetryBudget = None
+    rng: random.Random = None
+    latencies: _LatencyWindow = None
+
+    def __init__(self, **data):
+        data.setdefault("model", data["llm"].model)
+        data.setdefault("budget", get_retry_budget())
+        data.setdefault("rng", random.Random())
+        data.setdefault("latencies", _LatencyWindow())
+        super().__init__(**data)
+
+    def hedge_delay(self) -> float:
+        return self.latencies.quantile(HEDGE_QUANTILE) or HEDGE_DEFAULT_DELAY
+
+    async def generate_content_async(self, llm_request: LlmRequest, stream: bool = False) -> AsyncGenerator[LlmResponse, None]:
+        if stream:
+            async for response in self._stream(llm_request):
+                yield response
+            return
+
+        labels = {"model": self.model}
+        attempt = 0
+        while True:
+            left = remaining()
+            if left is not None and left <= 0:
+                metrics.inc_counter("model_deadline_exceeded_total", labels=labels,
+                                    help="Model calls abandoned because the turn deadline passed.")
+                raise DeadlineExceeded(f"Turn deadline passed before {self.model} answered.")
+            try:
+                responses = await asyncio.wait_for(self._hedged(llm_request), left)
+                break
+            except Exception as e:
+                # A timeout raised by the model itself (e.g. its HTTP client) is retried like
+                # any other transient error; only ours ends the turn.
+                if isinstance(e, asyncio.TimeoutError) and left is not None and remaining() <= 0:
+                    metrics.inc_counter("model_deadline_exceeded_total", labels=labels,
+                                        help="Model calls abandoned because the turn deadline passed.")
+                    raise DeadlineExceeded(f"Turn deadline passed before {self.model} answered.") from None
+                if not is_retryable(e) or attempt >= self.max_retries or not self.budget.try_acquire():
+                    raise
+                attempt += 1
+                backoff = self.rng.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt))
+                left = remaining()
+                if left is not None and backoff >= left:
+                    raise
+                metrics.inc_counter("model_retries_total", labels=labels, help="Model calls retried after an error.")
+                print(f"Model {self.model} failed ({type(e).__name__}: {e}); retry {attempt} in {backoff:.2f}s.")
+                await asyncio.sleep(backoff)
+
+        for response in responses:
+            yield response
+
+    async def _stream(self, llm_request: LlmRequest):
+        self.budget.record_call()
+        stream = self.llm.generate_content_async(llm_request, True)
+        try:
+            while True:
+                left = remaining()
+                try:
+                    response = await asyncio.wait_for(stream.__anext__(), left)
+                except StopAsyncIteration:
+                    return
+                except asyncio.TimeoutError:
+                    raise DeadlineExceeded(f"Turn deadline passed while {self.model} was streaming.")
+                yield response
+        finally:
+            await stream.aclose()
+
+    async def _call(self, llm_request: LlmRequest) -> list:
+        self.budget.record_call()
+        started = time.perf_counter()
+        # Each attempt gets its own request: models append to `contents` in place.
+        request = llm_request.model_copy(update={"contents": list(llm_request.contents)})
+        responses = [r async for r in self.llm.generate_content_async(request, False)]
+        self.latencies.add(time.perf_counter() - started)
+        return responses
+
+    async def _hedged(self, llm_request: LlmRequest) -> list:
+        primary = asyncio.create_task(self._call(llm_request))
+        if not self.hedging:
+            return await primary
+        tasks = {primary}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self.hedge_delay())
+            if not done and self.budget.try_acquire():
+                metrics.inc_counter("model_hedges_total", labels={"model": self.model},
+                                    help="Duplicate model requests sent because the first was slow.")
+                hedge = asyncio.create_task(self._call(llm_request))
+                tasks.add(hedge)
+            error = None
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            metrics.inc_counter("model_hedge_wins_total", labels={"model": self.model},
+                                                help="Hedged requests that answered first.")
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            # The losing (or abandoned) request is cancelled.
+            for task in tasks:
+                task.cancel()
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def resilient(model):
+    """Wraps model instances in a ResilientLlm; names (resolved later by ADK) are returned unchanged.
+
+    MODEL_RESILIENCE=0 turns the wrapper off.
+    """
+    if ENABLED and isinstance(model, BaseLlm) and not isinstance(model, ResilientLlm):
+        return ResilientLlm(llm=model)
+    return model
+
+
+async def _demo(calls: int, concurrency: int, wrap: bool, seed: int) -> list:
+    rng = random.Random(seed)
+    # Mostly fast with a heavy tail, like a provider that sometimes stalls.
+    fake = SimulatedLlm(model="simulated", profile=LatencyProfile(median=0.05, p95=0.4, error_rate=0.05), rng=rng)
+    llm = ResilientLlm(llm=fake, rng=rng, budget=RetryBudget()) if wrap else fake
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one():
+        async with semaphore:
+            request = LlmRequest(contents=[types.Content(role="user", parts=[types.Part(text="hi")])])
+            started = time.perf_counter()
+            try:
+                with deadline(2.0):
+                    async for _ in llm.generate_content_async(request):
+                        pass
+                latencies.append(time.perf_counter() - started)
+            except Exception:
+                latencies.append(float("inf"))
+
+    await asyncio.gather(*(one() for _ in range(calls)))
+    return sorted(latencies)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare plain and resilient calls against a simulated provider.")
+    parser.add_argument("--calls", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    for wrap in (False, True):
+        latencies = asyncio.run(_demo(args.calls, args.concurrency, wrap, args.seed))
+        failed = sum(latency == float("inf") for latency in latencies)
+        p = lambda q: latencies[min(len(latencies) - 1, int(len(latencies) * q))] * 1000
+        print(f"{'resilient' if wrap else 'plain':>9}: p50 {p(0.5):7.1f} ms  p99 {p(0.99):7.1f} ms  failed {failed}")
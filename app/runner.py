@@ -1,10 +1,14 @@
 from google.adk.runners import Runner
 
-def get_runner(agent, session_service, app_name):
+from .artifacts import get_artifact_service
+
+def get_runner(agent, session_service, app_name, artifact_service=None):
     runner = Runner(
         agent=agent,
         app_name=app_name,
-        session_service=session_service
+        session_service=session_service,
+        # Large tool payloads are stored here and only referenced from events and prompts.
+        artifact_service=artifact_service or get_artifact_service()
     )
     print(f"Runner created for agent '{runner.agent.name}'.")
     return runner
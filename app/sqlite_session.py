@@ -0,0 +1,374 @@
+import atexit
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Optional
+
+from google.adk.events.event import Event
+from google.adk.sessions.base_session_service import (
+    BaseSessionService,
+    GetSessionConfig,
+    ListEventsResponse,
+    ListSessionsResponse,
+)
+from google.adk.sessions.session import Session
+from google.adk.sessions.state import State
+
+from .cache import TTLCache
+from . import metrics, state_codec, tracing
+from .state_log import StateLog, app_scope, session_scope, user_scope
+
+
+# `sessions.state` is only read to migrate databases written before state
+# moved to the state log (app.state_log); new sessions store '{}' there.
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    id TEXT NOT NULL,
+    state TEXT NOT NULL,
+    create_time REAL NOT NULL,
+    update_time REAL NOT NULL,
+    PRIMARY KEY (app_name, user_id, id)
+);
+CREATE TABLE IF NOT EXISTS events (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    timestamp REAL NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS events_by_session ON events (app_name, user_id, session_id, seq);
+"""
+
+# Sessions whose events are kept in memory for incremental reads.
+EVENT_CACHE_SIZE = int(os.environ.get("SESSION_EVENT_CACHE_SIZE", "256"))
+
+# Queued by `flush` so the writer commits what it has instead of waiting to fill a batch.
+_FLUSH = object()
+
+
+def _split_state(state: dict) -> tuple[dict, dict, dict]:
+    """Splits a state dict into app-, user- and session-scoped parts.
+
+    App and user keys lose their prefix; temporary keys are dropped because
+    they only live for one invocation.
+    """
+    app_state, user_state, session_state = {}, {}, {}
+    for key, value in (state or {}).items():
+        if key.startswith(State.APP_PREFIX):
+            app_state[key[len(State.APP_PREFIX):]] = value
+        elif key.startswith(State.USER_PREFIX):
+            user_state[key[len(State.USER_PREFIX):]] = value
+        elif not key.startswith(State.TEMP_PREFIX):
+            session_state[key] = value
+    return app_state, user_state, session_state
+
+
+def _merge_state(app_state: dict, user_state: dict, session_state: dict) -> dict:
+    merged = dict(session_state)
+    merged.update({State.APP_PREFIX + k: v for k, v in app_state.items()})
+    merged.update({State.USER_PREFIX + k: v for k, v in user_state.items()})
+    return merged
+
+
+class SqliteSessionService(BaseSessionService):
+    """A persistent session service backed by a local SQLite database.
+
+    The database runs in WAL mode with a busy timeout, so several uvicorn
+    workers can open the same file: readers never block the writer, and
+    every write happens inside a `BEGIN IMMEDIATE` transaction.
+
+    State is not rebuilt from events: each scope (app, user, session) keeps
+    an append-only log of its deltas and a snapshot taken every
+    SESSION_SNAPSHOT_INTERVAL deltas (see app.state_log), so loading a
+    session reads one snapshot and a short tail per scope.
+
+    Event appends are write-behind: `append_event` updates the caller's
+    in-memory session right away and queues the row for a background writer,
+    which commits queued events in batches. Any read from this process first
+    waits for its own pending writes, so a worker always sees what it wrote.
+
+    Reads are lazy: each process remembers the events it already loaded for a
+    session and only fetches rows appended since then.
+    """
+
+    def __init__(self, db_path: str, *, batch_size: int = 64, flush_interval: float = 0.05,
+                 state_log: StateLog = None, event_cache_size: int = EVENT_CACHE_SIZE):
+        """
+        Args:
+            db_path (str): Path of the SQLite database file. Created if missing.
+            batch_size (int): Maximum number of queued appends committed per transaction.
+            flush_interval (float): Seconds the writer waits to fill a batch before committing.
+            state_log (StateLog, optional): Where state deltas and snapshots are kept.
+            event_cache_size (int): Sessions whose loaded events are kept in memory (least recently read evicted).
+        """
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.state_log = state_log or StateLog()
+        self._local = threading.local()
+        self._pending = queue.Queue()
+        self._event_cache = TTLCache(maxsize=event_cache_size, ttl=None)
+        conn = self._connect()
+        conn.executescript(_SCHEMA)
+        self.state_log.create_tables(conn)
+        self._migrate_legacy_state(conn)
+        conn.close()
+        self._writer = threading.Thread(target=self._write_loop, name="sqlite-session-writer", daemon=True)
+        self._writer.start()
+        atexit.register(self.flush)
+
+    # --- Connections ---
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=30000")
+        return conn
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    # --- BaseSessionService ---
+
+    def create_session(self, *, app_name: str, user_id: str, state: Optional[dict[str, Any]] = None,
+                       session_id: Optional[str] = None) -> Session:
+        session_id = session_id.strip() if session_id and session_id.strip() else str(uuid.uuid4())
+        with tracing.span("session.create", session_id=session_id):
+            return self._create_session(app_name, user_id, session_id, state)
+
+    def _create_session(self, app_name, user_id, session_id, state) -> Session:
+        app_delta, user_delta, session_state = _split_state(state)
+        now = time.time()
+        conn = self._conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "INSERT INTO sessions (app_name, user_id, id, state, create_time, update_time) VALUES (?, ?, ?, '{}', ?, ?)",
+                (app_name, user_id, session_id, now, now),
+            )
+            self.state_log.replace(conn, session_scope(app_name, user_id, session_id), session_state)
+            self.state_log.append(conn, app_scope(app_name), app_delta)
+            self.state_log.append(conn, user_scope(app_name, user_id), user_delta)
+            app_state = self.state_log.load(conn, app_scope(app_name))
+            user_state = self.state_log.load(conn, user_scope(app_name, user_id))
+            conn.execute("COMMIT")
+        except sqlite3.IntegrityError:
+            conn.execute("ROLLBACK")
+            raise ValueError(f"Session '{session_id}' already exists for user '{user_id}' in app '{app_name}'.")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return Session(app_name=app_name, user_id=user_id, id=session_id,
+                       state=_merge_state(app_state, user_state, session_state), last_update_time=now)
+
+    def get_session(self, *, app_name: str, user_id: str, session_id: str,
+                    config: Optional[GetSessionConfig] = None) -> Optional[Session]:
+        with tracing.span("session.get", session_id=session_id) as s:
+            session = self._get_session(app_name, user_id, session_id, config)
+            s.set(found=session is not None, events=len(session.events) if session else 0)
+            return session
+
+    def _get_session(self, app_name, user_id, session_id, config) -> Optional[Session]:
+        self.flush()
+        conn = self._conn
+        # One read transaction, so the session row, the three state scopes and
+        # the events all come from the same WAL snapshot, even if another
+        # worker folds a scope's deltas into a new snapshot meanwhile.
+        conn.execute("BEGIN")
+        try:
+            row = conn.execute(
+                "SELECT update_time FROM sessions WHERE app_name = ? AND user_id = ? AND id = ?",
+                (app_name, user_id, session_id),
+            ).fetchone()
+            if row is None:
+                return None
+            update_time = row[0]
+            session_state = self.state_log.load(conn, session_scope(app_name, user_id, session_id))
+            app_state = self.state_log.load(conn, app_scope(app_name))
+            user_state = self.state_log.load(conn, user_scope(app_name, user_id))
+            events = self._load_events(conn, (app_name, user_id, session_id))
+        finally:
+            conn.execute("COMMIT")
+        if config:
+            if config.after_timestamp:
+                events = [e for e in events if e.timestamp > config.after_timestamp]
+            if config.num_recent_events:
+                events = events[-config.num_recent_events:]
+        return Session(app_name=app_name, user_id=user_id, id=session_id,
+                       state=_merge_state(app_state, user_state, session_state),
+                       events=events, last_update_time=update_time)
+
+    def list_sessions(self, *, app_name: str, user_id: str) -> ListSessionsResponse:
+        self.flush()
+        rows = self._conn.execute(
+            "SELECT id, update_time FROM sessions WHERE app_name = ? AND user_id = ?",
+            (app_name, user_id),
+        ).fetchall()
+        sessions = [Session(app_name=app_name, user_id=user_id, id=session_id, state={}, last_update_time=update_time)
+                    for session_id, update_time in rows]
+        return ListSessionsResponse(sessions=sessions)
+
+    def delete_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        self.flush()
+        conn = self._conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM events WHERE app_name = ? AND user_id = ? AND session_id = ?",
+                         (app_name, user_id, session_id))
+            conn.execute("DELETE FROM sessions WHERE app_name = ? AND user_id = ? AND id = ?",
+                         (app_name, user_id, session_id))
+            self.state_log.delete(conn, session_scope(app_name, user_id, session_id))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        self._event_cache.pop((app_name, user_id, session_id))
+
+    def list_events(self, *, app_name: str, user_id: str, session_id: str) -> ListEventsResponse:
+        self.flush()
+        return ListEventsResponse(events=self._load_events(self._conn, (app_name, user_id, session_id)))
+
+    def append_event(self, session: Session, event: Event) -> Event:
+        if event.partial:
+            return event
+        with tracing.span("session.append_event", session_id=session.id, author=event.author):
+            return self._append_event(session, event)
+
+    def _append_event(self, session: Session, event: Event) -> Event:
+        super().append_event(session=session, event=event)
+        session.last_update_time = event.timestamp
+        state_delta = event.actions.state_delta if event.actions and event.actions.state_delta else {}
+        self._pending.put((
+            (session.app_name, session.user_id, session.id),
+            event.timestamp,
+            event.model_dump_json(exclude_none=True),
+            _split_state(state_delta),
+        ))
+        return event
+
+    # --- Write-behind ---
+
+    def flush(self) -> None:
+        """Blocks until every queued append from this process is committed.
+
+        The writer is woken up to commit right away rather than after
+        `flush_interval`, so a read following an append only waits for the commit.
+        """
+        if self._pending.unfinished_tasks:
+            self._pending.put(_FLUSH)
+            self._pending.join()
+
+    def _write_loop(self) -> None:
+        conn = self._connect()
+        while True:
+            batch = [self._pending.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size and batch[-1] is not _FLUSH:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._pending.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            events = [item for item in batch if item is not _FLUSH]
+            started = time.perf_counter()
+            try:
+                if events:
+                    self._write_batch(conn, events)
+                    metrics.observe("session_write_batch_seconds", time.perf_counter() - started,
+                                    help="Time to commit one batch of queued session events.")
+                    metrics.inc_counter("session_events_written_total", len(events),
+                                        help="Session events committed by the write-behind writer.")
+            except Exception as e:
+                print(f"❌ Could not persist {len(events)} session event(s): {e}")
+            finally:
+                for _ in batch:
+                    self._pending.task_done()
+
+    def _write_batch(self, conn: sqlite3.Connection, batch: list) -> None:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for (app_name, user_id, session_id), timestamp, data, (app_delta, user_delta, session_delta) in batch:
+                conn.execute(
+                    "INSERT INTO events (app_name, user_id, session_id, timestamp, data) VALUES (?, ?, ?, ?, ?)",
+                    (app_name, user_id, session_id, timestamp, data),
+                )
+                self.state_log.append(conn, app_scope(app_name), app_delta)
+                self.state_log.append(conn, user_scope(app_name, user_id), user_delta)
+                self.state_log.append(conn, session_scope(app_name, user_id, session_id), session_delta)
+                conn.execute("UPDATE sessions SET update_time = ? WHERE app_name = ? AND user_id = ? AND id = ?",
+                             (timestamp, app_name, user_id, session_id))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    # --- Helpers ---
+
+    def _migrate_legacy_state(self, conn: sqlite3.Connection) -> None:
+        """Moves JSON state written by earlier versions (sessions.state, app_states, user_states) into state snapshots."""
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        legacy_sessions = conn.execute(
+            "SELECT app_name, user_id, id, state FROM sessions WHERE state NOT IN ('', '{}')").fetchall()
+        if not legacy_sessions and not tables & {"app_states", "user_states"}:
+            return
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            scoped = [(session_scope(app_name, user_id, session_id), state)
+                      for app_name, user_id, session_id, state in legacy_sessions]
+            if "app_states" in tables:
+                scoped += [(app_scope(app_name), state)
+                           for app_name, state in conn.execute("SELECT app_name, state FROM app_states")]
+            if "user_states" in tables:
+                scoped += [(user_scope(app_name, user_id), state)
+                           for app_name, user_id, state in conn.execute("SELECT app_name, user_id, state FROM user_states")]
+            for scope, state in scoped:
+                conn.execute("INSERT OR IGNORE INTO state_snapshots (scope, seq, state) VALUES (?, 0, ?)",
+                             (scope, state_codec.encode(json.loads(state))))
+            conn.execute("UPDATE sessions SET state = '{}'")
+            conn.execute("DROP TABLE IF EXISTS app_states")
+            conn.execute("DROP TABLE IF EXISTS user_states")
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        print(f"Migrated {len(scoped)} session state row(s) to the state log.")
+
+    def _load_events(self, conn, key: tuple) -> list:
+        """Returns all events of a session, fetching only rows this process has not seen yet."""
+        last_seq, events = self._event_cache.get(key, (0, []))
+        rows = conn.execute(
+            "SELECT seq, data FROM events WHERE app_name = ? AND user_id = ? AND session_id = ? AND seq > ? ORDER BY seq",
+            (*key, last_seq),
+        ).fetchall()
+        if rows:
+            events = events + [Event.model_validate_json(data) for _, data in rows]
+            last_seq = rows[-1][0]
+            self._event_cache.set(key, (last_seq, events))
+        return list(events)
+
+
+_default_service = None
+_default_lock = threading.Lock()
+
+
+def get_default_session_service() -> SqliteSessionService:
+    """Returns the process-wide session service, stored at SESSION_DB_PATH (default: sessions.db)."""
+    global _default_service
+    with _default_lock:
+        if _default_service is None:
+            _default_service = SqliteSessionService(os.environ.get("SESSION_DB_PATH", "sessions.db"))
+        return _default_service
@@ -0,0 +1,131 @@
+"""Compact binary encoding of session state values.
+
+Every value is a one-byte tag followed by its payload (tag-length-value):
+
+    NONE, FALSE, TRUE            no payload
+    INT                          zigzag varint
+    FLOAT                        8-byte little-endian double
+    STR, BYTES                   varint length + bytes (UTF-8 for STR)
+    LIST                         varint count + values
+    DICT                         varint count + (varint length + UTF-8 key, value) pairs
+
+It covers what state held as JSON before (plus bytes), is smaller than JSON
+for typical tool state, and needs no dependency.
+"""
+import struct
+
+NONE, FALSE, TRUE, INT, FLOAT, STR, BYTES, LIST, DICT = range(9)
+
+_DOUBLE = struct.Struct("<d")
+
+
+def _write_varint(out: bytearray, n: int) -> None:
+    while n > 0x7F:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def _read_varint(data, pos: int):
+    result = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+def _write_str(out: bytearray, text: str) -> None:
+    raw = text.encode("utf-8")
+    _write_varint(out, len(raw))
+    out += raw
+
+
+def _encode(out: bytearray, value) -> None:
+    if value is None:
+        out.append(NONE)
+    elif value is True:
+        out.append(TRUE)
+    elif value is False:
+        out.append(FALSE)
+    elif isinstance(value, int):
+        out.append(INT)
+        _write_varint(out, value * 2 if value >= 0 else -value * 2 - 1)
+    elif isinstance(value, float):
+        out.append(FLOAT)
+        out += _DOUBLE.pack(value)
+    elif isinstance(value, str):
+        out.append(STR)
+        _write_str(out, value)
+    elif isinstance(value, (bytes, bytearray)):
+        out.append(BYTES)
+        _write_varint(out, len(value))
+        out += value
+    elif isinstance(value, (list, tuple)):
+        out.append(LIST)
+        _write_varint(out, len(value))
+        for item in value:
+            _encode(out, item)
+    elif isinstance(value, dict):
+        out.append(DICT)
+        _write_varint(out, len(value))
+        for key, item in value.items():
+            if not isinstance(key, str):
+                raise TypeError(f"State keys must be strings, not {type(key).__name__}.")
+            _write_str(out, key)
+            _encode(out, item)
+    else:
+        raise TypeError(f"Object of type {type(value).__name__} cannot be stored in session state.")
+
+
+def encode(value) -> bytes:
+    out = bytearray()
+    _encode(out, value)
+    return bytes(out)
+
+
+def _decode(data, pos: int):
+    tag = data[pos]
+    pos += 1
+    if tag == STR:
+        length, pos = _read_varint(data, pos)
+        return str(data[pos:pos + length], "utf-8"), pos + length
+    if tag == DICT:
+        count, pos = _read_varint(data, pos)
+        result = {}
+        for _ in range(count):
+            length, pos = _read_varint(data, pos)
+            key = str(data[pos:pos + length], "utf-8")
+            result[key], pos = _decode(data, pos + length)
+        return result, pos
+    if tag == INT:
+        n, pos = _read_varint(data, pos)
+        return (n >> 1) ^ -(n & 1), pos
+    if tag == NONE:
+        return None, pos
+    if tag == TRUE:
+        return True, pos
+    if tag == FALSE:
+        return False, pos
+    if tag == FLOAT:
+        return _DOUBLE.unpack_from(data, pos)[0], pos + 8
+    if tag == LIST:
+        count, pos = _read_varint(data, pos)
+        result = []
+        for _ in range(count):
+            item, pos = _decode(data, pos)
+            result.append(item)
+        return result, pos
+    if tag == BYTES:
+        length, pos = _read_varint(data, pos)
+        return bytes(data[pos:pos + length]), pos + length
+    raise ValueError(f"Unknown state value tag {tag} at offset {pos - 1}.")
+
+
+def decode(data: bytes):
+    value, pos = _decode(memoryview(data), 0)
+    if pos != len(data):
+        raise ValueError(f"{len(data) - pos} trailing bytes after the state value.")
+    return value
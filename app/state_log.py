@@ -0,0 +1,112 @@
+import os
+import sqlite3
+
+from . import metrics, state_codec
+
+
+# A scope's deltas are folded into a new snapshot once this many accumulate.
+SNAPSHOT_INTERVAL = int(os.environ.get("SESSION_SNAPSHOT_INTERVAL", "32"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS state_log (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    scope TEXT NOT NULL,
+    delta BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS state_log_by_scope ON state_log (scope, seq);
+CREATE TABLE IF NOT EXISTS state_snapshots (
+    scope TEXT PRIMARY KEY,
+    seq INTEGER NOT NULL,
+    state BLOB NOT NULL
+);
+"""
+
+_SEP = "\x1f"
+
+
+def app_scope(app_name: str) -> str:
+    return _SEP.join(("app", app_name))
+
+
+def user_scope(app_name: str, user_id: str) -> str:
+    return _SEP.join(("user", app_name, user_id))
+
+
+def session_scope(app_name: str, user_id: str, session_id: str) -> str:
+    return _SEP.join(("session", app_name, user_id, session_id))
+
+
+class StateLog:
+    """State of app, user and session scopes as an append-only delta log with periodic snapshots.
+
+    Writes insert one row with the delta (encoded with app.state_codec) and
+    never rewrite the state. Every `snapshot_interval` deltas, the scope's
+    state is folded into a snapshot and the folded deltas are dropped, so a
+    read is one snapshot plus at most `snapshot_interval` deltas however long
+    the session has been running.
+
+    Methods take the caller's connection and run inside its transaction.
+    A load outside of one gets its own read transaction: the snapshot and the
+    deltas after it must come from the same database snapshot, or another
+    worker folding the scope in between would make the load miss its deltas.
+    """
+
+    def __init__(self, snapshot_interval: int = SNAPSHOT_INTERVAL):
+        self.snapshot_interval = max(1, snapshot_interval)
+
+    @staticmethod
+    def create_tables(conn: sqlite3.Connection) -> None:
+        conn.executescript(SCHEMA)
+
+    def _fold(self, conn: sqlite3.Connection, scope: str) -> tuple[int, dict, int]:
+        """Returns the last delta seq applied, the state, and how many deltas were replayed."""
+        row = conn.execute("SELECT seq, state FROM state_snapshots WHERE scope = ?", (scope,)).fetchone()
+        seq, state = (row[0], state_codec.decode(row[1])) if row else (0, {})
+        tail = conn.execute("SELECT seq, delta FROM state_log WHERE scope = ? AND seq > ? ORDER BY seq",
+                            (scope, seq)).fetchall()
+        for seq, delta in tail:
+            state.update(state_codec.decode(delta))
+        return seq, state, len(tail)
+
+    def load(self, conn: sqlite3.Connection, scope: str) -> dict:
+        if conn.in_transaction:
+            _, state, replayed = self._fold(conn, scope)
+        else:
+            conn.execute("BEGIN")
+            try:
+                _, state, replayed = self._fold(conn, scope)
+            finally:
+                conn.execute("COMMIT")
+        metrics.observe("session_state_deltas_replayed", replayed, buckets=(0, 1, 2, 4, 8, 16, 32, 64, 128),
+                        help="State deltas applied on top of the snapshot when loading a scope.")
+        return state
+
+    def append(self, conn: sqlite3.Connection, scope: str, delta: dict) -> None:
+        if not delta:
+            return
+        conn.execute("INSERT INTO state_log (scope, delta) VALUES (?, ?)", (scope, state_codec.encode(delta)))
+        pending = conn.execute(
+            "SELECT COUNT(*) FROM state_log WHERE scope = ?"
+            " AND seq > COALESCE((SELECT seq FROM state_snapshots WHERE scope = ?), 0)",
+            (scope, scope),
+        ).fetchone()[0]
+        if pending >= self.snapshot_interval:
+            self.snapshot(conn, scope)
+
+    def snapshot(self, conn: sqlite3.Connection, scope: str) -> None:
+        """Folds the scope's deltas into its snapshot and drops them from the log."""
+        seq, state, _ = self._fold(conn, scope)
+        conn.execute("INSERT OR REPLACE INTO state_snapshots (scope, seq, state) VALUES (?, ?, ?)",
+                     (scope, seq, state_codec.encode(state)))
+        conn.execute("DELETE FROM state_log WHERE scope = ? AND seq <= ?", (scope, seq))
+        metrics.inc_counter("session_state_snapshots_total", help="State snapshots written by folding deltas.")
+
+    def replace(self, conn: sqlite3.Connection, scope: str, state: dict) -> None:
+        """Sets the whole state of a scope, dropping its history."""
+        conn.execute("DELETE FROM state_log WHERE scope = ?", (scope,))
+        conn.execute("INSERT OR REPLACE INTO state_snapshots (scope, seq, state) VALUES (?, 0, ?)",
+                     (scope, state_codec.encode(state)))
+
+    def delete(self, conn: sqlite3.Connection, scope: str) -> None:
+        conn.execute("DELETE FROM state_log WHERE scope = ?", (scope,))
+        conn.execute("DELETE FROM state_snapshots WHERE scope = ?", (scope,))
@@ -0,0 +1,88 @@
+import json
+
+from google.adk.agents.run_config import RunConfig, StreamingMode
+from google.genai import types
+
+from . import tracing
+
+
+def describe_event(event) -> list[dict]:
+    """Turns an ADK Event into the client-facing messages it represents.
+
+    A single event can carry several parts (e.g. text plus a function call), so
+    this returns one message per part, in order. Message types are:
+    'transfer', 'tool_call', 'tool_result', 'text' and 'final'.
+    """
+    messages = []
+    base = {"author": event.author, "invocation_id": event.invocation_id, "event_id": event.id}
+    parts = event.content.parts if event.content and event.content.parts else []
+    # The final event repeats the text already streamed as partials; it is sent once as 'final'.
+    is_final = event.is_final_response() and not event.partial
+
+    for part in parts:
+        if part.function_call:
+            call = part.function_call
+            kind = "transfer" if call.name == "transfer_to_agent" else "tool_call"
+            messages.append({**base, "type": kind, "name": call.name, "args": call.args or {}})
+        elif part.function_response:
+            response = part.function_response
+            messages.append({**base, "type": "tool_result", "name": response.name, "response": response.response})
+        elif part.text and not is_final:
+            messages.append({**base, "type": "text", "text": part.text, "partial": bool(event.partial)})
+
+    if event.actions and event.actions.transfer_to_agent:
+        messages.append({**base, "type": "transfer", "to": event.actions.transfer_to_agent})
+
+    if is_final:
+        final = {**base, "type": "final"}
+        texts = [p.text for p in parts if p.text]
+        if texts:
+            final["text"] = "".join(texts)
+        elif event.actions and event.actions.escalate:
+            final["text"] = f"Agent escalated: {event.error_message or 'No specific message.'}"
+        messages.append(final)
+    return messages
+
+
+def format_sse(data: dict, *, event: str = None, event_id: str = None) -> str:
+    """Encodes one Server-Sent Events message."""
+    lines = []
+    if event_id:
+        lines.append(f"id: {event_id}")
+    if event:
+        lines.append(f"event: {event}")
+    payload = json.dumps(data, default=str, ensure_ascii=False)
+    lines.extend(f"data: {line}" for line in payload.splitlines() or [""])
+    return "\n".join(lines) + "\n\n"
+
+
+async def stream_agent_events(runner, *, query: str, user_id: str, session_id: str, request=None):
+    """Runs one agent turn and yields each event as SSE text as soon as it is produced.
+
+    Partial model output is requested from the runner, so the first 'text'
+    message is sent with the first model token. If the client disconnects (or
+    the response task is cancelled), the underlying run is closed, which
+    cancels any model or tool call still in flight.
+    """
+    content = types.Content(role='user', parts=[types.Part(text=query)])
+    run = runner.run_async(user_id=user_id, session_id=session_id, new_message=content,
+                           run_config=RunConfig(streaming_mode=StreamingMode.SSE))
+    # Started explicitly rather than made current: a generator's context is not
+    # preserved between yields.
+    turn = tracing.start_span("agent.turn", user_id=user_id, session_id=session_id, streaming=True)
+    hops = tracing.TurnTracer(turn)
+    try:
+        async for event in run:
+            if request is not None and await request.is_disconnected():
+                print(f"--- Client disconnected, cancelling run for session '{session_id}' ---")
+                turn.set(disconnected=True)
+                break
+            hops.observe(event)
+            for message in describe_event(event):
+                yield format_sse(message, event=message["type"], event_id=event.id)
+        else:
+            yield format_sse({"type": "done"}, event="done")
+    finally:
+        await run.aclose()
+        hops.close()
+        turn.end()
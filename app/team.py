@@ -0,0 +1,202 @@
+from google.adk.tools import load_artifacts
+
+from .agentUtils import createAgent
+from .prerouter import IntentRule, PreRouter
+from .compaction import get_history_compactor
+from .fanout import FanoutOrchestrator, FanoutPlanner, task_key, result_key
+from .model_router import (ROLE_FAREWELL, ROLE_FIX_VULNERABILITY, ROLE_GREETER, ROLE_MAVEN, ROLE_ROUTER,
+                           routed_model)
+from .vulnscan import build_fix_tool
+from .tools import say_hello, say_goodbye, get_weather_stateful, get_weather_batch, execute_maven_command
+
+
+ROOT_AGENT_NAME = "weather_agent_v4_stateful"
+
+FIX_VULNERABILITY_INSTRUCTION = ("You are the fix vulnerability Agent. Your ONLY task is to fix and address vulnerabilities in source code using the list of vulnerabilities provided. "
+                                 "Use the 'fix_vulnerability' tool when the user requires you to."
+                                 "(e.g., using words like fix, address vulnerability, fix vulnerability, etc.). "
+                                 "Do not perform any other actions.")
+FIX_VULNERABILITY_DESCRIPTION = "Handles vulnerability fixes using the 'fix_vulnerability' tool."
+
+MAVEN_INSTRUCTION = ("You are the Java Maven Agent. Your ONLY task is to run maven commands. "
+                     "Use the 'execute_maven_command' tool when the user requires you to run a maven command, they will provide you the command as well as the path or working_dir."
+                     "(e.g., using words like 'run', 'execute', 'mvn', 'build', 'clean', 'install', 'test', 'package'). "
+                     "Do not perform any other actions.")
+MAVEN_DESCRIPTION = "Handles simple maven commands using the 'execute_maven_command' tool."
+
+
+def fix_vulnerability_tools(mcp_tools):
+    """The fix agent's tools: the MCP `fix-vulnerability` tool is put behind the local pre-scan.
+
+    Only the functions the scan flags reach the fixer, in parallel; clean
+    sources are never sent.
+    """
+    tools = [build_fix_tool(tool) if getattr(tool, "name", None) == "fix-vulnerability" else tool
+             for tool in mcp_tools or []]
+    # Long results come back as artifact handles; this lets the agent read one in full.
+    return tools + [load_artifacts] if tools else tools
+
+
+def build_agent_team(*, model, mcp_tools=None):
+    """Builds the full agent graph: the root coordinator and its sub-agents.
+
+    Args:
+        model: The model (name or BaseLlm instance) every agent in the team uses, or
+            MODEL_ROUTED to let the ModelRouter pick a model per agent role.
+        mcp_tools (list, optional): Tools loaded from the MCP stdio server, used
+            by the fix vulnerability agent.
+
+    Returns:
+        LlmAgent: The root agent, with all available sub-agents attached.
+    """
+    # Every agent sends a compacted history to its model.
+    compact_history = get_history_compactor().before_model_callback
+
+    try:
+        fix_vulnerability_agent = createAgent(model=routed_model(model, ROLE_FIX_VULNERABILITY),
+                                        name="fix_vulnerability_agent",
+                                        instruction=FIX_VULNERABILITY_INSTRUCTION,
+                                        description=FIX_VULNERABILITY_DESCRIPTION, # Crucial for delegation
+                                        tools=fix_vulnerability_tools(mcp_tools),
+                                        beforeModelCallback=compact_history
+                                        )
+    except Exception as e:
+        print(f"Error creating fix_vulnerability_agent: {e}")
+        fix_vulnerability_agent = None
+
+    # --- Greeting Agent ---
+    greeting_agent = createAgent(model=routed_model(model, ROLE_GREETER),
+                                    name="greeting_agent",
+                                    instruction="You are the Greeting Agent. Your ONLY task is to provide a friendly greeting to the user. "
+                                    "Use the 'say_hello' tool to generate the greeting. "
+                                    "If the user provides their name, make sure to pass it to the tool. "
+                                    "Do not engage in any other conversation or tasks.",
+                                    description="Handles simple greetings and hellos using the 'say_hello' tool.", # Crucial for delegation
+                                    tools=[say_hello],
+                                    beforeModelCallback=compact_history)
+
+    # --- Farewell Agent ---
+    farewell_agent = createAgent(model=routed_model(model, ROLE_FAREWELL),
+                                    name="farewell_agent",
+                                    instruction="You are the Farewell Agent. Your ONLY task is to provide a polite goodbye message. "
+                                    "Use the 'say_goodbye' tool when the user indicates they are leaving or ending the conversation "
+                                    "(e.g., using words like 'bye', 'goodbye', 'thanks bye', 'see you'). "
+                                    "Do not perform any other actions.",
+                                    description="Handles simple farewells and goodbyes using the 'say_goodbye' tool.", # Crucial for delegation
+                                    tools=[say_goodbye],
+                                    beforeModelCallback=compact_history)
+
+    maven_agent = createAgent(model=routed_model(model, ROLE_MAVEN),
+                                    name="maven_agent",
+                                    instruction=MAVEN_INSTRUCTION,
+                                    description=MAVEN_DESCRIPTION, # Crucial for delegation
+                                    tools=[execute_maven_command, load_artifacts],
+                                    beforeModelCallback=compact_history)
+
+    # Create list of available sub-agents
+    available_sub_agents = [agent for agent in (greeting_agent, farewell_agent, maven_agent, fix_vulnerability_agent) if agent]
+
+    # Create instruction based on available sub-agents
+    instruction = "You are the main   Agent coordinating a team. Your primary responsibility is to delegate tasks based on the prompt. "
+    instruction += "Use the 'get_weather' tool ONLY for specific weather requests (e.g., 'weather in London'). "
+    instruction += "When the user asks about several cities at once, call 'get_weather_batch' ONCE with all of them instead of calling 'get_weather' per city. "
+    instruction += "You have specialized sub-agents: "
+
+    if greeting_agent:
+        instruction += "1. 'greeting_agent': Handles simple greetings like 'Hi', 'Hello'. Delegate to it for these. "
+    if farewell_agent:
+        instruction += "2. 'farewell_agent': Handles simple farewells like 'Bye', 'See you'. Delegate to it for these. "
+    if maven_agent:
+        instruction += "3. 'maven_agent': Handles maven commands. Delegate to it for these. "
+    if fix_vulnerability_agent:
+        instruction += "4. 'fix_vulnerability_agent': Handles vulnerability fixes. Delegate to it for these. "
+
+    root_agent_stateful = createAgent(
+                                  model=routed_model(model, ROLE_ROUTER),
+                                  name=ROOT_AGENT_NAME,
+                                  description="The main coordinator agent. Handles weather requests and delegates greetings/farewells maven commands to specialists.",
+                                  instruction=instruction,
+                                  tools=[get_weather_stateful, get_weather_batch],
+                                  subAgentList=available_sub_agents,
+                                  outputKey="last_weather_report",
+                                  beforeModelCallback=compact_history
+                                  )
+    return root_agent_stateful
+
+
+def build_greeting_rule():
+    """The greeting agent's rule, shared by the pre-router and the fan-out planner."""
+    return IntentRule(
+        agent="greeting_agent",
+        tool=say_hello,
+        patterns=[
+            r"(?:hi|hello|hey|hiya|good (?:morning|afternoon|evening))\b(?: there\b)?[\s,!.]*"
+            r"(?:my name is\s+(?P<name>[a-z][\w'-]*)\b)?[\s!.]*",
+        ],
+    )
+
+
+def build_intent_rules():
+    """Deterministic rules for the sub-agents whose turns are trivial enough to skip the LLM.
+
+    Each rule matches a short message and calls the same tool the sub-agent
+    would have called. A name is only taken after "my name is": "hi, I'm
+    lost" leaves most of the message unmatched and goes to the LLM.
+    """
+    greeting_rules = build_greeting_rule()
+    farewell_rules = IntentRule(
+        agent="farewell_agent",
+        tool=say_goodbye,
+        patterns=[
+            r"(?:(?:ok(?:ay)?|thanks|thank you)\b[\s,!.]*)*"
+            r"(?:bye(?: bye)?|goodbye|good bye|see (?:you|ya)(?: later)?|farewell|cya)\b[\s!.]*",
+        ],
+    )
+    return [greeting_rules, farewell_rules]
+
+
+def build_prerouter(threshold=None):
+    """Builds the local pre-router placed in front of the Runner."""
+    if threshold is None:
+        return PreRouter(build_intent_rules())
+    return PreRouter(build_intent_rules(), threshold=threshold)
+
+
+def build_fanout_rules():
+    """Keyword rules for the sub-agents whose tasks are independent and may run in parallel."""
+    return {
+        "maven_agent": [r"\bmvn\b", r"\bmaven\b"],
+        "fix_vulnerability_agent": [r"\bfix[ _-]?vulnerabilit", r"\bvulnerabilit"],
+    }
+
+
+def build_fanout_branch(agent_name, *, model, mcp_tools=None):
+    """Builds the copy of a sub-agent used as one branch of a parallel fan-out.
+
+    The branch reads its own sub-task from state and writes its answer to its
+    own output key, so concurrent branches stay isolated.
+    """
+    task = "Handle ONLY this part of the user's request: {" + task_key(agent_name) + "}"
+    if agent_name == "maven_agent":
+        instruction, description, tools = MAVEN_INSTRUCTION, MAVEN_DESCRIPTION, [execute_maven_command, load_artifacts]
+        role = ROLE_MAVEN
+    elif agent_name == "fix_vulnerability_agent":
+        instruction, description, tools = FIX_VULNERABILITY_INSTRUCTION, FIX_VULNERABILITY_DESCRIPTION, fix_vulnerability_tools(mcp_tools)
+        role = ROLE_FIX_VULNERABILITY
+    else:
+        raise ValueError(f"'{agent_name}' cannot run as a fan-out branch.")
+    return createAgent(model=routed_model(model, role),
+                       name=agent_name,
+                       instruction=f"{instruction} {task}",
+                       description=description,
+                       tools=tools,
+                       outputKey=result_key(agent_name),
+                       beforeModelCallback=get_history_compactor().before_model_callback)
+
+
+def build_fanout(*, model, mcp_tools, session_service, app_name):
+    """Builds the orchestrator that runs independent sub-tasks of one message concurrently."""
+    return FanoutOrchestrator(planner=FanoutPlanner(build_fanout_rules(), greeting=build_greeting_rule()),
+                              branch_builder=lambda name: build_fanout_branch(name, model=model, mcp_tools=mcp_tools),
+                              session_service=session_service,
+                              app_name=app_name)
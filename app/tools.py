@@ -1,9 +1,18 @@
+import asyncio
+
 from google.adk.tools.tool_context import ToolContext
 
+from .weather import get_weather_provider, format_temperature
+from .maven import get_maven_executor
+from .maven_cache import get_maven_cache, is_cacheable
+from .memo import cacheable
+from .artifacts import offload
+
 def helper_function():
     return "Hello, world!"
 
 # @title Define the get_weather Tool
+@cacheable(ttl=300, key=lambda args: " ".join(str(args.get("city", "")).lower().split()))
 def get_weather(city: str) -> dict:
     """Retrieves the current weather report for a specified city.
 
@@ -17,17 +26,14 @@ def get_weather(city: str) -> dict:
               If 'error', includes an 'error_message' key.
     """
     print(f"--- Tool: get_weather called for city: {city} ---") # Log tool execution
-    city_normalized = city.lower().replace(" ", "") # Basic normalization
 
-    # Mock weather data
-    mock_weather_db = {
-        "newyork": {"status": "success", "report": "The weather in New York is sunny with a temperature of 25°C."},
-        "london": {"status": "success", "report": "It's cloudy in London with a temperature of 15°C."},
-        "tokyo": {"status": "success", "report": "Tokyo is experiencing light rain and a temperature of 18°C."},
-    }
+    # Resolved through the shared provider: a prebuilt index with aliases and
+    # fuzzy matching, behind a TTL cache.
+    data = get_weather_provider().lookup(city)
 
-    if city_normalized in mock_weather_db:
-        return mock_weather_db[city_normalized]
+    if data is not None:
+        report = data.get("report") or f"The weather in {data['city']} is {data['condition']} with a temperature of {data['temp_c']}°C."
+        return {"status": "success", "report": report}
     else:
         return {"status": "error", "error_message": f"Sorry, I don't have weather information for '{city}'."}
 
@@ -35,6 +41,7 @@ def get_weather(city: str) -> dict:
 
 
 
+@cacheable(ttl=None)
 def say_hello(name: str = "there") -> str:
     """Provides a simple greeting, optionally addressing the user by name.
 
@@ -47,6 +54,7 @@ def say_hello(name: str = "there") -> str:
     print(f"--- Tool: say_hello called with name: {name} ---")
     return f"Hello, {name}!"
 
+@cacheable(ttl=None)
 def say_goodbye() -> str:
     """Provides a simple farewell message to conclude the conversation."""
     print(f"--- Tool: say_goodbye called ---")
@@ -63,29 +71,12 @@ def get_weather_stateful(city: str, tool_context: ToolContext) -> dict:
     preferred_unit = tool_context.state.get("user_preference_temperature_unit", "Celsius") # Default to Celsius
     print(f"--- Tool: Reading state 'user_preference_temperature_unit': {preferred_unit} ---")
 
-    city_normalized = city.lower().replace(" ", "")
-
-    # Mock weather data (always stored in Celsius internally)
-    mock_weather_db = {
-        "newyork": {"temp_c": 25, "condition": "sunny"},
-        "london": {"temp_c": 15, "condition": "cloudy"},
-        "tokyo": {"temp_c": 18, "condition": "light rain"},
-    }
-
-    if city_normalized in mock_weather_db:
-        data = mock_weather_db[city_normalized]
-        temp_c = data["temp_c"]
-        condition = data["condition"]
+    # Weather data is always stored in Celsius internally
+    data = get_weather_provider().lookup(city)
 
+    if data is not None:
         # Format temperature based on state preference
-        if preferred_unit == "Fahrenheit":
-            temp_value = (temp_c * 9/5) + 32 # Calculate Fahrenheit
-            temp_unit = "°F"
-        else: # Default to Celsius
-            temp_value = temp_c
-            temp_unit = "°C"
-
-        report = f"The weather in {city.capitalize()} is {condition} with a temperature of {temp_value:.0f}{temp_unit}."
+        report = f"The weather in {data['city']} is {data['condition']} with a temperature of {format_temperature(data['temp_c'], preferred_unit)}."
         result = {"status": "success", "report": report}
         print(f"--- Tool: Generated report in {preferred_unit}. Result: {result} ---")
 
@@ -100,7 +91,45 @@ def get_weather_stateful(city: str, tool_context: ToolContext) -> dict:
         print(f"--- Tool: City '{city}' not found. ---")
         return {"status": "error", "error_message": error_msg}
 
-def execute_maven_command(command: str, working_dir: str) -> dict:
+def get_weather_batch(cities: list[str], tool_context: ToolContext) -> dict:
+    """Retrieves the weather for several cities in one call, in the user's preferred unit.
+
+    Args:
+        cities (list[str]): The city names (e.g., ["London", "Tokyo", "New York"]).
+
+    Returns:
+        dict: A dictionary with a 'status' key ('success' if at least one city was found,
+              otherwise 'error'), a 'reports' list with one report per city found and,
+              if some cities are unknown, an 'errors' list.
+    """
+    print(f"--- Tool: get_weather_batch called for cities: {cities} ---")
+
+    preferred_unit = tool_context.state.get("user_preference_temperature_unit", "Celsius")
+    results = get_weather_provider().lookup_many(list(cities))
+
+    reports, errors, last_found = [], [], None
+    for city in cities:
+        data = results.get(city)
+        if data is None:
+            errors.append(f"Sorry, I don't have weather information for '{city}'.")
+            continue
+        reports.append(f"The weather in {data['city']} is {data['condition']} with a temperature of {format_temperature(data['temp_c'], preferred_unit)}.")
+        last_found = city
+
+    if last_found is not None:
+        tool_context.state["last_city_checked_stateful"] = last_found
+
+    result = {"status": "success" if reports else "error", "reports": reports}
+    if errors:
+        result["errors"] = errors
+    return result
+
+async def _offload_output(result: dict, tool_context) -> dict:
+    """Replaces a long build log by an artifact handle with a preview."""
+    handle = await offload(tool_context, "maven-output", result.get("output"))
+    return {**result, "output": handle} if handle else result
+
+async def execute_maven_command(command: str, working_dir: str, tool_context: ToolContext = None) -> dict:
     """Executes a Maven command and returns the result.
 
     Args:
@@ -111,47 +140,36 @@ def execute_maven_command(command: str, working_dir: str) -> dict:
     Returns:
         dict: A dictionary containing:
             - status: "success" or "error"
-            - output: The command output if successful
+            - output: The command output (long output is stored as an artifact and
+              replaced by a handle with a preview)
             - error: Error message if the command failed
+            - cached: True if the result came from the Maven result cache
     """
-    import subprocess
-    import os
-    from typing import Optional
-
     print(f"--- Tool: execute_maven_command called with command: {command} ---")
 
     try:
-        # Construct the full Maven command
-        mvn_cmd = ["mvn"] + command.split()
-        
-        # Set up the working directory if specified
-        cwd = working_dir if working_dir else os.getcwd()
-        
-        # Execute the command and capture output
-        result = subprocess.run(
-            mvn_cmd,
-            cwd=cwd,
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        
-        return {
-            "status": "success",
-            "output": result.stdout,
-            "error": None
-        }
-        
-    except subprocess.CalledProcessError as e:
-        return {
-            "status": "error",
-            "output": None,
-            "error": f"Maven command failed: {e.stderr}"
-        }
+        # Opt-in result cache (MAVEN_CACHE_DIR): an unchanged project returns
+        # the stored result of the same command without running Maven.
+        cache = get_maven_cache() if is_cacheable(command) else None
+        cache_key = None
+        if cache is not None:
+            cache_key = await asyncio.to_thread(cache.key, command, working_dir)
+            cached = await asyncio.to_thread(cache.get, cache_key)
+            if cached is not None:
+                print(f"--- Tool: execute_maven_command cache hit for: {command} ---")
+                return await _offload_output({**cached, "cached": True}, tool_context)
+
+        # Runs as an asyncio subprocess, so other requests keep being served
+        # while the build runs; the shared executor bounds concurrent builds.
+        result = await get_maven_executor().run(command, working_dir)
+
+        # Only successful builds are stored; failures may be transient (e.g. downloads).
+        if cache_key is not None and result["status"] == "success":
+            await asyncio.to_thread(cache.put, cache_key, result)
+        return await _offload_output({**result, "cached": False}, tool_context)
     except Exception as e:
         return {
             "status": "error",
             "output": None,
             "error": f"Unexpected error executing Maven command: {str(e)}"
         }
-
@@ -0,0 +1,270 @@
+import contextlib
+import contextvars
+import json
+import os
+import secrets
+import threading
+import time
+
+from . import metrics
+
+
+SERVICE_NAME = "team-agents"
+
+# Where finished traces are appended as OTLP/JSON lines; tracing to a file is off when unset.
+TRACE_EXPORT_PATH = os.environ.get("TRACE_EXPORT_PATH")
+
+# Traces whose root span never ends are dropped once this many are buffered.
+_MAX_BUFFERED_TRACES = 1000
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+
+class Span:
+    """One timed operation in a trace (an agent turn, a hop, a tool call, ...)."""
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "start_ns", "end_ns", "attributes", "error")
+
+    def __init__(self, name: str, parent: "Span" = None, attributes: dict = None):
+        self.name = name
+        self.trace_id = parent.trace_id if parent else secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent.span_id if parent else None
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.attributes = dict(attributes or {})
+        self.error = None
+
+    @property
+    def duration(self) -> float:
+        end = self.end_ns if self.end_ns is not None else time.time_ns()
+        return (end - self.start_ns) / 1e9
+
+    def set(self, **attributes) -> None:
+        self.attributes.update({k: v for k, v in attributes.items() if v is not None})
+
+    def add(self, key: str, value: float) -> None:
+        """Accumulates a numeric attribute, e.g. tokens used across several model calls."""
+        self.attributes[key] = self.attributes.get(key, 0) + value
+
+    def end(self, error: BaseException = None) -> None:
+        if self.end_ns is not None:
+            return
+        self.end_ns = time.time_ns()
+        if error is not None:
+            self.error = f"{type(error).__name__}: {error}"
+        if self.parent_id is None:
+            # Before the root is exported, which writes out (and forgets) the trace.
+            _close_open_spans(self.trace_id)
+        _exporter.finish(self)
+
+
+def _otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_span(span: Span) -> dict:
+    encoded = {
+        "traceId": span.trace_id,
+        "spanId": span.span_id,
+        "name": span.name,
+        "kind": 1,
+        "startTimeUnixNano": str(span.start_ns),
+        "endTimeUnixNano": str(span.end_ns),
+        "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in span.attributes.items()],
+        "status": {"code": 2, "message": span.error} if span.error else {"code": 1},
+    }
+    if span.parent_id:
+        encoded["parentSpanId"] = span.parent_id
+    return encoded
+
+
+class _Exporter:
+    """Aggregates span durations into histograms and writes finished traces as OTLP/JSON lines.
+
+    Spans are buffered per trace and written, one line per trace, when the
+    trace's root span ends. Each line is an OTLP `ExportTraceServiceRequest`
+    and can be replayed into any OTLP/HTTP JSON collector.
+    """
+
+    def __init__(self, path: str = None):
+        self.path = path
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def finish(self, span: Span) -> None:
+        metrics.observe("span_duration_seconds", span.duration, labels={"name": span.name},
+                        help="Duration of traced operations by span name.")
+        if span.error:
+            metrics.inc_counter("span_errors_total", labels={"name": span.name},
+                                help="Traced operations that raised an error.")
+        if not self.path:
+            return
+        with self._lock:
+            spans = self._pending.setdefault(span.trace_id, [])
+            spans.append(span)
+            if span.parent_id is not None:
+                if len(self._pending) > _MAX_BUFFERED_TRACES:
+                    self._pending.pop(next(iter(self._pending)))
+                return
+            del self._pending[span.trace_id]
+        self._write(spans)
+
+    def _write(self, spans: list) -> None:
+        request = {"resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+            "scopeSpans": [{"scope": {"name": "app.tracing"}, "spans": [_otlp_span(s) for s in spans]}],
+        }]}
+        line = json.dumps(request, default=str)
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+_exporter = _Exporter(TRACE_EXPORT_PATH)
+
+
+def configure(path: str = None) -> None:
+    """Sets (or clears, with None) the OTLP/JSON export file."""
+    _exporter.path = path
+
+
+def current_span():
+    return _current_span.get()
+
+
+def start_span(name: str, parent: Span = None, **attributes) -> Span:
+    """Starts a span without making it current; the caller must call `end()`."""
+    return Span(name, parent or _current_span.get(), attributes)
+
+
+@contextlib.contextmanager
+def span(name: str, **attributes):
+    """Times the enclosed block as a child of the current span and makes it current."""
+    s = start_span(name, **attributes)
+    token = _current_span.set(s)
+    try:
+        yield s
+    except BaseException as e:
+        s.end(error=e)
+        raise
+    finally:
+        _current_span.reset(token)
+        s.end()
+
+
+def record_usage(s: Span, usage_metadata, agent: str = None) -> None:
+    """Adds the token counts of a model response to a span and to the token counters."""
+    if usage_metadata is None:
+        return
+    for attribute, kind in (("prompt_token_count", "prompt"), ("candidates_token_count", "completion")):
+        count = getattr(usage_metadata, attribute, None) or 0
+        if count:
+            s.add(f"gen_ai.usage.{kind}_tokens", count)
+            metrics.inc_counter("model_tokens_total", count, labels={"agent": agent or "", "kind": kind},
+                                help="Model tokens used, by agent and kind.")
+
+
+class TurnTracer:
+    """Turns the event stream of one `runner.run_async` call into hop spans.
+
+    Each run of consecutive events by the same author (the root agent, then a
+    sub-agent after a transfer, ...) becomes an 'agent.hop' child of the turn
+    span, carrying the hop's token counts and the transfers it made.
+    """
+
+    def __init__(self, turn: Span):
+        self.turn = turn
+        self._hop = None
+
+    def observe(self, event) -> None:
+        if self._hop is None or self._hop.attributes.get("agent") != event.author:
+            if self._hop is not None:
+                self._hop.end()
+            self._hop = start_span("agent.hop", parent=self.turn, agent=event.author)
+        record_usage(self._hop, getattr(event, "usage_metadata", None), agent=event.author)
+        record_usage(self.turn, getattr(event, "usage_metadata", None))
+        if event.actions and event.actions.transfer_to_agent:
+            self._hop.set(transfer_to=event.actions.transfer_to_agent)
+
+    def close(self) -> None:
+        if self._hop is not None:
+            self._hop.end()
+            self._hop = None
+
+
+# --- ADK agent callbacks: model and tool spans ---
+
+# Spans started by a before_* callback until the matching after_* callback.
+# When a model or tool raises, the after_* callback never runs; those spans
+# are ended when their turn (the trace's root span) ends.
+_open_spans = {}
+_open_lock = threading.Lock()
+
+
+def _open_span(key: tuple, s: Span) -> None:
+    with _open_lock:
+        _open_spans[key] = s
+        # Spans outside any turn have no root to clean them up; keep the oldest from piling up.
+        stale = _open_spans.pop(next(iter(_open_spans))) if len(_open_spans) > _MAX_BUFFERED_TRACES else None
+    if stale is not None:
+        stale.error = "Span was never finished."
+        stale.end()
+
+
+def _pop_span(key: tuple):
+    with _open_lock:
+        return _open_spans.pop(key, None)
+
+
+def _close_open_spans(trace_id: str) -> None:
+    with _open_lock:
+        keys = [key for key, s in _open_spans.items() if s.trace_id == trace_id]
+        leftovers = [_open_spans.pop(key) for key in keys]
+    for s in leftovers:
+        s.error = "Call did not finish before its turn ended (it raised or was cancelled)."
+        s.end()
+
+
+def _model_key(callback_context) -> tuple:
+    return "model", callback_context.invocation_id, callback_context.agent_name
+
+
+def before_model_callback(callback_context, llm_request):
+    _open_span(_model_key(callback_context), start_span(
+        "model.generate", agent=callback_context.agent_name, model=llm_request.model))
+    return None
+
+
+def after_model_callback(callback_context, llm_response):
+    s = _open_spans.get(_model_key(callback_context))
+    if s is not None:
+        record_usage(s, getattr(llm_response, "usage_metadata", None))
+        if not llm_response.partial:
+            _pop_span(_model_key(callback_context))
+            s.end()
+    return None
+
+
+def _tool_key(tool_context) -> tuple:
+    return "tool", tool_context.invocation_id, tool_context.function_call_id
+
+
+def before_tool_callback(tool, args, tool_context):
+    _open_span(_tool_key(tool_context), start_span(
+        "tool.call", tool=tool.name, agent=tool_context.agent_name))
+    return None
+
+
+def after_tool_callback(tool, args, tool_context, tool_response):
+    s = _pop_span(_tool_key(tool_context))
+    if s is not None:
+        if isinstance(tool_response, dict) and tool_response.get("status") == "error":
+            s.error = str(tool_response.get("error") or tool_response.get("error_message"))
+        s.end()
+    return None
@@ -0,0 +1,315 @@
+import ast
+import asyncio
+import re
+from dataclasses import dataclass, field
+
+from .artifacts import offload
+from . import metrics, tracing
+
+
+@dataclass
+class Finding:
+    rule: str
+    line: int
+    message: str
+
+    def describe(self) -> str:
+        return f"line {self.line}: {self.message} [{self.rule}]"
+
+
+@dataclass
+class Chunk:
+    """Lines `start`..`end` (1-based, inclusive) of a source file."""
+    start: int
+    end: int
+    text: str
+    findings: list = field(default_factory=list)
+
+
+# --- Scanning ---
+
+_SECRET_WORDS = r"(?:password|passwd|pwd|secret|api[_-]?key|access[_-]?key|private[_-]?key|token|credentials?)"
+
+# (rule, regex, message); matched line by line on any language.
+REGEX_RULES = [
+    ("hardcoded-secret",
+     re.compile(_SECRET_WORDS + r"\w*\s*[:=]\s*['\"][^'\"\s]{3,}['\"]", re.IGNORECASE),
+     "Hardcoded secret assigned in source code."),
+    ("secret-in-string",
+     re.compile(r"['\"][^'\"]*\b" + _SECRET_WORDS + r"\b\s*(?:is|=|:)\s*[^'\"\s]{3,}[^'\"]*['\"]", re.IGNORECASE),
+     "Secret value embedded in a string literal."),
+    ("aws-access-key", re.compile(r"\bAKIA[0-9A-Z]{16}\b"), "AWS access key id in source code."),
+    ("private-key", re.compile(r"-----BEGIN (?:RSA |EC |OPENSSH |DSA )?PRIVATE KEY-----"), "Private key in source code."),
+    ("tls-verify-disabled", re.compile(r"\bverify\s*=\s*False\b|rejectUnauthorized\s*:\s*false"),
+     "TLS certificate verification disabled."),
+    ("weak-hash", re.compile(r"\b(?:md5|sha1)\s*\(", re.IGNORECASE), "Weak hash function."),
+    ("sql-concatenation",
+     re.compile(r"\b(?:SELECT|INSERT|UPDATE|DELETE)\b[^'\"]*['\"]\s*(?:\+|%|\.format\()", re.IGNORECASE),
+     "SQL built by string concatenation."),
+]
+
+_SECRET_TEXT = re.compile(r"\b" + _SECRET_WORDS + r"\b", re.IGNORECASE)
+_DANGEROUS_CALLS = {
+    "eval": "Use of eval() on dynamic input.",
+    "exec": "Use of exec() on dynamic input.",
+    "pickle.loads": "Unpickling untrusted data.",
+    "marshal.loads": "Unmarshalling untrusted data.",
+    "os.system": "Shell command built at runtime.",
+}
+_OUTPUT_CALLS = {"print", "logging.info", "logging.debug", "logging.warning", "logger.info", "logger.debug",
+                 "logger.warning", "console.log"}
+
+
+def _call_name(node: ast.Call) -> str:
+    parts = []
+    target = node.func
+    while isinstance(target, ast.Attribute):
+        parts.append(target.attr)
+        target = target.value
+    if isinstance(target, ast.Name):
+        parts.append(target.id)
+    return ".".join(reversed(parts))
+
+
+class _PythonScanner(ast.NodeVisitor):
+    def __init__(self):
+        self.findings = []
+
+    def visit_Call(self, node: ast.Call):
+        name = _call_name(node)
+        if name in _DANGEROUS_CALLS and not all(isinstance(a, ast.Constant) for a in node.args):
+            self.findings.append(Finding(name, node.lineno, _DANGEROUS_CALLS[name]))
+        if name.startswith("subprocess.") and any(
+                k.arg == "shell" and isinstance(k.value, ast.Constant) and k.value.value is True
+                for k in node.keywords):
+            self.findings.append(Finding("subprocess-shell", node.lineno, "subprocess call with shell=True."))
+        if name == "yaml.load" and not any(k.arg == "Loader" for k in node.keywords):
+            self.findings.append(Finding("yaml-load", node.lineno, "yaml.load without a safe Loader."))
+        if name in _OUTPUT_CALLS:
+            for arg in node.args:
+                for value in ast.walk(arg):
+                    if isinstance(value, ast.Constant) and isinstance(value.value, str) and _SECRET_TEXT.search(value.value):
+                        self.findings.append(Finding("secret-output", node.lineno, "Secret written to output or logs."))
+                        break
+        self.generic_visit(node)
+
+
+def scan(source: str) -> list:
+    """Returns the findings of the regex rules and, for Python sources, the AST rules.
+
+    Sources that do not parse as Python (JavaScript, Java, ...) only go
+    through the regex rules.
+    """
+    findings = []
+    for number, line in enumerate(source.splitlines(), start=1):
+        for rule, pattern, message in REGEX_RULES:
+            if pattern.search(line):
+                findings.append(Finding(rule, number, message))
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        tree = None
+    if tree is not None:
+        scanner = _PythonScanner()
+        scanner.visit(tree)
+        findings.extend(scanner.findings)
+    # One finding per rule and line is enough.
+    unique = {(f.rule, f.line): f for f in findings}
+    return sorted(unique.values(), key=lambda f: (f.line, f.rule))
+
+
+# --- Chunking ---
+
+
+def _python_boundaries(body: list) -> list:
+    """Start lines of the definitions in `body` and of each run of other statements.
+
+    Class bodies are split the same way, so every method is a chunk of its
+    own; the class line stays with whatever comes first in its body.
+    """
+    starts, previous_was_def = [], None
+    for node in body:
+        is_def = isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef))
+        start = min([node.lineno] + [d.lineno for d in getattr(node, "decorator_list", [])])
+        if is_def or previous_was_def is not False:
+            starts.append(start)
+        previous_was_def = is_def
+        if isinstance(node, ast.ClassDef):
+            starts.extend(_python_boundaries(node.body)[1:])
+    return starts
+
+
+def _brace_boundaries(lines: list) -> list:
+    """Start lines of top-level blocks in brace languages: a blank line at nesting depth 0 ends a block."""
+    starts, depth, at_boundary = [1], 0, False
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            at_boundary = depth == 0
+            continue
+        if at_boundary and number > 1:
+            starts.append(number)
+            at_boundary = False
+        depth = max(0, depth + line.count("{") + line.count("(") - line.count("}") - line.count(")"))
+    return starts
+
+
+def split_chunks(source: str) -> list:
+    """Splits a source file into function-level chunks that together cover every line.
+
+    Python files are split at functions, classes and methods (statements in
+    between form their own chunks); other languages at blank lines between
+    top-level blocks. Leading blank lines and comments stay with the chunk
+    that follows them.
+    """
+    lines = source.splitlines(keepends=True)
+    if not lines:
+        return []
+    try:
+        starts = _python_boundaries(ast.parse(source).body)
+    except (SyntaxError, ValueError):
+        starts = _brace_boundaries([line.rstrip("\n") for line in lines])
+    starts = sorted({1, *starts})
+
+    # Move each boundary up over the comments and blank lines directly above it.
+    adjusted = [1]
+    for start in starts[1:]:
+        while start - 1 > adjusted[-1] and (not lines[start - 2].strip() or lines[start - 2].lstrip().startswith(("#", "//"))):
+            start -= 1
+        if start > adjusted[-1]:
+            adjusted.append(start)
+
+    chunks = []
+    for i, start in enumerate(adjusted):
+        end = adjusted[i + 1] - 1 if i + 1 < len(adjusted) else len(lines)
+        chunks.append(Chunk(start=start, end=end, text="".join(lines[start - 1:end])))
+    return chunks
+
+
+def assign_findings(chunks: list, findings: list) -> list:
+    for finding in findings:
+        for chunk in chunks:
+            if chunk.start <= finding.line <= chunk.end:
+                chunk.findings.append(finding)
+                break
+    return [chunk for chunk in chunks if chunk.findings]
+
+
+# --- Pipeline ---
+
+
+def _chunk_report(chunk: Chunk, report: str) -> str:
+    lines = [f"Vulnerabilities found by the local scan in lines {chunk.start}-{chunk.end}"
+             " (keep the code's indentation, it may be part of a class):"]
+    lines += [f"- {finding.describe()}" for finding in chunk.findings]
+    if report:
+        lines.append(f"Report from the user: {report}")
+    return "\n".join(lines)
+
+
+def _keep_line_ending(original: str, fixed: str) -> str:
+    if original.endswith("\n") and not fixed.endswith("\n"):
+        return fixed + "\n"
+    return fixed
+
+
+async def fix_source(source: str, *, fixer, report: str = "", concurrency: int = 4) -> dict:
+    """Scans `source` locally and sends only the flagged chunks to `fixer`, concurrently.
+
+    Args:
+        source (str): The source code to fix.
+        fixer (callable): `await fixer(chunk_text, chunk_report)` returning the fixed chunk text.
+        report (str, optional): The vulnerability report given by the user; added to every chunk's report.
+        concurrency (int): Maximum number of chunks sent to the fixer at once.
+
+    Returns:
+        dict: 'status', 'fixed_source_code', the 'findings', and how many chunks
+        were sent to the fixer ('chunks_fixed' of 'chunks_total'). A source
+        without findings is returned unchanged without calling the fixer.
+    """
+    with tracing.span("vulnscan.fix", bytes=len(source)) as s:
+        findings = scan(source)
+        chunks = split_chunks(source)
+        flagged = assign_findings(chunks, findings)
+        s.set(findings=len(findings), chunks=len(chunks), flagged=len(flagged))
+        metrics.inc_counter("vulnscan_files_total", labels={"result": "flagged" if flagged else "clean"},
+                            help="Sources scanned before fixing, by result.")
+        result = {
+            "status": "success",
+            "findings": [finding.describe() for finding in findings],
+            "chunks_total": len(chunks),
+            "chunks_fixed": 0,
+        }
+        if not flagged:
+            result["fixed_source_code"] = source
+            result["message"] = "The local scan found no vulnerabilities; the source was not sent to the fixer."
+            return result
+
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        errors = []
+
+        async def fix(chunk: Chunk):
+            async with semaphore:
+                try:
+                    fixed = await fixer(chunk.text, _chunk_report(chunk, report))
+                except Exception as e:
+                    errors.append(f"lines {chunk.start}-{chunk.end}: {type(e).__name__}: {e}")
+                    return
+                if not fixed.strip():
+                    # An empty answer would delete the chunk; keep the original lines instead.
+                    errors.append(f"lines {chunk.start}-{chunk.end}: the fixer returned no code")
+                    return
+                chunk.text = _keep_line_ending(chunk.text, fixed)
+
+        await asyncio.gather(*(fix(chunk) for chunk in flagged))
+        metrics.inc_counter("vulnscan_chunks_fixed_total", value=len(flagged) - len(errors),
+                            help="Flagged chunks sent to the fixer and patched.")
+
+        # Chunks are contiguous and in order, so joining them rebuilds the file.
+        result["fixed_source_code"] = "".join(chunk.text for chunk in chunks)
+        result["chunks_fixed"] = len(flagged) - len(errors)
+        if errors:
+            result["status"] = "partial" if len(errors) < len(flagged) else "error"
+            result["errors"] = errors
+        return result
+
+
+def _result_text(result) -> str:
+    content = result.get("content", []) if isinstance(result, dict) else []
+    return "".join(part.get("text", "") for part in content if part.get("type") == "text")
+
+
+def build_fix_tool(mcp_fix_tool, *, concurrency: int = 4):
+    """Builds the agent's `fix_vulnerability` tool on top of the MCP `fix-vulnerability` tool.
+
+    The MCP tool is only called for the chunks the local scan flags, one call
+    per chunk, several at a time.
+    """
+    async def fixer(code: str, chunk_report: str) -> str:
+        result = await mcp_fix_tool.run_async(args={"sourceCode": code, "vulnerabilityReport": chunk_report},
+                                              tool_context=None)
+        if isinstance(result, dict) and result.get("isError"):
+            raise RuntimeError(_result_text(result) or "fix-vulnerability failed")
+        return _result_text(result)
+
+    async def fix_vulnerability(source_code: str, vulnerability_report: str = "", tool_context=None) -> dict:
+        """Fixes vulnerabilities in source code.
+
+        The code is scanned locally first; only the functions with findings are
+        sent to the fixer, and the patched functions are put back in place.
+
+        Args:
+            source_code (str): The source code to fix.
+            vulnerability_report (str, optional): The vulnerabilities reported by the user.
+
+        Returns:
+            dict: 'status', 'fixed_source_code' (an artifact handle with a preview when
+            long), the local 'findings' and how many chunks were fixed.
+        """
+        print(f"--- Tool: fix_vulnerability called for {len(source_code)} characters ---")
+        result = await fix_source(source_code, fixer=fixer, report=vulnerability_report, concurrency=concurrency)
+        handle = await offload(tool_context, "fixed-source", result["fixed_source_code"])
+        if handle:
+            result["fixed_source_code"] = handle
+        return result
+
+    return fix_vulnerability
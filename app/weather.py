@@ -0,0 +1,135 @@
+import difflib
+import os
+import re
+import unicodedata
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from .cache import TTLCache
+
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_city(city: str) -> str:
+    """Normalizes a city name for lookups: 'São Paulo ' -> 'saopaulo', 'New-York' -> 'newyork'."""
+    decomposed = unicodedata.normalize("NFKD", city or "")
+    ascii_only = decomposed.encode("ascii", "ignore").decode("ascii")
+    return _NON_ALNUM.sub("", ascii_only.casefold())
+
+
+class WeatherProvider(ABC):
+    """Source of current weather observations.
+
+    `lookup` returns a dict with 'city' (display name), 'temp_c' and
+    'condition', plus an optional pre-written 'report', or None when the
+    city is unknown.
+    """
+
+    @abstractmethod
+    def lookup(self, city: str) -> Optional[dict]:
+        ...
+
+    def lookup_many(self, cities: list[str]) -> dict:
+        """Looks up several cities at once; providers backed by an API can override this to batch."""
+        return {city: self.lookup(city) for city in cities}
+
+
+class MockWeatherProvider(WeatherProvider):
+    """The tutorial's mock weather data, behind a precomputed normalized index.
+
+    The index is built once, and also maps aliases (e.g. 'NYC') to their city.
+    Unknown names fall back to fuzzy matching, so small typos still resolve.
+    """
+
+    DATA = {
+        "New York": {"temp_c": 25, "condition": "sunny",
+                     "report": "The weather in New York is sunny with a temperature of 25°C."},
+        "London": {"temp_c": 15, "condition": "cloudy",
+                   "report": "It's cloudy in London with a temperature of 15°C."},
+        "Tokyo": {"temp_c": 18, "condition": "light rain",
+                  "report": "Tokyo is experiencing light rain and a temperature of 18°C."},
+    }
+
+    ALIASES = {
+        "New York": ["NYC", "New York City", "NY", "Big Apple", "Manhattan"],
+        "London": ["LDN", "London UK", "London England"],
+        "Tokyo": ["TYO", "Tokyo Japan", "東京"],
+    }
+
+    def __init__(self, *, fuzzy_cutoff: float = 0.8):
+        self.fuzzy_cutoff = fuzzy_cutoff
+        self._index = {}
+        for name, data in self.DATA.items():
+            record = {"city": name, **data}
+            self._index[normalize_city(name)] = record
+            for alias in self.ALIASES.get(name, []):
+                # Aliases that normalize to nothing (e.g. non-Latin scripts) are matched verbatim.
+                self._index[normalize_city(alias) or alias] = record
+        self._keys = list(self._index)
+
+    def lookup(self, city: str) -> Optional[dict]:
+        key = normalize_city(city) or (city or "").strip()
+        record = self._index.get(key)
+        if record is None and key:
+            matches = difflib.get_close_matches(key, self._keys, n=1, cutoff=self.fuzzy_cutoff)
+            if matches:
+                record = self._index[matches[0]]
+        return record
+
+
+class CachedWeatherProvider(WeatherProvider):
+    """Wraps a provider with a TTL/LRU cache keyed on the normalized city name."""
+
+    def __init__(self, provider: WeatherProvider, *, ttl: float = 300, maxsize: int = 1024):
+        self.provider = provider
+        self.cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def lookup(self, city: str) -> Optional[dict]:
+        key = normalize_city(city) or city
+        record = self.cache.get(key)
+        if record is None:
+            record = self.provider.lookup(city)
+            if record is not None:
+                self.cache.set(key, record)
+        return record
+
+    def lookup_many(self, cities: list[str]) -> dict:
+        results = {}
+        missing = []
+        for city in cities:
+            record = self.cache.get(normalize_city(city) or city)
+            if record is None:
+                missing.append(city)
+            results[city] = record
+        if missing:
+            for city, record in self.provider.lookup_many(missing).items():
+                if record is not None:
+                    self.cache.set(normalize_city(city) or city, record)
+                results[city] = record
+        return results
+
+
+def format_temperature(temp_c: float, preferred_unit: str) -> str:
+    """Formats a Celsius temperature in the user's preferred unit, e.g. '77°F'."""
+    if preferred_unit == "Fahrenheit":
+        return f"{(temp_c * 9/5) + 32:.0f}°F"
+    return f"{temp_c:.0f}°C"
+
+
+_provider = None
+
+
+def get_weather_provider() -> WeatherProvider:
+    """Returns the process-wide provider (the mock data behind a cache by default)."""
+    global _provider
+    if _provider is None:
+        ttl = float(os.environ.get("WEATHER_CACHE_TTL", "300"))
+        _provider = CachedWeatherProvider(MockWeatherProvider(), ttl=ttl)
+    return _provider
+
+
+def set_weather_provider(provider: WeatherProvider) -> None:
+    """Replaces the provider used by the weather tools (e.g. with a real API client)."""
+    global _provider
+    _provider = provider
@@ -0,0 +1,194 @@
+"""Offline end-to-end benchmark of the agent orchestration path.
+
+Every agent runs on the local ScriptedLlm (`model="scripted"`), so no API keys
+or network access are needed and the numbers only reflect our own overhead:
+the Runner, agent transfers, tool calls, sessions and the FastAPI endpoint.
+
+Usage:
+    uv run python benchmarks/bench_agents.py --turns 200 --concurrency 8
+    uv run python benchmarks/bench_agents.py --compare          # diff against the previous result
+"""
+import argparse
+import asyncio
+import glob
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+sys.path.insert(0, ROOT)
+
+# Keep sessions out of the working tree and point the team at the scripted model
+# before anything reads the configuration.
+os.environ.setdefault("SESSION_DB_PATH", os.path.join(tempfile.mkdtemp(prefix="bench-"), "sessions.db"))
+os.environ["TEAM_MODEL"] = "scripted"
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(latencies, elapsed):
+    return {
+        "turns": len(latencies),
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "mean_ms": statistics.fmean(latencies) * 1000 if latencies else 0.0,
+        "throughput_per_s": len(latencies) / elapsed if elapsed else 0.0,
+    }
+
+
+async def run_concurrently(turn, *, turns, concurrency):
+    """Runs `turn(i)` `turns` times with at most `concurrency` in flight; returns latencies and wall time."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(i):
+        async with semaphore:
+            started = time.perf_counter()
+            await turn(i)
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(turns)))
+    return latencies, time.perf_counter() - started
+
+
+async def measure_allocations(turn, *, turns):
+    """Runs turns sequentially under tracemalloc and returns allocated blocks and KiB per turn."""
+    await turn(-1)  # warm caches so one-off imports are not counted
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    for i in range(turns):
+        await turn(-2 - i)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    stats = after.compare_to(before, "filename")
+    blocks = sum(s.count_diff for s in stats if s.count_diff > 0)
+    size = sum(s.size_diff for s in stats if s.size_diff > 0)
+    return {"alloc_blocks_per_turn": blocks / turns, "alloc_kib_per_turn": size / 1024 / turns}
+
+
+async def bench_call_agent(args):
+    from app.session import get_session_service, get_session_stateful
+    from app.registry import AgentRegistry
+    from app.team import build_agent_team
+    import main
+
+    registry = AgentRegistry(app_name=main.APP_NAME, builder=build_agent_team,
+                             session_service=get_session_service())
+    runner = await registry.ensure(model=main.get_team_model(), tools=[])
+
+    async def turn(i):
+        session_id = f"bench-call-{i % args.concurrency}"
+        get_session_stateful(app_name=main.APP_NAME, user_id=main.USER_ID, session_id=session_id,
+                             session_service=registry.session_service)
+        await main.call_agent_async(query="hi my name is Ramon", runner=runner,
+                                    user_id=main.USER_ID, session_id=session_id)
+
+    latencies, elapsed = await run_concurrently(turn, turns=args.turns, concurrency=args.concurrency)
+    return {**summarize(latencies, elapsed), **await measure_allocations(turn, turns=args.alloc_turns),
+            "build_ms": registry.build_seconds * 1000}
+
+
+async def bench_mcp_endpoint(args):
+    import httpx
+    from app.session import get_session_service
+    from app.registry import AgentRegistry
+    from app.team import build_agent_team, build_prerouter
+    import main
+
+    # The lifespan would spawn the MCP stdio servers; the benchmark wires the state by hand.
+    main.app.state.mcp_tools = []
+    main.app.state.prerouter = build_prerouter()
+    main.app.state.agent_registry = AgentRegistry(app_name=main.APP_NAME, builder=build_agent_team,
+                                                  session_service=get_session_service())
+    await main.app.state.agent_registry.ensure(model=main.get_team_model(), tools=[])
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def turn(i):
+            response = await client.post("/mcp/bench", json={"turn": i})
+            response.raise_for_status()
+
+        latencies, elapsed = await run_concurrently(turn, turns=args.turns, concurrency=args.concurrency)
+        return {**summarize(latencies, elapsed), **await measure_allocations(turn, turns=args.alloc_turns)}
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+def compare(current, previous):
+    print(f"\nComparison with {previous['revision']} ({previous['timestamp']}):")
+    for name, result in current["benchmarks"].items():
+        before = previous["benchmarks"].get(name)
+        if not before:
+            continue
+        for metric in ("p50_ms", "p95_ms", "p99_ms", "throughput_per_s", "alloc_blocks_per_turn"):
+            old, new = before.get(metric), result.get(metric)
+            if old:
+                print(f"  {name:<18} {metric:<22} {old:10.2f} -> {new:10.2f} ({(new - old) / old * 100:+.1f}%)")
+
+
+async def main_async(args):
+    from app.fake_model import register_scripted_model
+    register_scripted_model(latency=args.model_latency)
+
+    benchmarks = {}
+    if args.target in ("all", "call_agent_async"):
+        benchmarks["call_agent_async"] = await bench_call_agent(args)
+    if args.target in ("all", "mcp_endpoint"):
+        benchmarks["mcp_endpoint"] = await bench_mcp_endpoint(args)
+    return benchmarks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", choices=["all", "call_agent_async", "mcp_endpoint"], default="all")
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--alloc-turns", type=int, default=20, help="sequential turns measured under tracemalloc")
+    parser.add_argument("--model-latency", type=float, default=0.0, help="seconds the scripted model waits per call")
+    parser.add_argument("--compare", action="store_true", help="compare with the most recent stored result")
+    parser.add_argument("--no-save", action="store_true", help="do not store this result")
+    args = parser.parse_args()
+
+    previous_files = sorted(glob.glob(os.path.join(RESULTS_DIR, "*.json")))
+    benchmarks = asyncio.run(main_async(args))
+    result = {
+        "revision": git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "config": {"turns": args.turns, "concurrency": args.concurrency, "model_latency": args.model_latency},
+        "benchmarks": benchmarks,
+    }
+    print(json.dumps(result, indent=2))
+
+    if args.compare and previous_files:
+        with open(previous_files[-1]) as f:
+            compare(result, json.load(f))
+    if not args.no_save:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        path = os.path.join(RESULTS_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{result['revision']}.json")
+        with open(path, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"\nSaved {path}")
+
+
+if __name__ == "__main__":
+    main()
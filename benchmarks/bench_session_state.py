@@ -0,0 +1,69 @@
+"""Session state load time as sessions grow: delta log with snapshots vs. replaying every delta.
+
+Each turn writes the kind of deltas the team produces (`last_city_checked_stateful`
+from get_weather_stateful, `last_weather_report` through the root agent's
+output_key, plus a turn counter) into an SQLite state log, then measures how long
+loading the session's state takes after 10, 100, 1000 ... turns.
+
+Usage:
+    uv run python benchmarks/bench_session_state.py --turns 10000
+"""
+import argparse
+import os
+import sqlite3
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from app.state_log import SNAPSHOT_INTERVAL, StateLog, session_scope  # noqa: E402
+
+CITIES = ["New York", "London", "Tokyo", "Paris", "Sydney"]
+
+
+def delta(turn):
+    city = CITIES[turn % len(CITIES)]
+    return {
+        "last_city_checked_stateful": city,
+        "last_weather_report": f"The weather in {city} is sunny with a temperature of {20 + turn % 10}°C.",
+        "turns": turn,
+    }
+
+
+def load_ms(log, conn, scope, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        log.load(conn, scope)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=10000)
+    parser.add_argument("--interval", type=int, default=SNAPSHOT_INTERVAL, help="deltas between snapshots")
+    parser.add_argument("--repeat", type=int, default=20, help="loads measured per checkpoint")
+    args = parser.parse_args()
+
+    variants = {"snapshots": StateLog(args.interval), "replay all": StateLog(args.turns + 1)}
+    conns = {}
+    for name, log in variants.items():
+        conns[name] = sqlite3.connect(":memory:", isolation_level=None)
+        log.create_tables(conns[name])
+    scope = session_scope("bench", "user", "session")
+
+    checkpoints = {10 ** p for p in range(1, 8) if 10 ** p <= args.turns} | {args.turns}
+    print(f"{'turns':>8}  " + "  ".join(f"{name:>14}" for name in variants))
+    for turn in range(1, args.turns + 1):
+        for name, log in variants.items():
+            log.append(conns[name], scope, delta(turn))
+        if turn in checkpoints:
+            row = [f"{load_ms(log, conns[name], scope, args.repeat):11.3f} ms" for name, log in variants.items()]
+            print(f"{turn:>8}  " + "  ".join(row))
+
+
+if __name__ == "__main__":
+    main()
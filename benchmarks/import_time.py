@@ -0,0 +1,85 @@
+"""Startup benchmark: how long `import main` takes in a fresh interpreter.
+
+Each run starts a new Python process with `-X importtime`, so nothing is
+cached in memory. The budget applies to the time spent beyond the web stack:
+the cumulative time of the `--baseline` module (fastapi, which pulls in
+starlette and pydantic) is taken from the same run and subtracted. The web
+stack alone takes 400-450 ms and varies with the machine; this repo's own
+imports measured 80-100 ms on top of it, so the default budget of 150 ms
+leaves about 50% headroom and still catches any heavy import (google.adk,
+litellm, mcp each take several hundred ms) creeping back into the module
+level. The median of several runs is compared with the budget and the script
+exits with status 1 when it is over.
+
+Usage:
+    uv run python benchmarks/import_time.py                       # import main, budget from IMPORT_BUDGET_MS
+    uv run python benchmarks/import_time.py --module app --baseline '' --budget-ms 100
+    uv run python benchmarks/import_time.py --preload             # with APP_PRELOAD=1, for comparison
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# "import time: self [us] | cumulative | imported package"
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def measure(module, preload=False):
+    """Imports `module` in a fresh interpreter; returns the total seconds and the per-module cumulative times."""
+    env = dict(os.environ, APP_PRELOAD="1" if preload else "0")
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          cwd=ROOT, env=env, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+    modules = {}
+    for line in proc.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            modules[match.group(4)] = int(match.group(2)) / 1e6
+    return modules.get(module, 0.0), modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=float(os.environ.get("IMPORT_BUDGET_MS", "150")),
+                        help="budget for the import time beyond the baseline")
+    parser.add_argument("--baseline", default=os.environ.get("IMPORT_BASELINE", "fastapi"),
+                        help="module whose import time is not counted against the budget ('' for none)")
+    parser.add_argument("--top", type=int, default=10, help="slowest imports to list")
+    parser.add_argument("--preload", action="store_true", help="measure with APP_PRELOAD=1")
+    args = parser.parse_args()
+
+    measure(args.module, args.preload)  # write .pyc files so every measured run starts alike
+    totals, baselines, slowest = [], [], {}
+    for _ in range(args.runs):
+        total, modules = measure(args.module, args.preload)
+        totals.append(total)
+        baselines.append(modules.get(args.baseline, 0.0) if args.baseline else 0.0)
+        for name, seconds in modules.items():
+            slowest.setdefault(name, []).append(seconds)
+
+    # Subtracting within each run cancels most of the machine's run-to-run noise.
+    median_ms = statistics.median(total - base for total, base in zip(totals, baselines)) * 1000
+    print(f"import {args.module}: median {statistics.median(totals) * 1000:.1f} ms over {args.runs} runs "
+          f"(min {min(totals) * 1000:.1f}, max {max(totals) * 1000:.1f})")
+    if args.baseline:
+        print(f"  of which {args.baseline}: median {statistics.median(baselines) * 1000:.1f} ms")
+    print(f"beyond the baseline: median {median_ms:.1f} ms; budget {args.budget_ms:.0f} ms")
+    top_level = {name: statistics.median(s) for name, s in slowest.items() if "." not in name and name != args.module}
+    for name, seconds in sorted(top_level.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {seconds * 1000:8.1f} ms  {name}")
+
+    if median_ms > args.budget_ms:
+        print(f"FAIL: import {args.module} is {median_ms - args.budget_ms:.1f} ms over budget.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
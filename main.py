@@ -1,29 +1,74 @@
 from fastapi import FastAPI, HTTPException, Request
-from pydantic import BaseModel
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, Field
+from typing import Optional
 import asyncio
+import contextlib
 
 from dotenv import load_dotenv
 import os
-from google.adk.agents import Agent
-from google.adk.models.lite_llm import LiteLlm # For multi-model support
-from google.adk.sessions import InMemorySessionService
-from google.adk.runners import Runner
-from google.genai import types # For creating message Content/Parts
 import warnings
 
-from google.adk.tools.mcp_tool.mcp_toolset import (
-    MCPToolset,
-    SseServerParams,
-    StdioServerParameters,
-)
-from app import get_weather, get_session, get_session_stateful, get_runner, say_hello, say_goodbye, get_weather_stateful
+# Only light modules are imported here. google.adk, google.genai, litellm and
+# mcp take seconds to import, so they are imported where they are first used
+# (mostly in `lifespan`) and `import main` stays fast. APP_PRELOAD=1 imports
+# them up front instead, e.g. in a pre-forking server's parent process.
+import app as app_package
 from app.models import MODEL_GEMINI_2_0_FLASH, MODEL_GPT_4O, MODEL_CLAUDE_SONNET
+from app import metrics, tracing
+from app.batch import run_batch, DEFAULT_CONCURRENCY, MAX_CONCURRENCY
 
-from app.agentUtils import createAgent
-from app.tools import execute_maven_command
+if os.environ.get("APP_PRELOAD", "0") == "1":
+    app_package.preload()
 
 
-app = FastAPI()
+APP_NAME = "weather_tutorial_agent_team"
+USER_ID = "user_1_agent_team"
+SESSION_ID = "session_001_agent_team"
+
+
+def get_team_model():
+    """The model every agent in the team uses; override with the TEAM_MODEL env var.
+
+    TEAM_MODEL=routed picks a model per agent role from measured latency, errors and cost.
+    """
+    return os.environ.get("TEAM_MODEL", MODEL_GEMINI_2_0_FLASH)
+
+
+def current_mcp_tools(app: FastAPI) -> list:
+    """The MCP tools as of now; the pool replaces them when the server's tool manifest changes."""
+    pool = getattr(app.state, "mcp_pool", None)
+    return pool.tools() if pool is not None else app.state.mcp_tools
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Starts the MCP session pool and builds the agent graph once for the whole process."""
+    from app import model_clients
+    from app.model_router import MODEL_ROUTED, get_router
+    from app.mcp_pool import MCPSessionPool
+    from app.registry import AgentRegistry
+    from app.session import get_session_service
+    from app.team import build_agent_team, build_prerouter, build_fanout
+
+    team_model = get_team_model()
+    await model_clients.warm_up(get_router().models() if team_model == MODEL_ROUTED else [team_model])
+    app.state.mcp_pool = await MCPSessionPool(get_server_params()).start()
+    app.state.mcp_tools = app.state.mcp_pool.tools()
+    app.state.agent_registry = AgentRegistry(app_name=APP_NAME,
+                                             builder=build_agent_team,
+                                             session_service=get_session_service(),
+                                             fanout_builder=build_fanout)
+    await app.state.agent_registry.ensure(model=get_team_model(), tools=app.state.mcp_tools)
+    app.state.prerouter = build_prerouter()
+    try:
+        yield
+    finally:
+        await app.state.mcp_pool.close()
+        await model_clients.close()
+
+
+app = FastAPI(lifespan=lifespan)
 
 # Sample in-memory "database"
 fake_db = {"foo": "bar"}
@@ -50,53 +95,77 @@ async def create_item(item: Item):
 
 
 
-server_params = StdioServerParameters(
-      command="node",
-      args=["/Users/clearencewissar/clwd_per_code/ai-agent-claude/multi-agent/team-agents/stdio_server/build/index.js"],
-      env={},
-      cwd="/Users/clearencewissar/clwd_per_code/ai-agent-claude/multi-agent/team-agents/stdio_server",
-      encoding="utf-8",
-      encoding_error_handler="strict"
-  )
-  
-async def get_tools_async():
-  """Gets tools from the File System MCP Server."""
-  try:
-      tools, exit_stack = await MCPToolset.from_server(
-          connection_params=server_params
+def get_server_params():
+    """Parameters of the stdio MCP server; `mcp` is only imported when the pool starts."""
+    from mcp import StdioServerParameters
+    return StdioServerParameters(
+          command="node",
+          args=["/Users/clearencewissar/clwd_per_code/ai-agent-claude/multi-agent/team-agents/stdio_server/build/index.js"],
+          env={},
+          cwd="/Users/clearencewissar/clwd_per_code/ai-agent-claude/multi-agent/team-agents/stdio_server",
+          encoding="utf-8",
+          encoding_error_handler="strict"
       )
-      print("MCP Toolset created successfully.")
-      return tools, exit_stack
-  except Exception as e:
-      print(f"Error creating MCP Toolset: {e}")
-      return None, None
 
 
 # Calls the agent asynchronously
-async def call_agent_async(query: str, runner, user_id, session_id):
+async def call_agent_async(query: str, runner, user_id, session_id, prerouter=None, fanout=None):
   """Sends a query to the agent and prints the final response."""
-  print(f">>> User Query: {query}")
+  from google.genai import types # For creating message Content/Parts
+  from app import resilience
 
-  # Prepare the user's message in ADK format
-  content = types.Content(role='user', parts=[types.Part(text=query)])
-
-  final_response_text = "Agent did not produce a final response." # Default
-
-  # Key Concept: run_async executes the agent logic and yields Events.
-  # We iterate through events to find the final answer.
-  async for event in runner.run_async(user_id=user_id, session_id=session_id, new_message=content):
-      # You can uncomment the line below to see *all* events during execution
-      # print(f"  [Event] Author: {event.author}, Type: {type(event).__name__}, Final: {event.is_final_response()}, Content: {event.content}")
+  print(f">>> User Query: {query}")
 
-      # Key Concept: is_final_response() marks the concluding message for the turn.
-      if event.is_final_response():
-          if event.content and event.content.parts:
-             # Assuming text response in the first part
-             final_response_text = event.content.parts[0].text
-          elif event.actions and event.actions.escalate: # Handle potential errors/escalations
-             final_response_text = f"Agent escalated: {event.error_message or 'No specific message.'}"
-          # Add more checks here if needed (e.g., specific error codes)
-          break # Stop processing events once the final response is found
+  # The whole turn is one trace: agent hops, model and tool calls, MCP round
+  # trips and session reads/writes become child spans. Every model call in it,
+  # including those of sub-agents, must finish before the turn deadline.
+  with tracing.span("agent.turn", user_id=user_id, session_id=session_id) as turn, \
+          resilience.deadline(resilience.TURN_DEADLINE_SECONDS):
+      # Trivial turns (e.g. "hi", "bye") are answered locally without any model call.
+      if prerouter is not None:
+          local_response = await prerouter.try_dispatch(query,
+                                                        session_service=runner.session_service,
+                                                        app_name=runner.app_name,
+                                                        user_id=user_id,
+                                                        session_id=session_id)
+          if local_response is not None:
+              turn.set(prerouted=True)
+              print(f"<<< Agent Response: {local_response}")
+              return local_response
+
+      # Independent sub-tasks (e.g. a Maven build and a vulnerability fix) run concurrently.
+      plan = fanout.plan(query) if fanout is not None else None
+      if plan is not None:
+          turn.set(fanout=",".join(plan.agents))
+          final_response_text = await fanout.run(query, plan, user_id=user_id, session_id=session_id)
+          print(f"<<< Agent Response: {final_response_text}")
+          return final_response_text
+
+      # Prepare the user's message in ADK format
+      content = types.Content(role='user', parts=[types.Part(text=query)])
+
+      final_response_text = "Agent did not produce a final response." # Default
+
+      # Key Concept: run_async executes the agent logic and yields Events.
+      # We iterate through events to find the final answer.
+      hops = tracing.TurnTracer(turn)
+      try:
+          async for event in runner.run_async(user_id=user_id, session_id=session_id, new_message=content):
+              # You can uncomment the line below to see *all* events during execution
+              # print(f"  [Event] Author: {event.author}, Type: {type(event).__name__}, Final: {event.is_final_response()}, Content: {event.content}")
+              hops.observe(event)
+
+              # Key Concept: is_final_response() marks the concluding message for the turn.
+              if event.is_final_response():
+                  if event.content and event.content.parts:
+                     # Assuming text response in the first part
+                     final_response_text = event.content.parts[0].text
+                  elif event.actions and event.actions.escalate: # Handle potential errors/escalations
+                     final_response_text = f"Agent escalated: {event.error_message or 'No specific message.'}"
+                  # Add more checks here if needed (e.g., specific error codes)
+                  break # Stop processing events once the final response is found
+      finally:
+          hops.close()
 
   print(f"<<< Agent Response: {final_response_text}")
   return final_response_text
@@ -117,126 +186,22 @@ async def mcp_catch_all(request: Request, path: str):
             body = None
     else:
         body = None
-       
 
-    # Get the MCP toolset asynchronously
-    tools_list = []
-    try:
-        tools, exit_stack = await get_tools_async()
-        if tools:
-            tools_list = tools
-            # print tools_list
-            print("Tools loaded successfully.")
-            print(f"Tools: {tools_list}")
-            
-    except Exception as e:
-        print(f"Warning: Failed to load MCP tools: {e}")
-    
-    
-    try:
-      fix_vulnerability_agent = createAgent(model=MODEL_GEMINI_2_0_FLASH,
-                                      name="fix_vulnerability_agent",
-                                      instruction="You are the fix vulnerability Agent. Your ONLY task is to fix and address vulnerabilities in source code using the list of vulnerabilities provided. "
-                                      "Use the 'fix_vulnerability' tool when the user requires you to."
-                                      "(e.g., using words like fix, address vulnerability, fix vulnerability, etc.). "
-                                      "Do not perform any other actions.",
-                                      description="Handles vulnerability fixes using the 'fix_vulnerability' tool.", # Crucial for delegation
-                                      tools=tools_list
-                                      )
-    except Exception as e:
-        print(f"Error creating fix_vulnerability_agent: {e}")
-        fix_vulnerability_agent = None
-        
-    # --- Greeting Agent ---
-    greeting_agent = createAgent(model=MODEL_GEMINI_2_0_FLASH,
-                                    name="greeting_agent",
-                                    instruction="You are the Greeting Agent. Your ONLY task is to provide a friendly greeting to the user. "
-                                    "Use the 'say_hello' tool to generate the greeting. "
-                                    "If the user provides their name, make sure to pass it to the tool. "
-                                    "Do not engage in any other conversation or tasks.",
-                                    description="Handles simple greetings and hellos using the 'say_hello' tool.", # Crucial for delegation
-                                    tools=[say_hello])
-
-
-    # --- Farewell Agent ---
-    farewell_agent = createAgent(model=MODEL_GEMINI_2_0_FLASH,
-                                    name="farewell_agent",
-                                    instruction="You are the Farewell Agent. Your ONLY task is to provide a polite goodbye message. "
-                                    "Use the 'say_goodbye' tool when the user indicates they are leaving or ending the conversation "
-                                    "(e.g., using words like 'bye', 'goodbye', 'thanks bye', 'see you'). "
-                                    "Do not perform any other actions.",
-                                    description="Handles simple farewells and goodbyes using the 'say_goodbye' tool.", # Crucial for delegation
-                                    tools=[say_goodbye])
-
-
-    maven_agent = createAgent(model=MODEL_GEMINI_2_0_FLASH,
-                                    name="maven_agent",
-                                    instruction="You are the Java Maven Agent. Your ONLY task is to run maven commands. "
-                                    "Use the 'execute_maven_command' tool when the user requires you to run a maven command, they will provide you the command as well as the path or working_dir."
-                                    "(e.g., using words like 'run', 'execute', 'mvn', 'build', 'clean', 'install', 'test', 'package'). "
-                                    "Do not perform any other actions.",
-                                    description="Handles simple maven commands using the 'execute_maven_command' tool.", # Crucial for delegation
-                                    tools=[execute_maven_command])
-
-
-    root_agent = None
-    runner_root = None # Initialize runner
-    APP_NAME = "weather_tutorial_agent_team"
-    USER_ID = "user_1_agent_team"
-    SESSION_ID = "session_001_agent_team"
-
-    retrieved_session, session_service_stateful = get_session_stateful(app_name=APP_NAME, user_id=USER_ID, session_id=SESSION_ID)
-
-    # Create list of available sub-agents
-    available_sub_agents = []
-    if greeting_agent:
-        available_sub_agents.append(greeting_agent)
-    if farewell_agent:
-        available_sub_agents.append(farewell_agent)
-    if maven_agent:
-        available_sub_agents.append(maven_agent)
-    if fix_vulnerability_agent:
-        available_sub_agents.append(fix_vulnerability_agent)
-
-    if available_sub_agents and 'get_weather_stateful' in globals():
-      # Let's use a capable Gemini model for the root agent to handle orchestration
-      root_agent_model = MODEL_GEMINI_2_0_FLASH
-      
-    # Create instruction based on available sub-agents
-    instruction = "You are the main   Agent coordinating a team. Your primary responsibility is to delegate tasks based on the prompt. "
-    instruction += "Use the 'get_weather' tool ONLY for specific weather requests (e.g., 'weather in London'). "
-    instruction += "You have specialized sub-agents: "
-    
-    if greeting_agent:
-        instruction += "1. 'greeting_agent': Handles simple greetings like 'Hi', 'Hello'. Delegate to it for these. "
-    if farewell_agent:
-        instruction += "2. 'farewell_agent': Handles simple farewells like 'Bye', 'See you'. Delegate to it for these. "
-    if maven_agent:
-        instruction += "3. 'maven_agent': Handles maven commands. Delegate to it for these. "
-    if fix_vulnerability_agent:
-        instruction += "4. 'fix_vulnerability_agent': Handles vulnerability fixes. Delegate to it for these. "
-
-    root_agent_stateful = createAgent(
-                                  model=root_agent_model,
-                                  name="weather_agent_v4_stateful",
-                                  description="The main coordinator agent. Handles weather requests and delegates greetings/farewells maven commands to specialists.",
-                                  instruction=instruction,
-                                  tools=[get_weather_stateful], 
-                                  subAgentList=available_sub_agents,
-                                  outputKey="last_weather_report"
-                                  )
-      
-      
-    runner_root_stateful = Runner(
-        agent=root_agent_stateful,
-        app_name=APP_NAME,
-        session_service=session_service_stateful
-    )
-    
+    # The agent graph is built once at startup; this only rebuilds it if the
+    # model or the MCP tool set changed since the last request.
+    registry = request.app.state.agent_registry
+    runner_root_stateful = await registry.ensure(model=get_team_model(), tools=current_mcp_tools(request.app))
+
+    from app.session import get_session_stateful
+    get_session_stateful(app_name=APP_NAME, user_id=USER_ID, session_id=SESSION_ID,
+                         session_service=registry.session_service)
+
     final_response_from_agent = await call_agent_async(query= "hi my name is Ramon, I need to run maven compile on this path: /Users/clearencewissar/clwd_per_code/mvn-tut. Also use the 'fix_vulnerability' tool on this source code: print('password is 123456') and this vulnerability report: exposes password in clear text",
                                runner=runner_root_stateful,
                                user_id=USER_ID,
-                               session_id=SESSION_ID
+                               session_id=SESSION_ID,
+                               prerouter=request.app.state.prerouter,
+                               fanout=registry.fanout
                               )
     print(f"Final response from agent: {final_response_from_agent}")
     
@@ -249,3 +214,77 @@ async def mcp_catch_all(request: Request, path: str):
         "body": body,
         "query_params": dict(request.query_params)
     }
+
+
+class AgentQuery(BaseModel):
+    query: str
+    user_id: str = USER_ID
+    session_id: str = SESSION_ID
+
+
+# Streams every event of an agent turn (transfers, tool calls, tool results and
+# partial text) to the client over Server-Sent Events as soon as it is produced.
+@app.post("/agent/stream")
+async def stream_agent(request: Request, agent_query: AgentQuery):
+    from app.session import get_session_stateful
+    from app.streaming import stream_agent_events
+
+    registry = request.app.state.agent_registry
+    runner = await registry.ensure(model=get_team_model(), tools=current_mcp_tools(request.app))
+    get_session_stateful(app_name=APP_NAME, user_id=agent_query.user_id, session_id=agent_query.session_id,
+                         session_service=registry.session_service)
+    return StreamingResponse(
+        stream_agent_events(runner,
+                            query=agent_query.query,
+                            user_id=agent_query.user_id,
+                            session_id=agent_query.session_id,
+                            request=request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+class BatchItem(BaseModel):
+    user_id: str
+    session_id: str
+    query: str
+
+
+class BatchRequest(BaseModel):
+    items: list[BatchItem]
+    concurrency: int = Field(DEFAULT_CONCURRENCY, ge=1, le=MAX_CONCURRENCY)
+    run_id: Optional[str] = None
+
+
+# Runs many queries through the shared runner with bounded concurrency and
+# streams one NDJSON line per item as it completes. Re-posting with the
+# returned run_id resumes after the items that already completed.
+@app.post("/batch")
+async def run_batch_queries(request: Request, batch: BatchRequest):
+    from app.session import get_session_stateful
+
+    registry = request.app.state.agent_registry
+    runner = await registry.ensure(model=get_team_model(), tools=current_mcp_tools(request.app))
+
+    async def run_turn(item):
+        get_session_stateful(app_name=APP_NAME, user_id=item["user_id"], session_id=item["session_id"],
+                             session_service=registry.session_service)
+        return await call_agent_async(query=item["query"],
+                                      runner=runner,
+                                      user_id=item["user_id"],
+                                      session_id=item["session_id"],
+                                      prerouter=request.app.state.prerouter,
+                                      fanout=registry.fanout)
+
+    return StreamingResponse(
+        run_batch([item.model_dump() for item in batch.items],
+                  run_turn=run_turn,
+                  concurrency=batch.concurrency,
+                  run_id=batch.run_id),
+        media_type="application/x-ndjson",
+    )
+
+
+@app.get("/metrics")
+async def read_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
@@ -1,5 +1,8 @@
 import asyncio
+import contextlib
 import json
+import os
+import sys
 from typing import Any
 
 from dotenv import load_dotenv
@@ -10,7 +13,6 @@ from google.adk.artifacts.in_memory_artifact_service import (
 from google.adk.runners import Runner
 from google.adk.sessions import InMemorySessionService
 from google.adk.tools.mcp_tool.mcp_toolset import (
-    MCPToolset,
     SseServerParams,
     StdioServerParameters,
 )
@@ -18,6 +20,10 @@ from google.genai import types
 from rich import print
 load_dotenv()
 
+# The session pool and the tool manifest cache live in the repository's app package.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from app.mcp_pool import MCPSessionPool
+
 server_params = StdioServerParameters(
     command="node",
     args=["/Users/clearencewissar/clwd_per_code/ai-agent-claude/multi-agent/team-agents/stdio_server/build/index.js"],
@@ -28,12 +34,17 @@ server_params = StdioServerParameters(
 )
 
 async def get_tools_async():
-    """Gets tools from the File System MCP Server."""
-    tools, exit_stack = await MCPToolset.from_server(
-        connection_params=server_params
-    )
+    """Gets tools from the MCP Server.
+
+    Tools come from the cached tool manifest when the server was seen before,
+    so the agent is built without waiting for the server's handshake; the
+    server processes start in the background.
+    """
+    pool = await MCPSessionPool(server_params, size=1).start()
+    exit_stack = contextlib.AsyncExitStack()
+    exit_stack.push_async_callback(pool.close)
     print("MCP Toolset created successfully.")
-    return tools, exit_stack
+    return pool.tools(), exit_stack
 
 async def get_agent_async():
     """Creates an ADK Agent equipped with tools from the MCP Server."""
@@ -0,0 +1,181 @@
+# File event_store.py
+
+import contextlib
+import hashlib
+import itertools
+import json
+import logging
+import os
+import time
+from collections import deque
+from dataclasses import dataclass
+
+import anyio
+from mcp.server.streamable_http import (
+    EventCallback,
+    EventId,
+    EventMessage,
+    EventStore,
+    StreamId,
+)
+from mcp.types import JSONRPCMessage
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _StoredEvent:
+    event_id: EventId
+    stored_at: float
+    size: int
+    message: JSONRPCMessage
+
+
+class RingBufferEventStore(EventStore):
+    """Keeps recent SSE events of every stream so clients can resume with Last-Event-ID.
+
+    Each stream has its own bounded ring buffer in memory. Events are evicted
+    once the stream holds more than `max_events` or `max_bytes`, or once they
+    are older than `max_age` seconds. With `spill_dir` set, events evicted for
+    size are appended to a per-stream file instead of being lost, so a client
+    that falls further behind can still resume (age eviction applies there too).
+
+    Event ids have the form "<stream_id>/<sequence>", so the stream of a
+    Last-Event-ID is known even after its events left memory.
+
+    Every `sweep_interval` seconds, storing an event also sweeps the other
+    streams, so idle streams and their spill files expire too.
+    """
+
+    def __init__(self, *, max_events: int = 1000, max_bytes: int = 4 * 1024 * 1024,
+                 max_age: float = 3600, spill_dir: str = None, sweep_interval: float = 60):
+        self.max_events = max_events
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.spill_dir = spill_dir
+        self.sweep_interval = min(sweep_interval, max_age)
+        self._last_sweep = time.time()
+        self._streams: dict[StreamId, deque] = {}
+        self._stream_bytes: dict[StreamId, int] = {}
+        self._sequence = itertools.count(1)
+        self._lock = anyio.Lock()
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+
+    # --- EventStore ---
+
+    async def store_event(self, stream_id: StreamId, message: JSONRPCMessage) -> EventId:
+        event_id = f"{stream_id}/{next(self._sequence)}"
+        payload = message.model_dump_json(by_alias=True, exclude_none=True)
+        async with self._lock:
+            events = self._streams.setdefault(stream_id, deque())
+            events.append(_StoredEvent(event_id, time.time(), len(payload), message))
+            self._stream_bytes[stream_id] = self._stream_bytes.get(stream_id, 0) + len(payload)
+            self._evict(stream_id)
+            if time.time() - self._last_sweep >= self.sweep_interval:
+                self._sweep()
+        return event_id
+
+    async def replay_events_after(self, last_event_id: EventId, send_callback: EventCallback) -> StreamId | None:
+        stream_id, _, sequence = last_event_id.rpartition("/")
+        if not stream_id or not sequence.isdigit():
+            logger.warning(f"Unknown event id format: {last_event_id}")
+            return None
+        last_sequence = int(sequence)
+        cutoff = time.time() - self.max_age
+
+        async with self._lock:
+            self._evict(stream_id)
+            in_memory = list(self._streams.get(stream_id, ()))
+        spilled = await anyio.to_thread.run_sync(self._read_spill, stream_id, cutoff) if self.spill_dir else []
+
+        if not in_memory and not spilled:
+            return None
+
+        replayed = 0
+        for event in spilled + in_memory:
+            if self._sequence_of(event.event_id) > last_sequence and event.stored_at >= cutoff:
+                await send_callback(EventMessage(event.message, event.event_id))
+                replayed += 1
+        logger.info(f"Replayed {replayed} event(s) of stream {stream_id} after {last_event_id}")
+        return stream_id
+
+    # --- Eviction and spilling ---
+
+    @staticmethod
+    def _sequence_of(event_id: EventId) -> int:
+        return int(event_id.rpartition("/")[2])
+
+    def _sweep(self) -> None:
+        """Evicts expired events of every stream and deletes expired spill files."""
+        self._last_sweep = time.time()
+        for stream_id in list(self._streams):
+            self._evict(stream_id)
+        if not self.spill_dir:
+            return
+        # A spill file is only appended to, so once its mtime is past max_age
+        # every event in it is, too (this also covers streams no longer in memory).
+        cutoff = self._last_sweep - self.max_age
+        removed = 0
+        with os.scandir(self.spill_dir) as entries:
+            for entry in entries:
+                with contextlib.suppress(FileNotFoundError):
+                    if entry.name.endswith(".jsonl") and entry.stat().st_mtime < cutoff:
+                        os.remove(entry.path)
+                        removed += 1
+        if removed:
+            logger.info(f"Removed {removed} expired spill file(s)")
+
+    def _evict(self, stream_id: StreamId) -> None:
+        events = self._streams.get(stream_id)
+        if events is None:
+            return
+        cutoff = time.time() - self.max_age
+        spill = []
+        while events and events[0].stored_at < cutoff:
+            self._stream_bytes[stream_id] -= events.popleft().size
+        while events and (len(events) > self.max_events or self._stream_bytes[stream_id] > self.max_bytes):
+            event = events.popleft()
+            self._stream_bytes[stream_id] -= event.size
+            spill.append(event)
+        if spill and self.spill_dir:
+            self._write_spill(stream_id, spill)
+        if not events:
+            del self._streams[stream_id]
+            del self._stream_bytes[stream_id]
+            if not spill and self.spill_dir:
+                # The whole stream expired; what it spilled earlier is older still.
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(self._spill_path(stream_id))
+
+    def _spill_path(self, stream_id: StreamId) -> str:
+        name = hashlib.sha256(stream_id.encode()).hexdigest()[:32]
+        return os.path.join(self.spill_dir, f"{name}.jsonl")
+
+    def _write_spill(self, stream_id: StreamId, events: list) -> None:
+        with open(self._spill_path(stream_id), "a", encoding="utf-8") as f:
+            for event in events:
+                f.write(json.dumps({
+                    "event_id": event.event_id,
+                    "stored_at": event.stored_at,
+                    "message": event.message.model_dump(by_alias=True, exclude_none=True, mode="json"),
+                }) + "\n")
+
+    def _read_spill(self, stream_id: StreamId, cutoff: float) -> list:
+        path = self._spill_path(stream_id)
+        events = []
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    record = json.loads(line)
+                    if record["stored_at"] < cutoff:
+                        continue
+                    events.append(_StoredEvent(record["event_id"], record["stored_at"], len(line),
+                                               JSONRPCMessage.model_validate(record["message"])))
+        except FileNotFoundError:
+            return []
+        if not events:
+            # Everything on disk expired.
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(path)
+        return events
@@ -0,0 +1,155 @@
+# File loadtest.py
+"""Measures extract-wikipedia-article throughput for different worker counts.
+
+For each worker count the server is started on a fixture directory of
+synthetic articles, driven with concurrent tools/call requests for a fixed
+duration, then stopped with SIGTERM. Caches are disabled (unless --cached) so
+every request parses a page and the numbers reflect CPU scaling.
+
+    uv run loadtest.py --workers 1 2 4 --concurrency 32 --duration 15
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def write_fixtures(directory: str, count: int, paragraphs: int) -> list[str]:
+    titles = []
+    for i in range(count):
+        title = f"Synthetic_article_{i}"
+        body = "".join(
+            f"<h2>Section {p}</h2><p>Paragraph {p} of article {i} with a <a href='#'>link</a>"
+            f"<sup class='reference'>[{p}]</sup> and some more words to parse. " * 4 + "</p>"
+            for p in range(paragraphs)
+        )
+        with open(os.path.join(directory, f"{title}.html"), "w", encoding="utf-8") as f:
+            f.write(f"<html><body><div id='mw-content-text'><table class='infobox'><tr><td>x</td></tr>"
+                    f"</table>{body}</div></body></html>")
+        titles.append(title)
+    return titles
+
+
+def start_server(workers: int, port: int, fixture_dir: str, cached: bool, scratch: str) -> subprocess.Popen:
+    env = dict(os.environ,
+               WIKIPEDIA_FIXTURE_DIR=fixture_dir,
+               MCP_RESUMABLE="0",
+               WIKIPEDIA_CACHE_DIR=os.path.join(scratch, "articles") if cached else "",
+               MCP_RESULT_CACHE_PATH=os.path.join(scratch, f"results-{workers}.db") if cached else "")
+    return subprocess.Popen(
+        [sys.executable, "server.py", "--port", str(port), "--workers", str(workers), "--graceful-timeout", "5"],
+        cwd=HERE, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+
+
+async def wait_ready(client: httpx.AsyncClient, url: str, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            await client.get(url)
+            return
+        except httpx.TransportError:
+            await asyncio.sleep(0.2)
+    raise RuntimeError("Server did not start in time.")
+
+
+async def call_extract(client: httpx.AsyncClient, url: str, article_url: str, request_id: int) -> bool:
+    payload = {"jsonrpc": "2.0", "id": request_id, "method": "tools/call",
+               "params": {"name": "extract-wikipedia-article", "arguments": {"url": article_url}}}
+    response = await client.post(url, json=payload,
+                                  headers={"Accept": "application/json, text/event-stream"})
+    if response.status_code != 200:
+        return False
+    for line in response.text.splitlines():
+        if line.startswith("data:"):
+            message = json.loads(line[5:])
+            if message.get("id") == request_id:
+                return "result" in message and not message["result"].get("isError")
+    return False
+
+
+async def drive(port: int, titles: list[str], concurrency: int, duration: float, cached: bool) -> dict:
+    url = f"http://localhost:{port}/mcp/"
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(timeout=60, limits=limits) as client:
+        await wait_ready(client, url)
+        counter = itertools.count()
+        ok = errors = 0
+        latencies = []
+        deadline = time.monotonic() + duration
+
+        async def worker():
+            nonlocal ok, errors
+            while time.monotonic() < deadline:
+                n = next(counter)
+                article = f"https://en.wikipedia.org/wiki/{titles[n % len(titles)]}"
+                if not cached:
+                    article += f"?request={n}"  # a distinct URL defeats every cache
+                started = time.perf_counter()
+                try:
+                    success = await call_extract(client, url, article, n)
+                except httpx.HTTPError:
+                    success = False
+                latencies.append(time.perf_counter() - started)
+                ok += success
+                errors += not success
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": ok + errors,
+        "errors": errors,
+        "throughput_rps": round(ok / elapsed, 1),
+        "p50_ms": round(latencies[len(latencies) // 2] * 1000, 1) if latencies else None,
+        "p95_ms": round(latencies[int(len(latencies) * 0.95)] * 1000, 1) if latencies else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=15)
+    parser.add_argument("--articles", type=int, default=20)
+    parser.add_argument("--paragraphs", type=int, default=200, help="Paragraphs per synthetic article.")
+    parser.add_argument("--port", type=int, default=3100)
+    parser.add_argument("--cached", action="store_true", help="Leave the article and result caches on.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as scratch:
+        fixture_dir = os.path.join(scratch, "fixtures")
+        os.makedirs(fixture_dir)
+        titles = write_fixtures(fixture_dir, args.articles, args.paragraphs)
+
+        results = {}
+        for workers in args.workers:
+            server = start_server(workers, args.port, fixture_dir, args.cached, scratch)
+            try:
+                results[workers] = asyncio.run(drive(args.port, titles, args.concurrency, args.duration, args.cached))
+            finally:
+                server.send_signal(signal.SIGTERM)
+                server.wait(timeout=30)
+
+    baseline = results[args.workers[0]]["throughput_rps"] or 1
+    print(f"{'workers':>8} {'req/s':>8} {'speedup':>8} {'p50 ms':>8} {'p95 ms':>8} {'errors':>7}")
+    for workers, r in results.items():
+        print(f"{workers:>8} {r['throughput_rps']:>8} {r['throughput_rps'] / baseline:>7.2f}x"
+              f" {r['p50_ms']:>8} {r['p95_ms']:>8} {r['errors']:>7}")
+
+
+if __name__ == "__main__":
+    main()
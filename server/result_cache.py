@@ -0,0 +1,96 @@
+# File result_cache.py
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+import anyio
+
+logger = logging.getLogger(__name__)
+
+
+class SqliteResultCache:
+    """Tool-result cache shared by every worker process through one local SQLite file.
+
+    WAL mode lets all workers read concurrently while one writes, so a result
+    computed by any worker is served by all of them. Entries expire after
+    `ttl` seconds; at most `max_entries` are kept, oldest first out.
+    """
+
+    def __init__(self, db_path: str, *, ttl: float = 300, max_entries: int = 10000):
+        self.db_path = db_path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS results (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS results_expiry ON results (expires_at)")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def key(tool: str, arguments: dict) -> str:
+        payload = json.dumps([tool, arguments], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _get(self, key: str):
+        row = self._connect().execute(
+            "SELECT value FROM results WHERE key = ? AND expires_at > ?", (key, time.time())
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _put(self, key: str, value) -> None:
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO results (key, value, expires_at) VALUES (?, ?, ?)",
+                         (key, json.dumps(value), now + self.ttl))
+            conn.execute("DELETE FROM results WHERE expires_at <= ?", (now,))
+            conn.execute("""
+                DELETE FROM results WHERE key IN (
+                    SELECT key FROM results ORDER BY expires_at DESC LIMIT -1 OFFSET ?
+                )
+            """, (self.max_entries,))
+
+    async def get(self, key: str):
+        try:
+            return await anyio.to_thread.run_sync(self._get, key)
+        except sqlite3.OperationalError as e:
+            # A locked or unreadable cache is a miss; the tool still runs.
+            logger.warning(f"Could not read cached tool result: {e}")
+            return None
+
+    async def put(self, key: str, value) -> None:
+        try:
+            await anyio.to_thread.run_sync(self._put, key, value)
+        except sqlite3.OperationalError as e:
+            # Losing a cache write is harmless; failing the tool call is not.
+            logger.warning(f"Could not cache tool result: {e}")
+
+
+def default_result_cache():
+    """Builds the cache from MCP_RESULT_CACHE_* variables; MCP_RESULT_CACHE_PATH='' disables it."""
+    path = os.environ.get("MCP_RESULT_CACHE_PATH", ".mcp_results.db")
+    if not path:
+        return None
+    return SqliteResultCache(
+        path,
+        ttl=float(os.environ.get("MCP_RESULT_CACHE_TTL", "300")),
+        max_entries=int(os.environ.get("MCP_RESULT_CACHE_MAX_ENTRIES", "10000")),
+    )
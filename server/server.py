@@ -1,7 +1,9 @@
 # File server.py
 
+import argparse
 import contextlib
 import logging
+import os
 from collections.abc import AsyncIterator
 
 import anyio
@@ -13,28 +15,71 @@ from starlette.routing import Mount
 from starlette.types import Receive, Scope, Send
 import uvicorn
 
+from event_store import RingBufferEventStore
+from result_cache import default_result_cache
+from wikipedia import ArticleCache, default_fetcher, extract_article
+
 logger = logging.getLogger(__name__)
 
 
-app = Server("mcp-streamable-http-stateless-demo")
+mcp_server = Server("mcp-streamable-http-stateless-demo")
+
+article_fetcher = default_fetcher()
+article_cache = ArticleCache(
+    os.environ.get("WIKIPEDIA_CACHE_DIR", ".wikipedia_cache") or None,
+    max_entries=int(os.environ.get("WIKIPEDIA_CACHE_ENTRIES", "128")),
+    max_bytes=int(os.environ.get("WIKIPEDIA_CACHE_MAX_BYTES", str(256 * 1024 * 1024))),
+    max_age=float(os.environ.get("WIKIPEDIA_CACHE_MAX_AGE", str(7 * 24 * 3600))),
+)
+# Shared by all worker processes, so an article extracted by one is served by all.
+result_cache = default_result_cache()
+
 
+async def extract_wikipedia_article(url: str) -> list[types.TextContent]:
+    ctx = mcp_server.request_context
+    progress_token = ctx.meta.progressToken if ctx.meta else None
 
-@app.call_tool()
+    async def on_chunk(index: int, text: str) -> None:
+        # Stream each chunk as soon as it is parsed so the client can start
+        # working on the beginning of a long article.
+        await ctx.session.send_log_message(
+            level="info",
+            data={"url": url, "chunk": index, "text": text},
+            logger="extract-wikipedia-article",
+            related_request_id=ctx.request_id,
+        )
+        if progress_token is not None:
+            await ctx.session.send_progress_notification(progress_token, index + 1)
+
+    try:
+        # The revision is part of the key, so an edited article is never served
+        # from a result cached before the edit.
+        revision = await article_fetcher.revision(url)
+        key = result_cache.key("extract-wikipedia-article", {"url": url, "revision": revision}) \
+            if result_cache else None
+        if key is not None and (cached := await result_cache.get(key)) is not None:
+            return [types.TextContent(type="text", text=chunk) for chunk in cached]
+        chunks = await extract_article(url, fetcher=article_fetcher, cache=article_cache, on_chunk=on_chunk,
+                                       revision=revision)
+    except Exception as e:
+        logger.error(f"Failed to extract {url}: {e}")
+        return [types.TextContent(type="text", text=f"Could not extract the article at {url}: {e}")]
+    if not chunks:
+        return [types.TextContent(type="text", text=f"No article text found at {url}.")]
+    if key is not None:
+        await result_cache.put(key, chunks)
+    return [types.TextContent(type="text", text=chunk) for chunk in chunks]
+
+
+@mcp_server.call_tool()
 async def call_tool(
     name: str, arguments: dict
 ) -> list[types.TextContent | types.ImageContent | types.EmbeddedResource]:
-    # Check if the tool is extract-wikipedia-article
     if name == "extract-wikipedia-article":
-        # Return dummy content for the Wikipedia article
-        return [
-            types.TextContent(
-                type="text",
-                text="This is the article ...",
-            )
-        ]
+        return await extract_wikipedia_article(arguments["url"])
 
     # For other tools, keep the existing notification logic
-    ctx = app.request_context
+    ctx = mcp_server.request_context
     interval = arguments.get("interval", 1.0)
     count = arguments.get("count", 5)
     caller = arguments.get("caller", "unknown")
@@ -61,12 +106,15 @@ async def call_tool(
     ]
 
 
-@app.list_tools()
+@mcp_server.list_tools()
 async def list_tools() -> list[types.Tool]:
     return [
         types.Tool(
             name="extract-wikipedia-article",
-            description=("Extracts the main content of a Wikipedia article"),
+            description=(
+                "Extracts the main content of a Wikipedia article. Long articles"
+                " are returned in several text parts, in reading order."
+            ),
             inputSchema={
                 "type": "object",
                 "required": ["url"],
@@ -81,10 +129,24 @@ async def list_tools() -> list[types.Tool]:
     ]
 
 
+# Resumable mode keeps recent notifications per stream so a client that drops
+# can reconnect with Last-Event-ID and continue, instead of re-running the tool.
+# Resumption needs stateful sessions; MCP_RESUMABLE=0 restores stateless mode,
+# which multi-worker serving (--workers > 1) always uses.
+RESUMABLE = os.environ.get("MCP_RESUMABLE", "1") != "0"
+
+event_store = RingBufferEventStore(
+    max_events=int(os.environ.get("MCP_EVENT_STORE_MAX_EVENTS", "1000")),
+    max_bytes=int(os.environ.get("MCP_EVENT_STORE_MAX_BYTES", str(4 * 1024 * 1024))),
+    max_age=float(os.environ.get("MCP_EVENT_STORE_MAX_AGE", "3600")),
+    spill_dir=os.environ.get("MCP_EVENT_STORE_SPILL_DIR") or None,
+    sweep_interval=float(os.environ.get("MCP_EVENT_STORE_SWEEP_INTERVAL", "60")),
+) if RESUMABLE else None
+
 session_manager = StreamableHTTPSessionManager(
-    app=app,
-    event_store=None,
-    stateless=True,
+    app=mcp_server,
+    event_store=event_store,
+    stateless=not RESUMABLE,
 )
 
 
@@ -112,4 +174,25 @@ app = Starlette(
 )
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="localhost", port=3000)
+    parser = argparse.ArgumentParser(description="Streamable-HTTP MCP server.")
+    parser.add_argument("--host", default=os.environ.get("MCP_HOST", "localhost"))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("MCP_PORT", "3000")))
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("MCP_WORKERS", "1")),
+                        help="Worker processes sharing the listening socket.")
+    parser.add_argument("--graceful-timeout", type=float,
+                        default=float(os.environ.get("MCP_GRACEFUL_TIMEOUT", "30")),
+                        help="Seconds in-flight requests get to finish on shutdown or restart.")
+    args = parser.parse_args()
+
+    if args.workers > 1:
+        # Workers are separate processes: a session or its event store living in
+        # one of them is invisible to the others, so every request must stand alone.
+        os.environ["MCP_RESUMABLE"] = "0"
+        # The supervisor binds the socket once and starts the workers on it. SIGTERM
+        # drains (no new connections, in-flight requests finish within the timeout);
+        # SIGHUP restarts the workers one at a time; SIGTTIN/SIGTTOU add/remove one.
+        uvicorn.run("server:app", app_dir=os.path.dirname(os.path.abspath(__file__)),
+                    host=args.host, port=args.port, workers=args.workers,
+                    timeout_graceful_shutdown=args.graceful_timeout)
+    else:
+        uvicorn.run(app, host=args.host, port=args.port, timeout_graceful_shutdown=args.graceful_timeout)
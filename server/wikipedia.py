@@ -0,0 +1,351 @@
+# File wikipedia.py
+
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Awaitable, Callable
+from html.parser import HTMLParser
+from urllib.parse import unquote, urlparse
+
+import anyio
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Articles are returned (and streamed as notifications) in parts of about this size.
+CHUNK_CHARS = int(os.environ.get("WIKIPEDIA_CHUNK_CHARS", "4000"))
+
+_READ_SIZE = 64 * 1024
+
+# Only pages of this domain (and its subdomains, e.g. en.wikipedia.org) are fetched.
+_ALLOWED_DOMAIN = "wikipedia.org"
+
+# Elements whose text is kept, each as one block.
+_BLOCK_TAGS = {"p", "h2", "h3", "h4", "li", "dd", "blockquote"}
+# Elements skipped entirely, with everything inside them.
+_SKIPPED_TAGS = {"table", "style", "script", "sup", "figure", "math", "noscript"}
+_SKIPPED_CLASSES = {"navbox", "reflist", "references", "mw-editsection", "thumb", "infobox",
+                    "hatnote", "metadata", "mw-references-wrap", "toc", "sidebar"}
+_VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+class ArticleExtractor(HTMLParser):
+    """Incrementally pulls the main article text out of a Wikipedia page.
+
+    Feed it the HTML in pieces as it arrives; after each `feed`, `take_blocks`
+    returns the paragraphs and headings completed so far. Only text inside
+    `#mw-content-text` is kept, minus tables, infoboxes, navboxes, reference
+    lists and citation markers. Pages without that element fall back to all of
+    their text, which is only released by `close`.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self._stack = []  # (tag, opens_content, skipped, block)
+        self._content_depth = 0
+        self._skip_depth = 0
+        self._saw_content = False
+        self._text = []
+        self._blocks = []
+        self._fallback = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _VOID_TAGS:
+            if tag == "br":
+                self.handle_data(" ")
+            return
+        attrs = dict(attrs)
+        classes = set((attrs.get("class") or "").split())
+        opens_content = attrs.get("id") == "mw-content-text"
+        skipped = tag in _SKIPPED_TAGS or bool(classes & _SKIPPED_CLASSES)
+        block = tag in _BLOCK_TAGS
+        if opens_content:
+            self._content_depth += 1
+            self._saw_content = True
+            self._text, self._fallback = [], []
+        if skipped:
+            self._skip_depth += 1
+        if block and self._collecting:
+            self._flush()
+        self._stack.append((tag, opens_content, skipped, block))
+
+    def handle_endtag(self, tag):
+        if not any(entry[0] == tag for entry in self._stack):
+            return  # stray end tag
+        while self._stack:
+            name, opens_content, skipped, block = self._stack.pop()
+            if block:
+                self._flush(heading=name if name in {"h2", "h3", "h4"} else None)
+            if skipped:
+                self._skip_depth -= 1
+            if opens_content:
+                self._content_depth -= 1
+            if name == tag:
+                break
+
+    def handle_data(self, data):
+        if self._collecting:
+            self._text.append(data)
+
+    @property
+    def _collecting(self) -> bool:
+        if self._skip_depth:
+            return False
+        return self._content_depth > 0 or not self._saw_content
+
+    def _flush(self, heading: str = None) -> None:
+        text = _WHITESPACE.sub(" ", "".join(self._text)).strip()
+        self._text = []
+        if text:
+            if heading == "h2":
+                text = f"## {text}"
+            elif heading:
+                text = f"### {text}"
+            (self._blocks if self._content_depth else self._fallback).append(text)
+
+    def take_blocks(self) -> list[str]:
+        blocks, self._blocks = self._blocks, []
+        return blocks
+
+    def close(self):
+        super().close()
+        self._flush()
+        if not self._saw_content:
+            self._blocks.extend(self._fallback)
+            self._fallback = []
+
+
+# --- Fetchers ---
+
+
+class WikipediaFetcher:
+    """Where article HTML comes from.
+
+    `revision(url)` must be cheap (no body download) and change whenever the
+    article changes; it keys the cache. `stream(url)` yields the HTML in pieces.
+    """
+
+    async def revision(self, url: str) -> str:
+        raise NotImplementedError
+
+    def stream(self, url: str) -> AsyncIterator[str]:
+        raise NotImplementedError
+
+
+def check_url(url) -> None:
+    """Raises ValueError unless `url` is an https URL on wikipedia.org or one of its subdomains."""
+    parsed = httpx.URL(str(url))
+    host = (parsed.host or "").lower().rstrip(".")
+    if parsed.scheme != "https" or parsed.port not in (None, 443) or parsed.userinfo \
+            or not (host == _ALLOWED_DOMAIN or host.endswith("." + _ALLOWED_DOMAIN)):
+        raise ValueError(f"Refusing to fetch '{url}': only https://*.{_ALLOWED_DOMAIN} pages are allowed.")
+
+
+async def _check_request(request: httpx.Request) -> None:
+    check_url(request.url)
+
+
+class HttpFetcher(WikipediaFetcher):
+    """Fetches live pages; the revision comes from the ETag (or Last-Modified) of a HEAD request.
+
+    Every request the client sends, including each redirect it follows, is
+    checked with `check_url` first, so a URL (or a redirect) pointing at
+    another host or at plain http is never fetched.
+    """
+
+    def __init__(self, client: httpx.AsyncClient = None):
+        self.client = client or httpx.AsyncClient(follow_redirects=True, timeout=30,
+                                                  headers={"User-Agent": "team-agents-mcp/0.1"})
+        hooks = self.client.event_hooks
+        hooks["request"] = [_check_request, *hooks.get("request", [])]
+        self.client.event_hooks = hooks
+
+    async def revision(self, url: str) -> str:
+        check_url(url)
+        response = await self.client.head(url)
+        response.raise_for_status()
+        return response.headers.get("etag") or response.headers.get("last-modified") or ""
+
+    async def stream(self, url: str) -> AsyncIterator[str]:
+        check_url(url)
+        async with self.client.stream("GET", url) as response:
+            response.raise_for_status()
+            async for text in response.aiter_text():
+                yield text
+
+
+class FixtureFetcher(WikipediaFetcher):
+    """Reads pages from a local directory for offline use.
+
+    A URL maps to `<directory>/<last path segment>.html`, e.g.
+    `.../wiki/Model_Context_Protocol` -> `Model_Context_Protocol.html`.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def path_for(self, url: str) -> str:
+        title = unquote(urlparse(url).path.rstrip("/").rsplit("/", 1)[-1])
+        if not title or title in {".", ".."} or "/" in title or "\\" in title:
+            raise ValueError(f"Cannot map '{url}' to a fixture file.")
+        return os.path.join(self.directory, f"{title}.html")
+
+    async def revision(self, url: str) -> str:
+        stat = await anyio.to_thread.run_sync(os.stat, self.path_for(url))
+        return f"{stat.st_mtime_ns}-{stat.st_size}"
+
+    async def stream(self, url: str) -> AsyncIterator[str]:
+        async with await anyio.open_file(self.path_for(url), "r", encoding="utf-8") as f:
+            while chunk := await f.read(_READ_SIZE):
+                yield chunk
+
+
+def default_fetcher() -> WikipediaFetcher:
+    """Uses WIKIPEDIA_FIXTURE_DIR when set (offline mode), otherwise the live site."""
+    fixture_dir = os.environ.get("WIKIPEDIA_FIXTURE_DIR")
+    return FixtureFetcher(fixture_dir) if fixture_dir else HttpFetcher()
+
+
+# --- Cache ---
+
+
+class ArticleCache:
+    """Content-addressed article cache: an in-memory LRU in front of a directory of JSON files.
+
+    Keys are a hash of the URL and its revision, so an edited article is
+    simply a different entry. After each write, files older than `max_age`
+    seconds are removed, then the least recently used ones until the
+    directory holds at most `max_bytes`.
+    """
+
+    def __init__(self, directory: str = None, *, max_entries: int = 128,
+                 max_bytes: int = 256 * 1024 * 1024, max_age: float = 7 * 24 * 3600):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._memory = OrderedDict()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(url: str, revision: str) -> str:
+        return hashlib.sha256(f"{url}\0{revision}".encode()).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    async def get(self, key: str):
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            return self._memory[key]
+        if not self.directory:
+            return None
+        try:
+            async with await anyio.open_file(self._path(key), "r", encoding="utf-8") as f:
+                chunks = json.loads(await f.read())
+        except (FileNotFoundError, ValueError):
+            return None
+        # The mtime doubles as the last-use time for eviction.
+        with contextlib.suppress(FileNotFoundError):
+            await anyio.to_thread.run_sync(os.utime, self._path(key))
+        self._remember(key, chunks)
+        return chunks
+
+    async def put(self, key: str, chunks: list[str]) -> None:
+        self._remember(key, chunks)
+        if self.directory:
+            tmp = f"{self._path(key)}.{os.getpid()}.tmp"
+            async with await anyio.open_file(tmp, "w", encoding="utf-8") as f:
+                await f.write(json.dumps(chunks))
+            await anyio.to_thread.run_sync(os.replace, tmp, self._path(key))
+            await anyio.to_thread.run_sync(self._prune)
+
+    def _prune(self) -> None:
+        """Removes expired files, then the least recently used ones while over `max_bytes`."""
+        cutoff = time.time() - self.max_age
+        files = []
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if not entry.name.endswith(".json"):
+                    continue
+                with contextlib.suppress(FileNotFoundError):
+                    stat = entry.stat()
+                    if stat.st_mtime < cutoff:
+                        os.remove(entry.path)
+                    else:
+                        files.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(path)
+            total -= size
+
+    def _remember(self, key: str, chunks: list[str]) -> None:
+        self._memory[key] = chunks
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+
+# --- Pipeline ---
+
+
+async def extract_article(url: str, *, fetcher: WikipediaFetcher, cache: ArticleCache,
+                          on_chunk: Callable[[int, str], Awaitable[None]] = None,
+                          revision: str = None) -> list[str]:
+    """Returns the main text of an article as a list of chunks of about CHUNK_CHARS.
+
+    On a cache miss the page is parsed while it downloads and `on_chunk(index,
+    text)` is awaited as soon as each chunk is complete, so callers can stream
+    it onwards before the rest of the page has arrived. Pass `revision` when
+    the caller already asked the fetcher for it.
+    """
+    if revision is None:
+        revision = await fetcher.revision(url)
+    key = cache.key(url, revision)
+    cached = await cache.get(key)
+    if cached is not None:
+        logger.info(f"Article cache hit for {url}")
+        return cached
+
+    extractor = ArticleExtractor()
+    chunks, current = [], []
+    current_size = 0
+
+    async def emit():
+        nonlocal current, current_size
+        if not current:
+            return
+        chunk = "\n\n".join(current)
+        chunks.append(chunk)
+        current, current_size = [], 0
+        if on_chunk is not None:
+            await on_chunk(len(chunks) - 1, chunk)
+
+    async def add(blocks):
+        nonlocal current_size
+        for block in blocks:
+            current.append(block)
+            current_size += len(block) + 2
+            if current_size >= CHUNK_CHARS:
+                await emit()
+
+    async for html in fetcher.stream(url):
+        extractor.feed(html)
+        await add(extractor.take_blocks())
+    extractor.close()
+    await add(extractor.take_blocks())
+    await emit()
+
+    await cache.put(key, chunks)
+    return chunks
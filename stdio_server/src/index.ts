@@ -34,11 +34,13 @@ server.tool(
       fixedSourceCode
     );
 
+    // The fixed code itself is returned so callers can patch it back into
+    // the file it came from.
     return {
       content: [
         {
           type: "text",
-          text: "source code was fixed using AI ",
+          text: fixedSourceCode,
         },
       ],
     };
@@ -0,0 +1,146 @@
+import asyncio
+import threading
+
+import pytest
+
+pytest.importorskip("google.adk")
+
+from google.adk.agents import LlmAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.models.llm_request import LlmRequest
+from google.adk.sessions import InMemorySessionService
+from google.adk.tools.load_artifacts_tool import load_artifacts_tool
+from google.adk.tools.tool_context import ToolContext
+from google.genai import types
+
+from app import artifacts
+from app.artifacts import MmapArtifactService, offload
+
+KEY = {"app_name": "app", "user_id": "u1", "session_id": "s1"}
+
+
+@pytest.fixture
+def service(tmp_path):
+    return MmapArtifactService(str(tmp_path))
+
+
+def _tool_context(service) -> ToolContext:
+    session_service = InMemorySessionService()
+    session = session_service.create_session(app_name="app", user_id="u1", session_id="s1")
+    return ToolContext(InvocationContext(
+        artifact_service=service, session_service=session_service, invocation_id="e-1",
+        agent=LlmAgent(name="maven_agent"), session=session,
+    ))
+
+
+def test_versions_deduplicate_and_share_blobs(service):
+    async def main():
+        first = await service.save_artifact(**KEY, filename="log.txt", artifact=types.Part(text="a"))
+        again = await service.save_artifact(**KEY, filename="log.txt", artifact=types.Part(text="a"))
+        second = await service.save_artifact(**KEY, filename="log.txt", artifact=types.Part(text="b"))
+        other = await service.save_artifact(**{**KEY, "session_id": "s2"}, filename="log.txt",
+                                            artifact=types.Part(text="a"))
+        loaded = await service.load_artifact(**KEY, filename="log.txt", version=0)
+        return first, again, second, other, loaded, await service.list_versions(**KEY, filename="log.txt")
+
+    first, again, second, other, loaded, versions = asyncio.run(main())
+    assert (first, again, second, other) == (0, 0, 1, 0)
+    assert loaded.inline_data.data == b"a"
+    assert versions == [0, 1]
+
+
+def test_user_scoped_artifacts_are_listed_in_every_session(service):
+    async def main():
+        await service.save_artifact(**KEY, filename="user:profile", artifact=types.Part(text="x"))
+        await service.save_artifact(**KEY, filename="notes", artifact=types.Part(text="y"))
+        other = await service.list_artifact_keys(app_name="app", user_id="u1", session_id="s2")
+        mine = await service.list_artifact_keys(**KEY)
+        await service.delete_artifact(**KEY, filename="notes")
+        return other, mine, await service.list_artifact_keys(**KEY)
+
+    assert asyncio.run(main()) == (["user:profile"], ["notes", "user:profile"], ["user:profile"])
+
+
+def test_concurrent_writers_get_distinct_versions(tmp_path):
+    # Separate instances have separate connections, like separate worker processes.
+    versions, errors = [], []
+
+    def writer(i):
+        service = MmapArtifactService(str(tmp_path))
+        try:
+            for j in range(20):
+                versions.append(asyncio.run(service.save_artifact(**KEY, filename="f", artifact=types.Part(text=f"{i}-{j}"))))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=writer, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert sorted(versions) == list(range(80))
+
+
+def test_open_blob_maps_without_copying(service):
+    digest = service.put_blob(b"hello world")
+    with service.open_blob(digest) as view:
+        assert bytes(view[:5]) == b"hello"
+    assert service.read_blob(digest, 5) == b"hello"
+
+
+def test_offload_saves_through_the_tool_context(service, monkeypatch):
+    monkeypatch.setattr(artifacts, "INLINE_LIMIT", 10)
+    tool_context = _tool_context(service)
+
+    async def main():
+        handle = await offload(tool_context, "maven-output", "x" * 50)
+        # load_artifacts lists the session's artifacts before every model request,
+        # and attaches the ones the model asked for.
+        request = LlmRequest(contents=[types.Content(role="user", parts=[types.Part(
+            function_response=types.FunctionResponse(name="load_artifacts",
+                                                     response={"artifact_names": [handle["artifact"]]}))])])
+        await load_artifacts_tool.process_llm_request(tool_context=tool_context, llm_request=request)
+        return handle, request
+
+    handle, request = asyncio.run(main())
+    assert handle["version"] == 0
+    assert handle["artifact"].startswith("maven-output-")
+    assert tool_context.actions.artifact_delta == {handle["artifact"]: 0}
+    assert handle["artifact"] in request.config.system_instruction
+    assert request.contents[-1].parts[1].inline_data.data == b"x" * 50
+    assert asyncio.run(offload(tool_context, "maven-output", "short")) is None
+
+
+def test_long_tool_results_are_offloaded(service, monkeypatch):
+    from mcp import types as mcp_types
+
+    from app.mcp_pool import PooledMCPTool
+    from app.vulnscan import build_fix_tool
+
+    monkeypatch.setattr(artifacts, "INLINE_LIMIT", 10)
+    long_text = "print('fixed')\n" * 10
+
+    class Pool:
+        def declaration(self, name):
+            return None
+
+        async def call_tool(self, name, arguments):
+            return mcp_types.CallToolResult(content=[mcp_types.TextContent(type="text", text=long_text)])
+
+    class FixTool:
+        async def run_async(self, *, args, tool_context):
+            return {"content": [{"type": "text", "text": long_text}]}
+
+    mcp_tool = mcp_types.Tool(name="fix-vulnerability", inputSchema={"type": "object"})
+    tool_context = _tool_context(service)
+
+    async def main():
+        pooled = await PooledMCPTool(mcp_tool, Pool()).run_async(args={}, tool_context=tool_context)
+        fixed = await build_fix_tool(FixTool())("password = 'hunter22'\n", tool_context=tool_context)
+        return pooled, fixed
+
+    pooled, fixed = asyncio.run(main())
+    part = pooled["content"][0]
+    assert part["type"] == "artifact" and part["version"] == 0
+    assert fixed["fixed_source_code"]["version"] == 0
@@ -0,0 +1,81 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+from app.batch import BatchJournal, run_batch
+
+
+async def _collect(items, run_turn, concurrency, journal):
+    return [json.loads(line) async for line in run_batch(items, run_turn=run_turn, concurrency=concurrency,
+                                                          journal=journal)]
+
+
+def test_independent_sessions_are_not_delayed_by_a_busy_session(tmp_path):
+    turn_seconds = 0.1
+    items = [{"user_id": "u", "session_id": "A", "query": f"a{i}"} for i in range(4)]
+    items += [{"user_id": "u", "session_id": f"S{i}", "query": f"s{i}"} for i in range(4)]
+    finished = {}
+    started = time.perf_counter()
+
+    async def run_turn(item):
+        await asyncio.sleep(turn_seconds)
+        finished[item["query"]] = time.perf_counter() - started
+        return item["query"]
+
+    lines = asyncio.run(_collect(items, run_turn, 4, BatchJournal(str(tmp_path))))
+
+    assert [line["type"] for line in lines][-1] == "summary"
+    assert lines[-1]["errors"] == 0
+    # Session A's items run one after another...
+    assert finished["a3"] >= 4 * turn_seconds
+    # ...but hold only one slot while doing so: the other three slots take the
+    # independent sessions two turns at most, not behind session A's queue.
+    assert max(finished[f"s{i}"] for i in range(4)) < 3 * turn_seconds
+
+
+def test_items_of_one_session_run_in_order(tmp_path):
+    order = []
+
+    async def run_turn(item):
+        order.append(item["query"])
+        await asyncio.sleep(0)
+        return "ok"
+
+    items = [{"user_id": "u", "session_id": "A", "query": str(i)} for i in range(5)]
+    asyncio.run(_collect(items, run_turn, 3, BatchJournal(str(tmp_path))))
+    assert order == ["0", "1", "2", "3", "4"]
+
+
+def test_concurrency_is_capped_server_side(tmp_path, monkeypatch):
+    from app import batch
+
+    monkeypatch.setattr(batch, "MAX_CONCURRENCY", 3)
+    items = [{"user_id": "u", "session_id": f"S{i}", "query": f"s{i}"} for i in range(10)]
+    in_flight = peak = 0
+
+    async def run_turn(item):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return item["query"]
+
+    lines = asyncio.run(_collect(items, run_turn, 1000, BatchJournal(str(tmp_path))))
+    assert lines[-1]["errors"] == 0
+    assert peak == 3
+
+
+def test_batch_requests_above_the_maximum_are_rejected():
+    pytest.importorskip("google.adk")
+    from pydantic import ValidationError
+
+    from app.batch import MAX_CONCURRENCY
+    from main import BatchRequest
+
+    assert BatchRequest(items=[], concurrency=MAX_CONCURRENCY).concurrency == MAX_CONCURRENCY
+    for concurrency in (0, MAX_CONCURRENCY + 1):
+        with pytest.raises(ValidationError):
+            BatchRequest(items=[], concurrency=concurrency)
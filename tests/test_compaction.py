@@ -0,0 +1,82 @@
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("google.adk")
+
+from google.adk.models.llm_request import LlmRequest
+from google.genai import types
+
+from app.compaction import SUMMARY_KEY, SUMMARY_TURNS_KEY, HistoryCompactor, estimate_tokens, split_turns
+
+
+def user(text):
+    return types.Content(role="user", parts=[types.Part(text=text)])
+
+
+def model(text):
+    return types.Content(role="model", parts=[types.Part(text=text)])
+
+
+def tool_result(response):
+    return types.Content(role="user", parts=[types.Part(function_response=types.FunctionResponse(
+        name="execute_maven_command", response=response))])
+
+
+def conversation(turns, padding=""):
+    contents = []
+    for i in range(turns):
+        contents += [user(f"question {i}"), model(f"answer {i}{padding}")]
+    return contents
+
+
+def test_turns_start_at_user_messages_but_not_at_relayed_agent_output():
+    contents = [user("run mvn test"), model("calling maven"), user("For context: [maven_agent] said ok"),
+                model("done"), user("thanks")]
+    assert [len(turn) for turn in split_turns(contents)] == [4, 1]
+
+
+def test_old_turns_are_folded_into_a_rolling_summary():
+    compactor = HistoryCompactor(keep_turns=2, token_budget=10_000)
+    state = {}
+    compacted, saved = compactor.compact(conversation(5, padding=" ok" * 100), state)
+
+    assert saved > 0
+    assert compacted[0].parts[0].text.startswith("Summary of the earlier conversation (3 turns):")
+    assert [c.parts[0].text[:8] for c in compacted[1:]] == ["question", "answer 3", "question", "answer 4"]
+    assert state[SUMMARY_TURNS_KEY] == 3
+    assert state[SUMMARY_KEY].splitlines()[0].startswith("- User: question 0 / Agent: answer 0 ok ok")
+
+    # The next turn only adds its own line to the stored summary.
+    compactor.compact(conversation(6), state)
+    assert state[SUMMARY_TURNS_KEY] == 4 and len(state[SUMMARY_KEY].splitlines()) == 4
+
+
+def test_bulky_tool_output_is_dropped_from_earlier_turns_only():
+    log = {"status": "success", "output": "[INFO] " * 2000}
+    contents = [user("run mvn test"), tool_result(log), model("tests pass"),
+                user("run it again"), tool_result(log)]
+    compacted, saved = HistoryCompactor(keep_turns=5, bulky_chars=100).compact(contents, {})
+
+    earlier, current = compacted[1].parts[0].function_response, compacted[4].parts[0].function_response
+    assert earlier.response["note"].startswith("Tool output omitted from history")
+    assert earlier.response["status"] == "success"
+    assert current.response == log
+    assert saved > 0
+
+
+def test_turns_are_folded_until_the_budget_fits():
+    contents = conversation(4, padding=" ok" * 200) + [user("x" * 400)]
+    assert estimate_tokens(contents) > 700
+    compacted, _ = HistoryCompactor(keep_turns=5, token_budget=400).compact(contents, {})
+    assert estimate_tokens(compacted) <= 400
+    assert compacted[0].parts[0].text.startswith("Summary of the earlier conversation")
+    assert compacted[-1].parts[0].text == "x" * 400
+
+
+def test_the_callback_compacts_the_request_in_place():
+    request = LlmRequest(contents=conversation(8, padding=" ok" * 100))
+    context = SimpleNamespace(state={}, agent_name="root")
+    assert HistoryCompactor(keep_turns=2).before_model_callback(context, request) is None
+    assert len(request.contents) == 5
+    assert context.state[SUMMARY_TURNS_KEY] == 6
@@ -0,0 +1,86 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+pytest.importorskip("mcp")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, "server"))
+
+from mcp.types import JSONRPCMessage, JSONRPCNotification
+
+if not hasattr(JSONRPCMessage, "model_validate"):
+    pytest.skip("the server is written against mcp 1.x (see uv.lock)", allow_module_level=True)
+
+from event_store import RingBufferEventStore
+
+
+def _message(i):
+    return JSONRPCMessage(JSONRPCNotification(jsonrpc="2.0", method="notifications/message",
+                                              params={"level": "info", "data": f"chunk {i}"}))
+
+
+def _store_and_replay(store, count, after):
+    replayed = []
+
+    async def send(event):
+        replayed.append(event.message.root.params["data"])
+
+    async def main():
+        ids = [await store.store_event("stream-1", _message(i)) for i in range(count)]
+        stream = await store.replay_events_after(ids[after], send)
+        return ids, stream
+
+    ids, stream = asyncio.run(main())
+    return ids, stream, replayed
+
+
+def test_a_client_resumes_after_its_last_event():
+    ids, stream, replayed = _store_and_replay(RingBufferEventStore(), 5, after=1)
+    assert ids[0] == "stream-1/1"
+    assert stream == "stream-1"
+    assert replayed == ["chunk 2", "chunk 3", "chunk 4"]
+
+
+def test_events_evicted_for_size_are_replayed_from_the_spill_file(tmp_path):
+    store = RingBufferEventStore(max_events=2, spill_dir=str(tmp_path))
+    _, _, replayed = _store_and_replay(store, 6, after=0)
+    assert replayed == [f"chunk {i}" for i in range(1, 6)]
+    assert len(os.listdir(tmp_path)) == 1
+
+
+def test_without_a_spill_dir_evicted_events_are_gone():
+    _, _, replayed = _store_and_replay(RingBufferEventStore(max_events=2), 6, after=0)
+    assert replayed == ["chunk 4", "chunk 5"]
+
+
+def test_unknown_or_expired_streams_are_not_replayed():
+    store = RingBufferEventStore(max_age=0.05)
+
+    async def send(event):
+        raise AssertionError("nothing should be replayed")
+
+    async def main():
+        event_id = await store.store_event("stream-1", _message(0))
+        assert await store.replay_events_after("not-an-id", send) is None
+        assert await store.replay_events_after("other/1", send) is None
+        await asyncio.sleep(0.1)
+        return await store.replay_events_after(event_id, send)
+
+    assert asyncio.run(main()) is None
+
+
+def test_idle_streams_and_their_spill_files_are_swept(tmp_path):
+    store = RingBufferEventStore(max_events=1, max_age=0.2, spill_dir=str(tmp_path), sweep_interval=0.05)
+
+    async def main():
+        for i in range(3):
+            await store.store_event("idle", _message(i))
+        assert os.listdir(tmp_path)
+        await asyncio.sleep(0.3)
+        await store.store_event("busy", _message(0))
+
+    asyncio.run(main())
+    assert "idle" not in store._streams
+    assert os.listdir(tmp_path) == []
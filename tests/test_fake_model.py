@@ -0,0 +1,39 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("google.adk")
+
+from app.fake_model import MODEL_SCRIPTED, ScriptedLlm, register_scripted_model
+from app.registry import AgentRegistry
+from app.session import get_session_stateful
+from app.sqlite_session import SqliteSessionService
+from app.team import build_agent_team
+
+
+def test_scripted_steps_are_valid_llm_responses():
+    from google.adk.models.llm_request import LlmRequest
+
+    async def first_response():
+        return [r async for r in ScriptedLlm().generate_content_async(LlmRequest())][0]
+
+    response = asyncio.run(first_response())
+    assert response.content.parts[0].text == "Done."
+
+
+def test_scripted_team_answers_a_turn_end_to_end(tmp_path):
+    import main
+
+    register_scripted_model()
+    session_service = SqliteSessionService(str(tmp_path / "sessions.db"))
+
+    async def turn():
+        registry = AgentRegistry(app_name=main.APP_NAME, builder=build_agent_team, session_service=session_service)
+        runner = await registry.ensure(model=MODEL_SCRIPTED, tools=[])
+        get_session_stateful(app_name=main.APP_NAME, user_id="u1", session_id="s1", session_service=session_service)
+        return await main.call_agent_async(query="hi my name is Ramon", runner=runner, user_id="u1", session_id="s1")
+
+    assert asyncio.run(turn()) == "Hello, Ramon!"
+    session_service.flush()
+    session = session_service.get_session(app_name=main.APP_NAME, user_id="u1", session_id="s1")
+    assert session.events[-1].content.parts[0].text == "Hello, Ramon!"
@@ -0,0 +1,51 @@
+import pytest
+
+pytest.importorskip("google.adk")
+
+from app.fanout import FanoutPlan, FanoutPlanner, merge_answers
+from app.team import build_fanout_rules, build_greeting_rule
+
+CANONICAL = ("hi my name is Ramon, I need to run maven compile on this path: /tmp/mvn-tut. Also use the "
+             "'fix_vulnerability' tool on this source code: print('password is 123456') and this "
+             "vulnerability report: exposes password in clear text")
+
+
+@pytest.fixture
+def planner():
+    return FanoutPlanner(build_fanout_rules(), greeting=build_greeting_rule())
+
+
+def test_independent_tasks_are_fanned_out(planner):
+    plan = planner.plan(CANONICAL)
+    assert plan is not None
+    assert plan.agents == ("maven_agent", "fix_vulnerability_agent")
+    assert plan.tasks[0][1].startswith("I need to run maven compile")
+    rule, args = plan.greeting
+    assert rule.agent == "greeting_agent" and args == {"name": "Ramon"}
+
+
+@pytest.mark.parametrize("query", [
+    "Run mvn test. Then fix the vulnerabilities it reports.",
+    "Run mvn test. After that, fix any vulnerability in the code.",
+    "Run mvn verify. Once done, fix the vulnerabilities.",
+    "Run mvn test. Fix the vulnerabilities based on the failures.",
+    "Run mvn compile. Fix every vulnerability in its output.",
+    "Run mvn test. Fix the vulnerabilities listed in the results.",
+])
+def test_dependent_tasks_are_not_fanned_out(planner, query):
+    assert planner.plan(query) is None
+
+
+@pytest.mark.parametrize("query", [
+    "Run mvn test.",
+    "Run mvn test and fix the vulnerabilities.",  # one clause matching two agents
+    "What is the weather in London?",
+])
+def test_single_or_ambiguous_tasks_are_not_fanned_out(planner, query):
+    assert planner.plan(query) is None
+
+
+def test_answers_are_merged_in_the_order_asked(planner):
+    plan = FanoutPlan(tasks=[("maven_agent", "a"), ("fix_vulnerability_agent", "b")])
+    merged = merge_answers(plan, {"fix_vulnerability_agent": "fixed", "maven_agent": "built"})
+    assert merged == "[maven_agent] built\n\n[fix_vulnerability_agent] fixed"
@@ -0,0 +1,43 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY = ["google.adk", "google.genai", "litellm", "mcp"]
+
+
+def _loaded_after(statement, **env):
+    """Runs `statement` in a fresh interpreter and returns which heavy modules it imported."""
+    code = f"import sys, json\n{statement}\nprint(json.dumps([m for m in {HEAVY!r} if m in sys.modules]))"
+    proc = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True,
+                          env={**os.environ, "APP_PRELOAD": "0", **env})
+    assert proc.returncode == 0, proc.stderr[-2000:]
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def test_importing_main_does_not_load_the_heavy_packages():
+    pytest.importorskip("fastapi")
+    pytest.importorskip("dotenv")
+    assert _loaded_after("import main") == []
+
+
+def test_app_names_are_imported_on_first_use():
+    pytest.importorskip("google.adk")
+    assert _loaded_after("import app") == []
+    assert "google.adk" in _loaded_after("import app; app.AgentRegistry")
+
+
+def test_every_lazy_name_resolves():
+    pytest.importorskip("google.adk")
+    import app
+
+    for name in app.__all__:
+        assert getattr(app, name) is not None, name
+
+
+def test_preload_imports_everything_up_front():
+    pytest.importorskip("google.adk")
+    assert set(_loaded_after("import app; app.preload()")) == set(HEAVY)
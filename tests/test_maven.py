@@ -0,0 +1,93 @@
+import asyncio
+import os
+import sys
+import time
+
+import pytest
+
+from app.maven import MavenExecutor
+
+# Stands in for mvn: `fake-mvn <sleep seconds> <exit code> [line length]`.
+FAKE_MVN = """\
+import os, sys, time
+print(os.getpid(), flush=True)
+if len(sys.argv) > 3:
+    print("x" * int(sys.argv[3]), flush=True)
+print("[INFO] BUILD", "SUCCESS" if sys.argv[2] == "0" else "FAILURE", flush=True)
+print("warning: deprecated", file=sys.stderr, flush=True)
+time.sleep(float(sys.argv[1]))
+sys.exit(int(sys.argv[2]))
+"""
+
+
+@pytest.fixture
+def executable(tmp_path):
+    script = tmp_path / "fake-mvn"
+    script.write_text(f"#!{sys.executable}\n{FAKE_MVN}")
+    script.chmod(0o755)
+    return str(script)
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    return True
+
+
+def test_output_is_collected_and_followed_line_by_line(executable, tmp_path):
+    lines = []
+    result = asyncio.run(MavenExecutor(executable=executable).run(
+        "0 0", str(tmp_path), on_output=lambda stream, line: lines.append((stream, line))))
+    assert result["status"] == "success" and result["exit_code"] == 0
+    assert "[INFO] BUILD SUCCESS\n" in result["output"]
+    assert ("stderr", "warning: deprecated\n") in lines
+    assert all(line.endswith("\n") for _, line in lines)
+
+
+def test_failed_builds_keep_stdout_and_stderr(executable, tmp_path):
+    result = asyncio.run(MavenExecutor(executable=executable).run("0 1", str(tmp_path)))
+    assert result["status"] == "error" and result["exit_code"] == 1
+    assert "BUILD FAILURE" in result["output"] and "warning: deprecated" in result["error"]
+
+
+def test_lines_longer_than_the_stream_limit_are_read(executable, tmp_path):
+    result = asyncio.run(MavenExecutor(executable=executable).run(f"0 0 {200 * 1024}", str(tmp_path)))
+    assert result["status"] == "success"
+    assert "x" * (200 * 1024) in result["output"]
+
+
+def test_builds_beyond_max_concurrency_wait_for_a_slot(executable, tmp_path):
+    executor = MavenExecutor(executable=executable, max_concurrency=2)
+
+    async def main():
+        return await asyncio.gather(*(executor.run("0.3 0", str(tmp_path)) for _ in range(4)))
+
+    started = time.perf_counter()
+    results = asyncio.run(main())
+    assert all(result["status"] == "success" for result in results)
+    assert time.perf_counter() - started >= 0.6
+
+
+def test_a_build_that_times_out_is_stopped_with_its_output(executable, tmp_path):
+    result = asyncio.run(MavenExecutor(executable=executable).run("30 0", str(tmp_path), timeout=0.5))
+    assert result["status"] == "error" and "timed out" in result["error"]
+    assert not _alive(int(result["output"].split()[0]))
+    assert "BUILD SUCCESS" in result["output"]
+
+
+def test_cancelling_the_caller_stops_the_build(executable, tmp_path):
+    pids = []
+
+    async def main():
+        task = asyncio.create_task(MavenExecutor(executable=executable).run(
+            "30 0", str(tmp_path), on_output=lambda stream, line: pids.append(line) if not pids else None))
+        while not pids:
+            await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(main())
+    assert not _alive(int(pids[0]))
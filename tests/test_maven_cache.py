@@ -0,0 +1,98 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+from app import maven, maven_cache
+from app.maven import MavenExecutor
+from app.maven_cache import FileHashMemo, MavenResultCache, is_cacheable, project_fingerprint
+
+
+def _write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def test_fingerprint_covers_every_module(tmp_path):
+    root = str(tmp_path)
+    _write(os.path.join(root, "pom.xml"), "<project/>")
+    _write(os.path.join(root, "core", "pom.xml"), "<project/>")
+    _write(os.path.join(root, "core", "src", "main", "java", "A.java"), "class A {}")
+    _write(os.path.join(root, "core", "target", "A.class"), "compiled")
+    memo = FileHashMemo()
+    before = project_fingerprint(root, memo)
+
+    _write(os.path.join(root, "core", "target", "A.class"), "recompiled")
+    assert project_fingerprint(root, memo) == before
+    _write(os.path.join(root, "core", "src", "main", "java", "A.java"), "class A { int x; }")
+    assert project_fingerprint(root, memo) != before
+
+
+def test_file_hash_memo_is_bounded(tmp_path):
+    memo = FileHashMemo(maxsize=3)
+    paths = []
+    for i in range(10):
+        path = os.path.join(str(tmp_path), f"{i}.txt")
+        _write(path, str(i))
+        paths.append(path)
+        memo.digest(path)
+    assert len(memo._digests) == 3
+    assert memo.digest(paths[0]) == FileHashMemo().digest(paths[0])
+
+
+def test_only_side_effect_free_goals_are_cacheable():
+    assert is_cacheable("compile") and is_cacheable("-q test -DskipITs")
+    assert not is_cacheable("clean compile") and not is_cacheable("install") and not is_cacheable("-v")
+
+
+def test_results_are_keyed_by_command_and_sources(tmp_path):
+    project = str(tmp_path / "project")
+    _write(os.path.join(project, "pom.xml"), "<project/>")
+    cache = MavenResultCache(str(tmp_path / "cache"))
+    key = cache.key("compile", project)
+    cache.put(key, {"status": "success", "output": "BUILD SUCCESS"})
+
+    assert cache.key("  compile ", project) == key
+    assert MavenResultCache(str(tmp_path / "cache")).get(key)["output"] == "BUILD SUCCESS"
+    assert cache.key("test", project) != key
+    _write(os.path.join(project, "pom.xml"), "<project><version>2</version></project>")
+    assert cache.get(cache.key("compile", project)) is None
+
+
+def test_least_recently_used_results_are_evicted(tmp_path):
+    cache = MavenResultCache(str(tmp_path), max_bytes=250)  # room for two entries
+    a, b, c = "aa" * 32, "bb" * 32, "cc" * 32
+    for age, key in ((1, a), (2, b)):
+        cache.put(key, {"output": "x" * 80})
+        os.utime(cache._path(key), (age, age))
+    assert cache.get(a) is not None  # now the most recently used
+    cache.put(c, {"output": "x" * 80})
+    assert cache.get(b) is None
+    assert cache.get(a) is not None and cache.get(c) is not None
+
+
+def test_an_unchanged_project_is_not_built_twice(tmp_path, monkeypatch):
+    pytest.importorskip("google.adk")
+    from app.tools import execute_maven_command
+
+    builds = tmp_path / "builds.log"
+    fake_mvn = tmp_path / "fake-mvn"
+    fake_mvn.write_text(f"#!{sys.executable}\nimport sys\nopen({str(builds)!r}, 'a').write('build\\n')\n"
+                        "print('[INFO] BUILD SUCCESS')\n")
+    fake_mvn.chmod(0o755)
+    project = str(tmp_path / "project")
+    _write(os.path.join(project, "pom.xml"), "<project/>")
+    monkeypatch.setenv("MAVEN_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(maven, "_executor", MavenExecutor(executable=str(fake_mvn)))
+    monkeypatch.setattr(maven_cache, "_cache", None)
+
+    async def main():
+        return [await execute_maven_command(command, project) for command in ("compile", "compile", "clean")]
+
+    first, second, clean = asyncio.run(main())
+    assert first["cached"] is False and second["cached"] is True
+    assert second["output"] == first["output"] == "[INFO] BUILD SUCCESS\n"
+    assert clean["cached"] is False
+    assert builds.read_text().count("build") == 2
@@ -0,0 +1,90 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+pytest.importorskip("google.adk")
+
+from mcp import StdioServerParameters
+from mcp import types as mcp_types
+
+from app.mcp_manifest import ManifestCache, ToolManifest, server_key
+from app.mcp_pool import MCPSessionPool
+
+SERVER = '''
+from mcp.server.fastmcp import FastMCP
+
+mcp = FastMCP("manifest-test")
+
+
+@mcp.tool()
+def echo(text: str) -> str:
+    """Returns `text`."""
+    return text
+
+
+mcp.run()
+'''
+
+
+def _manifest(version, *names):
+    tools = [mcp_types.Tool(name=name, description=f"The {name} tool.",
+                            inputSchema={"type": "object", "properties": {"text": {"type": "string"}}})
+             for name in names]
+    return ToolManifest.build(mcp_types.Implementation(name="manifest-test", version=version), tools)
+
+
+@pytest.fixture
+def params(tmp_path):
+    script = tmp_path / "server.py"
+    script.write_text(SERVER)
+    return StdioServerParameters(command=sys.executable, args=[str(script)])
+
+
+def test_manifests_survive_a_restart(tmp_path):
+    manifest = _manifest("1.0", "echo", "reverse")
+    ManifestCache(str(tmp_path)).put("key", manifest)
+
+    loaded = ManifestCache(str(tmp_path)).get("key")
+    assert [tool.name for tool in loaded.tools] == ["echo", "reverse"]
+    assert loaded.declarations == manifest.declarations
+    assert loaded.digest == manifest.digest
+    assert ManifestCache(str(tmp_path)).get("other") is None
+
+
+def test_the_digest_changes_with_the_version_or_a_schema():
+    assert _manifest("1.0", "echo").digest == _manifest("1.0", "echo").digest
+    assert _manifest("1.0", "echo").digest != _manifest("1.1", "echo").digest
+    assert _manifest("1.0", "echo").digest != _manifest("1.0", "echo", "reverse").digest
+
+
+def test_rebuilding_the_server_script_changes_its_key(params):
+    before = server_key(params)
+    assert server_key(params) == before
+    with open(params.args[0], "a") as f:
+        f.write("\n# rebuilt\n")
+    assert server_key(params) != before
+
+
+def test_a_cached_manifest_serves_tools_before_the_handshake_and_is_replaced_when_stale(params, tmp_path):
+    manifests = ManifestCache(str(tmp_path / "manifests"))
+    manifests.put(server_key(params), _manifest("0.0-old", "old_tool"))
+
+    async def main():
+        pool = MCPSessionPool(params, size=1, health_check_interval=0, acquire_timeout=20, manifests=manifests)
+        await pool.start()
+        try:
+            before = [tool.name for tool in pool.tools()]
+            # The processes were only spawned; the handshake happens in the background.
+            await pool._startup_task
+            return before, [tool.name for tool in pool.tools()]
+        finally:
+            await pool.close()
+
+    before, after = asyncio.run(main())
+    assert before == ["old_tool"]
+    assert after == ["echo"]
+    reloaded = ManifestCache(str(tmp_path / "manifests")).get(server_key(params))
+    assert [tool.name for tool in reloaded.tools] == ["echo"]
+    assert os.listdir(tmp_path / "manifests") == [f"{server_key(params)}.json"]
@@ -0,0 +1,93 @@
+import asyncio
+import sys
+
+import pytest
+
+pytest.importorskip("google.adk")
+
+from mcp import StdioServerParameters
+
+from app.mcp_manifest import ManifestCache
+from app.mcp_pool import MCPSessionPool, PooledMCPTool
+
+SERVER = '''
+import asyncio
+import os
+
+from mcp.server.fastmcp import FastMCP
+
+mcp = FastMCP("pool-test")
+
+
+@mcp.tool()
+async def whoami(delay: float = 0.0) -> str:
+    """Returns the server's process id after `delay` seconds."""
+    await asyncio.sleep(delay)
+    return str(os.getpid())
+
+
+@mcp.tool()
+def crash() -> str:
+    """Exits the server without answering."""
+    os._exit(1)
+
+
+mcp.run()
+'''
+
+
+@pytest.fixture
+def params(tmp_path):
+    script = tmp_path / "server.py"
+    script.write_text(SERVER)
+    return StdioServerParameters(command=sys.executable, args=[str(script)])
+
+
+def _pool(params, **kwargs):
+    return MCPSessionPool(params, health_check_interval=0, acquire_timeout=20, manifests=ManifestCache(""), **kwargs)
+
+
+async def _pid(pool, delay=0.0):
+    result = await pool.call_tool("whoami", {"delay": delay})
+    return result.content[0].text
+
+
+def test_calls_share_a_bounded_number_of_server_processes(params):
+    async def main():
+        pool = await _pool(params, size=2).start()
+        try:
+            tools = pool.tools()
+            pids = await asyncio.gather(*(_pid(pool, 0.05) for _ in range(6)))
+            return tools, pids
+        finally:
+            await pool.close()
+
+    tools, pids = asyncio.run(main())
+    assert sorted(tool.name for tool in tools) == ["crash", "whoami"]
+    assert all(isinstance(tool, PooledMCPTool) for tool in tools)
+    assert len(set(pids)) == 2
+
+
+def test_a_crashed_server_is_restarted(params):
+    async def main():
+        pool = await _pool(params, size=1).start()
+        try:
+            before = await _pid(pool)
+            with pytest.raises(Exception):
+                await asyncio.wait_for(pool.call_tool("crash", {}, retries=0), 10)
+            return before, await _pid(pool)
+        finally:
+            await pool.close()
+
+    before, after = asyncio.run(main())
+    assert before != after
+
+
+def test_a_closed_pool_refuses_calls(params):
+    async def main():
+        pool = await _pool(params, size=1).start()
+        await pool.close()
+        with pytest.raises(RuntimeError):
+            await _pid(pool)
+
+    asyncio.run(main())
@@ -0,0 +1,140 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("google.adk")
+
+from google.adk.tools.base_tool import BaseTool
+
+from app.memo import CachePolicy, MemoizedTool, clear_tool_caches
+
+
+class SlowTool(BaseTool):
+    def __init__(self, name: str):
+        super().__init__(name=name, description="Sleeps, then echoes its arguments.")
+        self.calls = 0
+
+    async def run_async(self, *, args, tool_context):
+        self.calls += 1
+        await asyncio.sleep(0.05)
+        return {"status": "success", "args": args}
+
+
+@pytest.fixture(autouse=True)
+def _clear_caches():
+    clear_tool_caches()
+    yield
+    clear_tool_caches()
+
+
+def test_concurrent_calls_share_one_run():
+    tool = MemoizedTool(SlowTool("shared"), CachePolicy())
+
+    async def main():
+        return await asyncio.gather(*(tool.run_async(args={"x": 1}, tool_context=None) for _ in range(3)))
+
+    results = asyncio.run(main())
+    assert tool.tool.calls == 1
+    assert all(result == {"status": "success", "args": {"x": 1}} for result in results)
+
+
+def test_waiters_run_the_tool_when_the_leader_is_cancelled():
+    tool = MemoizedTool(SlowTool("cancelled_leader"), CachePolicy())
+
+    async def main():
+        leader = asyncio.create_task(tool.run_async(args={"x": 1}, tool_context=None))
+        await asyncio.sleep(0)
+        waiters = [asyncio.create_task(tool.run_async(args={"x": 1}, tool_context=None)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await asyncio.gather(*waiters)
+
+    results = asyncio.run(main())
+    assert results == [{"status": "success", "args": {"x": 1}}] * 2
+    # One waiter took over; the other shared its run.
+    assert tool.tool.calls == 2
+
+
+def test_a_cancelled_leader_without_waiters_leaves_nothing_behind():
+    tool = MemoizedTool(SlowTool("cancelled_alone"), CachePolicy())
+
+    async def main():
+        leader = asyncio.create_task(tool.run_async(args={"x": 1}, tool_context=None))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await tool.run_async(args={"x": 1}, tool_context=None)
+
+    assert asyncio.run(main()) == {"status": "success", "args": {"x": 1}}
+    assert tool.tool.calls == 2
+
+
+def test_cancelling_a_waiter_does_not_cancel_the_run():
+    tool = MemoizedTool(SlowTool("cancelled_waiter"), CachePolicy())
+
+    async def main():
+        leader = asyncio.create_task(tool.run_async(args={"x": 1}, tool_context=None))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(tool.run_async(args={"x": 1}, tool_context=None))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        return await leader
+
+    assert asyncio.run(main()) == {"status": "success", "args": {"x": 1}}
+    assert tool.tool.calls == 1
+
+
+def test_pooled_mcp_tools_cache_the_result_and_offload_per_session(tmp_path, monkeypatch):
+    from google.adk.agents import LlmAgent
+    from google.adk.agents.invocation_context import InvocationContext
+    from google.adk.sessions import InMemorySessionService
+    from google.adk.tools.tool_context import ToolContext
+    from mcp import types as mcp_types
+
+    from app import artifacts
+    from app.artifacts import MmapArtifactService
+    from app.mcp_pool import PooledMCPTool
+    from app.memo import memoize_tools
+
+    monkeypatch.setattr(artifacts, "INLINE_LIMIT", 10)
+    long_text = "BUILD SUCCESS\n" * 10
+    service = MmapArtifactService(str(tmp_path))
+    session_service = InMemorySessionService()
+
+    class Pool:
+        calls = 0
+
+        def declaration(self, name):
+            return None
+
+        async def call_tool(self, name, arguments):
+            Pool.calls += 1
+            return mcp_types.CallToolResult(content=[mcp_types.TextContent(type="text", text=long_text)])
+
+    def tool_context(session_id):
+        session = session_service.create_session(app_name="app", user_id="u1", session_id=session_id)
+        return ToolContext(InvocationContext(
+            artifact_service=service, session_service=session_service, invocation_id="e-1",
+            agent=LlmAgent(name="maven_agent"), session=session,
+        ))
+
+    mcp_tool = mcp_types.Tool(name="run-maven", inputSchema={"type": "object"})
+    [tool] = memoize_tools([PooledMCPTool(mcp_tool, Pool())], {"run-maven": CachePolicy()})
+    assert isinstance(tool, MemoizedTool)
+
+    async def main():
+        first = await tool.run_async(args={"goal": "test"}, tool_context=tool_context("s1"))
+        second = await tool.run_async(args={"goal": "test"}, tool_context=tool_context("s2"))
+        keys = [await service.list_artifact_keys(app_name="app", user_id="u1", session_id=s)
+                for s in ("s1", "s2")]
+        return first, second, keys
+
+    first, second, keys = asyncio.run(main())
+    assert Pool.calls == 1
+    assert first["content"][0]["type"] == second["content"][0]["type"] == "artifact"
+    assert keys[0] and keys[0] == keys[1]
@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("google.adk")
+
+import httpx
+import litellm
+from google.adk.models.google_llm import Gemini
+from google.adk.models.lite_llm import LiteLlm
+
+from app import metrics, model_clients
+from app.agentUtils import createAgent
+from app.fake_model import MODEL_SCRIPTED, ScriptedLlm, register_scripted_model
+from app.model_clients import PooledGemini, get_llm
+
+
+@pytest.fixture(autouse=True)
+def _fresh_clients(monkeypatch):
+    monkeypatch.setenv("GOOGLE_API_KEY", "test-key")
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    asyncio.run(model_clients.close())
+    yield
+    asyncio.run(model_clients.close())
+
+
+def test_one_client_per_model_name():
+    gemini = get_llm("gemini-2.0-flash")
+    assert isinstance(gemini, PooledGemini) and isinstance(gemini, Gemini)
+    assert get_llm("gemini-2.0-flash") is gemini
+    assert gemini.api_client is gemini.api_client
+
+    gpt = get_llm("openai/gpt-4o")
+    assert isinstance(gpt, LiteLlm) and get_llm("openai/gpt-4o") is gpt
+    # LiteLLM providers go through the shared keep-alive client.
+    assert litellm.aclient_session is model_clients.get_http_client()
+
+
+def test_instances_and_unknown_names_pass_through():
+    llm = ScriptedLlm()
+    assert get_llm(llm) is llm
+    assert get_llm("not-a-registered-model") == "not-a-registered-model"
+    assert get_llm(None) is None
+
+
+def test_agents_share_the_client_of_their_model():
+    register_scripted_model()
+    agents = [createAgent(model=MODEL_SCRIPTED, name=f"agent_{i}", instruction="", description="")
+              for i in range(2)]
+    inner = [getattr(agent.model, "llm", agent.model) for agent in agents]
+    assert isinstance(inner[0], ScriptedLlm) and inner[0] is inner[1]
+
+
+def test_warm_up_opens_a_connection_per_provider(monkeypatch):
+    requested = []
+
+    def handler(request):
+        requested.append(str(request.url))
+        return httpx.Response(401)
+
+    monkeypatch.setattr(model_clients, "_http_client", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    asyncio.run(model_clients.warm_up(["openai/gpt-4o", "openai/gpt-4o-mini", "anthropic/claude-3-sonnet"]))
+    assert sorted(requested) == ["https://api.anthropic.com", "https://api.openai.com"]
+    assert 'model_client_warmup_seconds{provider="openai"}' in metrics.render()
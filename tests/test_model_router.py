@@ -0,0 +1,36 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("google.adk")
+
+from app.model_router import (DEFAULT_CANDIDATES, DEFAULT_PROFILES, LatencyProfile, ModelRouter, RoutingPolicy,
+                              simulate)
+
+
+def _router(**kwargs):
+    # Time runs 100x faster than in the profiles, as in `python -m app.model_router`.
+    return ModelRouter(simulate=True, seed=1, policy=RoutingPolicy(latency_weight=100.0),
+                       profiles={m: LatencyProfile(p.median / 100, p.p95 / 100, p.error_rate)
+                                 for m, p in DEFAULT_PROFILES.items()}, **kwargs)
+
+
+def test_simulated_mix_counts_every_call_past_the_stats_window():
+    router = _router(window=20)
+    roles = ["router", "maven"]
+    mix = asyncio.run(simulate(router, roles, 60))
+    for role in roles:
+        assert set(mix[role]) == set(DEFAULT_CANDIDATES[role])
+        assert sum(mix[role].values()) == 60
+
+
+def test_router_prefers_the_faster_candidate():
+    router = _router()
+    mix = asyncio.run(simulate(router, ["maven"], 80))
+    fastest = min(DEFAULT_CANDIDATES["maven"], key=lambda m: DEFAULT_PROFILES[m].p95)
+    assert max(mix["maven"], key=mix["maven"].get) == fastest
+
+
+def test_pinned_roles_always_get_their_model():
+    router = _router(pins={"greeter": "gemini-2.0-flash-lite"})
+    assert {router.choose("greeter") for _ in range(20)} == {"gemini-2.0-flash-lite"}
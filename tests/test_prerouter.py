@@ -0,0 +1,52 @@
+import pytest
+
+pytest.importorskip("google.adk")
+
+from app.prerouter import PreRouter
+from app.team import build_intent_rules
+
+
+@pytest.fixture
+def prerouter():
+    return PreRouter(build_intent_rules())
+
+
+@pytest.mark.parametrize("text, agent, args", [
+    ("hi", "greeting_agent", {}),
+    ("Hello there!", "greeting_agent", {}),
+    ("hi, my name is Ramon", "greeting_agent", {"name": "Ramon"}),
+    ("thanks, bye!", "farewell_agent", {}),
+    ("see you later", "farewell_agent", {}),
+])
+def test_trivial_turns_are_answered_locally(prerouter, text, agent, args):
+    match = prerouter.classify(text)
+    assert match is not None
+    assert match.rule.agent == agent
+    assert match.args == args
+    assert match.confidence >= prerouter.threshold
+
+
+@pytest.mark.parametrize("text", [
+    "Hi, I'm lost",
+    "hey im hungry",
+    "hello this is urgent",
+    "hey i am sick",
+    "hi, what's the weather in London?",
+    "hiking tips",
+    "bye the way, run mvn compile",
+])
+def test_messages_with_more_than_a_greeting_go_to_the_llm(prerouter, text):
+    assert prerouter.classify(text) is None
+
+
+def test_confidence_reflects_how_much_of_the_message_matched():
+    rule = build_intent_rules()[0]
+    _, full = rule.match("hello")
+    _, partial = rule.match("hello, I'm lost")
+    assert full == pytest.approx(rule.confidence)
+    assert partial < full / 2
+
+
+def test_threshold_is_applied():
+    assert PreRouter(build_intent_rules(), threshold=0.2).classify("hello, I'm lost") is not None
+    assert PreRouter(build_intent_rules(), threshold=0.9).classify("hello, I'm lost") is None
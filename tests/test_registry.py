@@ -0,0 +1,69 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("google.adk")
+
+from google.adk.agents import LlmAgent
+from google.adk.sessions import InMemorySessionService
+
+from app.fake_model import MODEL_SCRIPTED
+from app.registry import AgentRegistry, fingerprint
+
+
+class CountingBuilder:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, *, model, mcp_tools):
+        self.calls.append((model, mcp_tools))
+        return LlmAgent(name="root_agent", model=model)
+
+
+def tool(name):
+    def run():
+        return name
+    run.__name__ = name
+    return run
+
+
+def _registry(builder, **kwargs):
+    return AgentRegistry(app_name="app", builder=builder, session_service=InMemorySessionService(), **kwargs)
+
+
+def test_the_graph_is_built_once_and_reused():
+    builder = CountingBuilder()
+    registry = _registry(builder)
+
+    async def main():
+        return await asyncio.gather(*(registry.ensure(model=MODEL_SCRIPTED, tools=[tool("a"), tool("b")])
+                                      for _ in range(5)))
+
+    runners = asyncio.run(main())
+    assert len(builder.calls) == 1 and registry.build_count == 1
+    assert all(runner is registry.runner for runner in runners)
+    # The same tools in another order are the same configuration.
+    again = asyncio.run(registry.ensure(model=MODEL_SCRIPTED, tools=[tool("b"), tool("a")]))
+    assert again is runners[0] and registry.build_count == 1
+
+
+def test_a_new_configuration_is_swapped_in():
+    builder = CountingBuilder()
+    fanouts = []
+    registry = _registry(builder, fanout_builder=lambda **kwargs: fanouts.append(kwargs) or object())
+
+    first = asyncio.run(registry.ensure(model=MODEL_SCRIPTED, tools=[tool("a")]))
+    second = asyncio.run(registry.ensure(model=MODEL_SCRIPTED, tools=[tool("a"), tool("c")]))
+    assert second is not first and registry.runner is second
+    assert registry.build_count == 2 and len(fanouts) == 2
+    assert fanouts[-1]["session_service"] is registry.session_service
+
+
+def test_the_runner_is_not_available_before_the_first_build():
+    with pytest.raises(RuntimeError):
+        _registry(CountingBuilder()).runner
+
+
+def test_fingerprint_uses_model_and_tool_names():
+    assert fingerprint(model="m", tools=[tool("b"), tool("a")]) == ("m", ("a", "b"))
+    assert fingerprint(model="m", tools=None) == ("m", ())
@@ -0,0 +1,99 @@
+import asyncio
+
+import httpx
+import pytest
+
+pytest.importorskip("google.adk")
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import errors, types
+
+from app import resilience
+from app.resilience import DeadlineExceeded, ResilientLlm, RetryBudget, is_retryable
+
+
+class FlakyLlm(BaseLlm):
+    """Raises each of `failures` in turn, then answers."""
+
+    failures: list = []
+    calls: int = 0
+
+    async def generate_content_async(self, llm_request, stream=False):
+        self.calls += 1
+        if self.calls <= len(self.failures):
+            raise self.failures[self.calls - 1]
+        yield LlmResponse(content=types.Content(role="model", parts=[types.Part(text="ok")]))
+
+
+class RateLimited(Exception):
+    status_code = 429
+
+
+def _request():
+    return LlmRequest(contents=[types.Content(role="user", parts=[types.Part(text="hi")])])
+
+
+def _generate(failures):
+    flaky = FlakyLlm(model="flaky", failures=failures)
+    llm = ResilientLlm(llm=flaky, hedging=False, budget=RetryBudget())
+
+    async def main():
+        return [r async for r in llm.generate_content_async(_request())]
+
+    return flaky, asyncio.run(main())
+
+
+@pytest.fixture(autouse=True)
+def _no_backoff(monkeypatch):
+    monkeypatch.setattr(resilience, "RETRY_BASE_DELAY", 0.0)
+
+
+@pytest.mark.parametrize("error", [
+    TimeoutError(),
+    ConnectionResetError(),
+    httpx.ConnectError("refused"),
+    errors.ServerError(503, {"error": {"message": "unavailable"}}),
+    errors.ClientError(429, {"error": {"message": "quota"}}),
+    RateLimited(),
+])
+def test_transient_errors_are_retried(error):
+    assert is_retryable(error)
+    flaky, responses = _generate([error])
+    assert flaky.calls == 2
+    assert responses[0].content.parts[0].text == "ok"
+
+
+@pytest.mark.parametrize("error", [
+    errors.ClientError(400, {"error": {"message": "bad request"}}),
+    errors.ClientError(403, {"error": {"message": "denied"}}),
+    ValueError("bug"),
+    DeadlineExceeded(),
+])
+def test_other_errors_are_raised_at_once(error):
+    assert not is_retryable(error)
+    with pytest.raises(type(error)):
+        _generate([error])
+
+
+def test_retries_stop_at_max_retries():
+    error = errors.ServerError(500, {"error": {"message": "internal"}})
+    with pytest.raises(errors.ServerError):
+        _generate([error] * 5)
+
+
+def test_the_turn_deadline_is_not_retried():
+    class SlowLlm(BaseLlm):
+        async def generate_content_async(self, llm_request, stream=False):
+            await asyncio.sleep(1)
+            yield LlmResponse()
+
+    llm = ResilientLlm(llm=SlowLlm(model="slow"), hedging=False, budget=RetryBudget())
+
+    async def main():
+        with resilience.deadline(0.05):
+            return [r async for r in llm.generate_content_async(_request())]
+
+    with pytest.raises(DeadlineExceeded):
+        asyncio.run(main())
@@ -0,0 +1,53 @@
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+pytest.importorskip("anyio")
+
+SERVER_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "server")
+sys.path.insert(0, SERVER_DIR)
+
+from result_cache import SqliteResultCache
+
+
+def test_a_result_stored_by_one_worker_is_served_by_another(tmp_path):
+    db_path = str(tmp_path / "results.db")
+    key = SqliteResultCache.key("extract-wikipedia-article", {"url": "u", "revision": "r1"})
+    writer = ("import asyncio, sys; sys.path.insert(0, sys.argv[1]); from result_cache import SqliteResultCache; "
+              "asyncio.run(SqliteResultCache(sys.argv[2]).put(sys.argv[3], ['part 1', 'part 2']))")
+    subprocess.run([sys.executable, "-c", writer, SERVER_DIR, db_path, key], check=True)
+
+    assert asyncio.run(SqliteResultCache(db_path).get(key)) == ["part 1", "part 2"]
+
+
+def test_keys_ignore_argument_order():
+    assert SqliteResultCache.key("t", {"a": 1, "b": 2}) == SqliteResultCache.key("t", {"b": 2, "a": 1})
+    assert SqliteResultCache.key("t", {"a": 1}) != SqliteResultCache.key("other", {"a": 1})
+
+
+def test_entries_expire(tmp_path):
+    cache = SqliteResultCache(str(tmp_path / "results.db"), ttl=0.05)
+
+    async def main():
+        await cache.put("k", "v")
+        fresh = await cache.get("k")
+        await asyncio.sleep(0.1)
+        return fresh, await cache.get("k")
+
+    assert asyncio.run(main()) == ("v", None)
+
+
+def test_the_oldest_entries_are_dropped_beyond_max_entries(tmp_path):
+    cache = SqliteResultCache(str(tmp_path / "results.db"), max_entries=3)
+
+    async def main():
+        for i in range(5):
+            await cache.put(f"k{i}", i)
+            time.sleep(0.001)  # distinct expiry times
+        return [await cache.get(f"k{i}") for i in range(5)]
+
+    assert asyncio.run(main()) == [None, None, 2, 3, 4]
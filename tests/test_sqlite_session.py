@@ -0,0 +1,96 @@
+import sqlite3
+import time
+
+import pytest
+
+pytest.importorskip("google.adk")
+
+from google.adk.events.event import Event
+from google.adk.events.event_actions import EventActions
+from google.genai import types
+
+from app.sqlite_session import SqliteSessionService
+
+KEY = {"app_name": "app", "user_id": "u1", "session_id": "s1"}
+
+
+def _event(text, author="agent", **state_delta):
+    return Event(invocation_id="e-1", author=author, timestamp=time.time(),
+                 content=types.Content(role="model", parts=[types.Part(text=text)]),
+                 actions=EventActions(state_delta=state_delta))
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "sessions.db")
+
+
+def test_sessions_survive_a_restart_with_scoped_state(db_path):
+    service = SqliteSessionService(db_path)
+    session = service.create_session(**KEY, state={"topic": "maven", "app:theme": "dark", "temp:x": 1})
+    service.append_event(session, _event("hi", **{"unit": "C", "user:name": "Ramon", "temp:y": 2}))
+    service.flush()
+
+    restarted = SqliteSessionService(db_path)
+    loaded = restarted.get_session(**KEY)
+    assert [e.content.parts[0].text for e in loaded.events] == ["hi"]
+    assert loaded.state == {"topic": "maven", "unit": "C", "app:theme": "dark", "user:name": "Ramon"}
+    # App and user state are shared with the user's other sessions.
+    other = restarted.create_session(app_name="app", user_id="u1", session_id="s2")
+    assert other.state == {"app:theme": "dark", "user:name": "Ramon"}
+
+
+def test_workers_see_each_others_appends(db_path):
+    first, second = SqliteSessionService(db_path), SqliteSessionService(db_path)
+    session = first.create_session(**KEY)
+    first.append_event(session, _event("one"))
+    first.flush()
+    assert len(second.get_session(**KEY).events) == 1
+
+    # The second worker only fetches the new row, on top of what it cached.
+    first.append_event(session, _event("two"))
+    first.flush()
+    assert [e.content.parts[0].text for e in second.get_session(**KEY).events] == ["one", "two"]
+
+
+def test_reads_wait_for_this_processs_pending_writes(db_path):
+    service = SqliteSessionService(db_path, flush_interval=5)
+    session = service.create_session(**KEY)
+    for i in range(3):
+        service.append_event(session, _event(str(i)))
+    started = time.perf_counter()
+    assert len(service.get_session(**KEY).events) == 3
+    assert time.perf_counter() - started < 5
+
+
+def test_partial_events_are_not_stored(db_path):
+    service = SqliteSessionService(db_path)
+    session = service.create_session(**KEY)
+    service.append_event(session, _event("chunk").model_copy(update={"partial": True}))
+    assert service.get_session(**KEY).events == []
+
+
+def test_duplicate_and_deleted_sessions(db_path):
+    service = SqliteSessionService(db_path)
+    service.create_session(**KEY)
+    with pytest.raises(ValueError):
+        service.create_session(**KEY)
+    assert [s.id for s in service.list_sessions(app_name="app", user_id="u1").sessions] == ["s1"]
+    service.delete_session(**KEY)
+    assert service.get_session(**KEY) is None
+
+
+def test_legacy_json_state_is_migrated(db_path):
+    conn = sqlite3.connect(db_path)
+    conn.executescript("""
+        CREATE TABLE sessions (app_name TEXT NOT NULL, user_id TEXT NOT NULL, id TEXT NOT NULL,
+            state TEXT NOT NULL, create_time REAL NOT NULL, update_time REAL NOT NULL,
+            PRIMARY KEY (app_name, user_id, id));
+        CREATE TABLE user_states (app_name TEXT, user_id TEXT, state TEXT);
+        INSERT INTO sessions VALUES ('app', 'u1', 's1', '{"topic": "maven"}', 0, 0);
+        INSERT INTO user_states VALUES ('app', 'u1', '{"name": "Ramon"}');
+    """)
+    conn.close()
+
+    loaded = SqliteSessionService(db_path).get_session(**KEY)
+    assert loaded.state == {"topic": "maven", "user:name": "Ramon"}
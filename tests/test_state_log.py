@@ -0,0 +1,103 @@
+import sqlite3
+
+import pytest
+
+from app import state_codec
+from app.state_log import StateLog, session_scope
+
+SCOPE = session_scope("app", "u1", "s1")
+
+
+def _connect(path):
+    return sqlite3.connect(path, isolation_level=None)
+
+
+class _Rows(list):
+    def fetchone(self):
+        return self[0] if self else None
+
+    def fetchall(self):
+        return list(self)
+
+
+class _SnapshotAfterFirstRead:
+    """Lets another connection fold the scope right after the snapshot row is read."""
+
+    def __init__(self, conn, other, scope=SCOPE):
+        self._conn = conn
+        self._other = other
+        self.scope = scope
+        self.folded = False
+
+    @property
+    def in_transaction(self):
+        return self._conn.in_transaction
+
+    def execute(self, sql, *args):
+        cursor = self._conn.execute(sql, *args)
+        if sql.startswith("SELECT seq, state FROM state_snapshots") and args[0][0] == self.scope \
+                and not self.folded:
+            rows = cursor.fetchall()
+            self.folded = True
+            self._other.execute("BEGIN IMMEDIATE")
+            StateLog().snapshot(self._other, self.scope)
+            self._other.execute("COMMIT")
+            return _Rows(rows)
+        return cursor
+
+
+@pytest.mark.parametrize("value", [None, True, False, 0, -7, 2 ** 70, 1.5, "héllo", b"\x00\xff",
+                                   [1, "a", None], {"nested": {"list": [1.25, False]}}])
+def test_codec_round_trips(value):
+    assert state_codec.decode(state_codec.encode({"key": value})) == {"key": value}
+
+
+def test_deltas_are_folded_every_interval(tmp_path):
+    conn = _connect(str(tmp_path / "state.db"))
+    log = StateLog(snapshot_interval=4)
+    log.create_tables(conn)
+    for i in range(10):
+        log.append(conn, SCOPE, {"turn": i, f"k{i}": i})
+    assert log.load(conn, SCOPE) == {"turn": 9, **{f"k{i}": i for i in range(10)}}
+    remaining = conn.execute("SELECT COUNT(*) FROM state_log WHERE scope = ?", (SCOPE,)).fetchone()[0]
+    assert remaining == 2
+
+
+def test_load_is_consistent_when_another_worker_snapshots_meanwhile(tmp_path):
+    path = str(tmp_path / "state.db")
+    conn = _connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    log = StateLog(snapshot_interval=1000)
+    log.create_tables(conn)
+    log.append(conn, SCOPE, {"a": 1})
+    log.append(conn, SCOPE, {"b": 2})
+
+    reader = _SnapshotAfterFirstRead(conn, _connect(path))
+    assert log.load(reader, SCOPE) == {"a": 1, "b": 2}
+    assert reader.folded
+    assert log.load(conn, SCOPE) == {"a": 1, "b": 2}
+
+
+def test_session_load_is_consistent_when_another_worker_snapshots_meanwhile(tmp_path):
+    pytest.importorskip("google.adk")
+    from google.adk.events import Event, EventActions
+
+    from app.sqlite_session import SqliteSessionService
+
+    path = str(tmp_path / "sessions.db")
+    service = SqliteSessionService(path, state_log=StateLog(snapshot_interval=1000))
+    session = service.create_session(app_name="app", user_id="u1", session_id="s1",
+                                     state={"a": 1, "user:name": "Ramon"})
+    for turn in range(3):
+        service.append_event(session, Event(invocation_id=f"e-{turn}", author="agent",
+                                            actions=EventActions(state_delta={"turn": turn, "user:seen": turn})))
+    service.flush()
+
+    conn = service._conn
+    service._local.conn = _SnapshotAfterFirstRead(conn, _connect(path))
+    try:
+        loaded = service.get_session(app_name="app", user_id="u1", session_id="s1")
+    finally:
+        service._local.conn = conn
+    assert loaded.state == {"a": 1, "turn": 2, "user:name": "Ramon", "user:seen": 2}
+    assert len(loaded.events) == 3
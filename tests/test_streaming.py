@@ -0,0 +1,59 @@
+import asyncio
+import json
+
+import pytest
+
+pytest.importorskip("google.adk")
+
+from app.fake_model import MODEL_SCRIPTED, register_scripted_model
+from app.registry import AgentRegistry
+from app.session import get_session_stateful
+from app.sqlite_session import SqliteSessionService
+from app.streaming import format_sse, stream_agent_events
+from app.team import build_agent_team
+
+
+class DisconnectedRequest:
+    async def is_disconnected(self):
+        return True
+
+
+def _parse(chunk):
+    fields = dict(line.split(": ", 1) for line in chunk.strip().split("\n"))
+    return fields["event"], json.loads(fields["data"])
+
+
+def _stream(tmp_path, request=None):
+    register_scripted_model()
+    session_service = SqliteSessionService(str(tmp_path / "sessions.db"))
+
+    async def main():
+        registry = AgentRegistry(app_name="app", builder=build_agent_team, session_service=session_service)
+        runner = await registry.ensure(model=MODEL_SCRIPTED, tools=[])
+        get_session_stateful(app_name="app", user_id="u1", session_id="s1", session_service=session_service)
+        return [_parse(chunk) async for chunk in stream_agent_events(runner, query="hi my name is Ramon",
+                                                                     user_id="u1", session_id="s1",
+                                                                     request=request)]
+
+    return asyncio.run(main())
+
+
+def test_a_turn_streams_every_hop_in_order(tmp_path):
+    messages = _stream(tmp_path)
+    kinds = [kind for kind, _ in messages]
+    assert kinds[-2:] == ["final", "done"]
+    assert "transfer" in kinds and kinds.index("transfer") < kinds.index("tool_call")
+    [call] = [data for kind, data in messages if kind == "tool_call"]
+    assert call["name"] == "say_hello" and call["args"] == {"name": "Ramon"}
+    assert messages[-2][1]["text"] == "Hello, Ramon!"
+
+
+def test_a_disconnected_client_stops_the_run(tmp_path):
+    assert _stream(tmp_path, request=DisconnectedRequest()) == []
+
+
+def test_sse_messages_are_framed():
+    text = format_sse({"text": "a\nb"}, event="text", event_id="e1")
+    assert text.startswith("id: e1\nevent: text\ndata: ")
+    assert text.endswith("\n\n") and text.count("\n") == 4
+    assert json.loads(text.split("data: ", 1)[1]) == {"text": "a\nb"}
@@ -0,0 +1,59 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("google.adk")
+
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+from app import tracing
+
+
+@pytest.fixture
+def exported(tmp_path):
+    path = tmp_path / "traces.jsonl"
+    tracing.configure(str(path))
+    yield path
+    tracing.configure(None)
+
+
+def _spans(path):
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    return [s for line in lines for s in line["resourceSpans"][0]["scopeSpans"][0]["spans"]]
+
+
+def test_model_callbacks_accept_a_real_llm_response(exported):
+    context = SimpleNamespace(invocation_id="e-1", agent_name="weather_agent")
+    response = LlmResponse(content=types.Content(role="model", parts=[types.Part(text="Sunny.")]))
+    with tracing.span("agent.turn"):
+        assert tracing.before_model_callback(context, LlmRequest(model="gemini-2.0-flash")) is None
+        assert tracing.after_model_callback(context, response) is None
+        assert tracing._open_spans == {}
+
+    spans = {s["name"]: s for s in _spans(exported)}
+    assert set(spans) == {"agent.turn", "model.generate"}
+    assert spans["model.generate"]["status"] == {"code": 1}
+    assert spans["model.generate"]["parentSpanId"] == spans["agent.turn"]["spanId"]
+
+
+def test_partial_responses_keep_the_model_span_open(exported):
+    context = SimpleNamespace(invocation_id="e-2", agent_name="weather_agent")
+    with tracing.span("agent.turn"):
+        tracing.before_model_callback(context, LlmRequest(model="gemini-2.0-flash"))
+        tracing.after_model_callback(context, LlmResponse(partial=True))
+        assert len(tracing._open_spans) == 1
+        tracing.after_model_callback(context, LlmResponse())
+        assert tracing._open_spans == {}
+
+
+def test_spans_left_open_end_with_their_turn(exported):
+    context = SimpleNamespace(invocation_id="e-3", agent_name="weather_agent")
+    with tracing.span("agent.turn"):
+        tracing.before_model_callback(context, LlmRequest(model="gemini-2.0-flash"))
+
+    spans = {s["name"]: s for s in _spans(exported)}
+    assert spans["model.generate"]["status"]["code"] == 2
+    assert tracing._open_spans == {}
@@ -0,0 +1,94 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("google.adk")
+
+from app.vulnscan import fix_source, scan, split_chunks
+
+SOURCE = '''import os
+
+
+def greet(name):
+    return f"Hello, {name}!"
+
+
+class Store:
+    def connect(self):
+        # Credentials for the demo database.
+        password = "hunter22"
+        return password
+
+    def size(self):
+        return 0
+
+
+def run(command):
+    os.system(command)
+'''
+
+
+def _rules(source):
+    return {(f.rule, f.line) for f in scan(source)}
+
+
+def test_the_canonical_query_is_flagged():
+    assert _rules("print('password is 123456')") == {("secret-in-string", 1), ("secret-output", 1)}
+
+
+def test_python_rules():
+    assert _rules(SOURCE) == {("hardcoded-secret", 11), ("os.system", 19)}
+    assert _rules("import yaml\nyaml.load(data)\neval('1 + 1')\n") == {("yaml-load", 2)}
+
+
+def test_chunks_are_functions_and_methods_covering_every_line():
+    chunks = split_chunks(SOURCE)
+    assert "".join(chunk.text for chunk in chunks) == SOURCE
+    # The comment above a method stays with it; each method is its own chunk.
+    connect = next(chunk for chunk in chunks if "def connect" in chunk.text)
+    assert "def size" not in connect.text and "def greet" not in connect.text
+
+
+def test_brace_languages_split_at_blank_lines_between_blocks():
+    source = "function a() {\n  return 1;\n\n}\n\nfunction b() {\n  return 2;\n}\n"
+    chunks = split_chunks(source)
+    # The blank line inside a() does not split it; leading blank lines go with the next block.
+    assert [chunk.text.strip().split("(")[0] for chunk in chunks] == ["function a", "function b"]
+
+
+def test_only_flagged_chunks_are_sent_to_the_fixer():
+    sent = []
+
+    async def fixer(code, report):
+        sent.append(report)
+        await asyncio.sleep(0.01)
+        return code.replace('"hunter22"', 'os.environ["DB_PASSWORD"]').replace("os.system(command)",
+                                                                              "subprocess.run([command])")
+
+    result = asyncio.run(fix_source(SOURCE, fixer=fixer, report="exposes password"))
+    assert result["status"] == "success"
+    assert result["chunks_fixed"] == 2 and len(sent) == 2 < result["chunks_total"]
+    assert all("Report from the user: exposes password" in report for report in sent)
+    fixed = result["fixed_source_code"]
+    assert 'os.environ["DB_PASSWORD"]' in fixed and "subprocess.run([command])" in fixed
+    assert fixed.replace('os.environ["DB_PASSWORD"]', '"hunter22"').replace(
+        "subprocess.run([command])", "os.system(command)") == SOURCE
+
+
+def test_clean_sources_are_not_sent():
+    async def fixer(code, report):
+        raise AssertionError("the fixer should not be called")
+
+    result = asyncio.run(fix_source("def add(a, b):\n    return a + b\n", fixer=fixer))
+    assert result["chunks_fixed"] == 0 and "not sent" in result["message"]
+
+
+def test_failed_or_empty_fixes_keep_the_original_lines():
+    async def fixer(code, report):
+        if "os.system" in code:
+            raise RuntimeError("fixer unavailable")
+        return ""
+
+    result = asyncio.run(fix_source(SOURCE, fixer=fixer))
+    assert result["status"] == "error" and len(result["errors"]) == 2
+    assert result["fixed_source_code"] == SOURCE
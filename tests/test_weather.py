@@ -0,0 +1,85 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app import weather
+from app.weather import CachedWeatherProvider, MockWeatherProvider, WeatherProvider, format_temperature, normalize_city
+
+
+class CountingProvider(WeatherProvider):
+    def __init__(self):
+        self.inner = MockWeatherProvider()
+        self.lookups = []
+        self.batches = []
+
+    def lookup(self, city):
+        self.lookups.append(city)
+        return self.inner.lookup(city)
+
+    def lookup_many(self, cities):
+        self.batches.append(list(cities))
+        return {city: self.inner.lookup(city) for city in cities}
+
+
+@pytest.mark.parametrize("name, city", [
+    ("london", "London"),
+    ("  New-York ", "New York"),
+    ("NYC", "New York"),
+    ("Big Apple", "New York"),
+    ("東京", "Tokyo"),
+    ("Lodnon", "London"),  # a typo still resolves
+])
+def test_names_aliases_and_typos_resolve(name, city):
+    assert MockWeatherProvider().lookup(name)["city"] == city
+
+
+def test_unknown_cities_are_not_guessed():
+    provider = MockWeatherProvider()
+    assert provider.lookup("Paris") is None
+    assert provider.lookup("") is None
+
+
+def test_normalize_city():
+    assert normalize_city("São Paulo ") == "saopaulo"
+    assert normalize_city("New-York") == normalize_city("new york") == "newyork"
+
+
+def test_the_cache_is_keyed_on_the_normalized_name():
+    inner = CountingProvider()
+    provider = CachedWeatherProvider(inner, ttl=60)
+    for name in ("London", "london ", "LONDON"):
+        assert provider.lookup(name)["city"] == "London"
+    assert inner.lookups == ["London"]
+    # Misses are not cached: a city added to the source later is found.
+    provider.lookup("Paris")
+    provider.lookup("Paris")
+    assert inner.lookups.count("Paris") == 2
+
+
+def test_batch_lookups_only_fetch_the_cities_not_cached():
+    inner = CountingProvider()
+    provider = CachedWeatherProvider(inner, ttl=60)
+    provider.lookup("Tokyo")
+    results = provider.lookup_many(["tokyo", "London", "Paris"])
+    assert inner.batches == [["London", "Paris"]]
+    assert results["tokyo"]["city"] == "Tokyo" and results["London"]["city"] == "London"
+    assert results["Paris"] is None
+
+
+def test_format_temperature():
+    assert format_temperature(25, "Fahrenheit") == "77°F"
+    assert format_temperature(15, "Celsius") == "15°C"
+
+
+def test_batch_tool_reports_in_the_preferred_unit(monkeypatch):
+    pytest.importorskip("google.adk")
+    from app.tools import get_weather_batch
+
+    monkeypatch.setattr(weather, "_provider", CachedWeatherProvider(MockWeatherProvider()))
+    tool_context = SimpleNamespace(state={"user_preference_temperature_unit": "Fahrenheit"})
+    result = get_weather_batch(["NYC", "Atlantis", "London"], tool_context)
+    assert result["status"] == "success"
+    assert result["reports"] == ["The weather in New York is sunny with a temperature of 77°F.",
+                                 "The weather in London is cloudy with a temperature of 59°F."]
+    assert result["errors"] == ["Sorry, I don't have weather information for 'Atlantis'."]
+    assert tool_context.state["last_city_checked_stateful"] == "London"
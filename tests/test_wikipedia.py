@@ -0,0 +1,139 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+pytest.importorskip("anyio")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, "server"))
+
+import wikipedia
+from wikipedia import ArticleCache, ArticleExtractor, FixtureFetcher, HttpFetcher, check_url, extract_article
+
+PAGE = """<html><head><title>MCP</title><style>.x{}</style></head><body>
+<div id="siteNotice">Donate today</div>
+<div id="mw-content-text"><div class="mw-parser-output">
+<table class="infobox"><tr><td>Developer: Anthropic</td></tr></table>
+<p>The <b>Model Context Protocol</b> is an open standard.<sup class="reference">[1]</sup></p>
+<h2>History<span class="mw-editsection">[edit]</span></h2>
+<p>It was announced in 2024.</p>
+<ul><li>First item</li></ul>
+<div class="navbox">Related protocols</div>
+<ol class="references"><li>A citation</li></ol>
+</div></div>
+<div id="footer">Privacy policy</div>
+</body></html>"""
+
+
+class PieceFetcher(wikipedia.WikipediaFetcher):
+    """Serves PAGE in small pieces and records what happened when."""
+
+    def __init__(self, revision="r1"):
+        self.rev = revision
+        self.log = []
+
+    async def revision(self, url):
+        return self.rev
+
+    async def stream(self, url):
+        self.log.append("stream")
+        for i in range(0, len(PAGE), 64):
+            self.log.append("piece")
+            yield PAGE[i:i + 64]
+
+
+def test_only_the_article_body_is_kept():
+    extractor = ArticleExtractor()
+    extractor.feed(PAGE)
+    extractor.close()
+    assert extractor.take_blocks() == [
+        "The Model Context Protocol is an open standard.",
+        "## History",
+        "It was announced in 2024.",
+        "First item",
+    ]
+
+
+def test_chunks_are_streamed_while_the_page_downloads(monkeypatch):
+    monkeypatch.setattr(wikipedia, "CHUNK_CHARS", 40)
+    fetcher = PieceFetcher()
+
+    async def on_chunk(index, text):
+        fetcher.log.append(f"chunk {index}")
+
+    chunks = asyncio.run(extract_article("https://en.wikipedia.org/wiki/MCP", fetcher=fetcher,
+                                         cache=ArticleCache(), on_chunk=on_chunk))
+    assert len(chunks) == 2
+    assert "\n\n".join(chunks).startswith("The Model Context Protocol")
+    # The first chunk went out before the last piece of the page arrived.
+    assert fetcher.log.index("chunk 0") < len(fetcher.log) - 1 - fetcher.log[::-1].index("piece")
+
+
+def test_articles_are_cached_by_revision(tmp_path):
+    url = "https://en.wikipedia.org/wiki/MCP"
+    first = PieceFetcher("r1")
+    asyncio.run(extract_article(url, fetcher=first, cache=ArticleCache(str(tmp_path))))
+
+    # A new process (empty memory) reads the same revision from disk...
+    again = PieceFetcher("r1")
+    cached = asyncio.run(extract_article(url, fetcher=again, cache=ArticleCache(str(tmp_path))))
+    assert again.log == [] and cached[0].startswith("The Model Context Protocol")
+    # ...and fetches an edited article again.
+    edited = PieceFetcher("r2")
+    asyncio.run(extract_article(url, fetcher=edited, cache=ArticleCache(str(tmp_path))))
+    assert edited.log[0] == "stream"
+
+
+def test_the_disk_cache_is_trimmed_to_max_bytes(tmp_path):
+    cache = ArticleCache(str(tmp_path), max_bytes=250)
+
+    async def main():
+        for i in range(5):
+            await cache.put(f"k{i}", ["x" * 100])
+
+    asyncio.run(main())
+    assert sum(entry.stat().st_size for entry in os.scandir(tmp_path)) <= 250
+
+
+@pytest.mark.parametrize("url", ["https://en.wikipedia.org/wiki/MCP", "https://wikipedia.org/"])
+def test_wikipedia_urls_are_allowed(url):
+    check_url(url)
+
+
+@pytest.mark.parametrize("url", [
+    "http://en.wikipedia.org/wiki/MCP",
+    "https://evilwikipedia.org/wiki/MCP",
+    "https://wikipedia.org.evil.com/",
+    "https://user@en.wikipedia.org/",
+    "https://en.wikipedia.org:8443/",
+    "https://169.254.169.254/latest/meta-data",
+])
+def test_other_urls_are_refused(url):
+    with pytest.raises(ValueError):
+        check_url(url)
+
+
+def test_redirects_off_wikipedia_are_not_followed():
+    requested = []
+
+    def handler(request):
+        requested.append(str(request.url))
+        return httpx.Response(302, headers={"Location": "http://169.254.169.254/"})
+
+    fetcher = HttpFetcher(httpx.AsyncClient(transport=httpx.MockTransport(handler), follow_redirects=True))
+
+    async def main():
+        return [text async for text in fetcher.stream("https://en.wikipedia.org/wiki/MCP")]
+
+    with pytest.raises(ValueError):
+        asyncio.run(main())
+    assert requested == ["https://en.wikipedia.org/wiki/MCP"]
+
+
+def test_fixture_urls_cannot_leave_the_directory(tmp_path):
+    fetcher = FixtureFetcher(str(tmp_path))
+    assert fetcher.path_for("https://en.wikipedia.org/wiki/MCP") == os.path.join(str(tmp_path), "MCP.html")
+    with pytest.raises(ValueError):
+        fetcher.path_for("https://en.wikipedia.org/wiki/..%2F..%2Fetc%2Fpasswd")